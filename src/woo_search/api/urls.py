@@ -4,7 +4,7 @@ from django.views.generic import RedirectView
 from drf_spectacular.views import SpectacularJSONAPIView, SpectacularRedocView
 from rest_framework import routers
 
-from woo_search.search_index.api.views import SearchView
+from woo_search.search_index.api.views import SearchView, SuggestView
 from woo_search.search_index.api.viewsets import (
     DocumentViewSet,
     PublicationViewSet,
@@ -44,6 +44,7 @@ urlpatterns = [
         include(
             [
                 path("search", SearchView.as_view(), name="search"),
+                path("suggest", SuggestView.as_view(), name="suggest"),
                 *router.urls,
             ]
         ),
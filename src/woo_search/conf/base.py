@@ -292,6 +292,329 @@ SEARCH_INDEX = {
             "appropriately to allow sufficiently large HTTP request body sizes."
         ),
     ),
+    "EXTERNAL_VERSIONING": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_EXTERNAL_VERSIONING",
+        default=True,
+        group="Elastic Search",
+        help_text=(
+            "Use the last modified timestamp of a record as (external) version when "
+            "writing it to the index. Elastic Search then rejects writes of data "
+            "that is older than what is already indexed, so out-of-order task "
+            "execution can't overwrite newer data."
+        ),
+    ),
+    "PROPAGATE_PUBLICATION_CHANGES": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_PROPAGATE_PUBLICATION_CHANGES",
+        default=False,
+        group="Elastic Search",
+        help_text=(
+            "When a publication is indexed and its information categories, topics "
+            "or publisher changed, update these fields on all the documents of the "
+            "publication too, so that the documents don't need to be re-indexed "
+            "individually."
+        ),
+    ),
+    "CBOR_TRANSPORT": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_CBOR_TRANSPORT",
+        default=False,
+        group="Elastic Search",
+        help_text=(
+            "Send documents with file content to Elastic Search as CBOR instead of "
+            "JSON. The file content is then sent as raw bytes rather than base64 "
+            "encoded, which reduces the request body size by about a quarter and "
+            "avoids the encoding overhead on both ends."
+        ),
+    ),
+    "EXTRACT_PLAIN_TEXT": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_EXTRACT_PLAIN_TEXT",
+        default=True,
+        group="Elastic Search",
+        help_text=(
+            "Extract the content of plain text files (text, CSV, HTML and JSON) "
+            "while indexing instead of sending them through the attachment "
+            "processor of Elastic Search. The ingest pipeline is then only used "
+            "for binary file formats."
+        ),
+    ),
+    "MAX_COMPRESSION_RATIO": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_MAX_COMPRESSION_RATIO",
+        default=100,
+        group="Elastic Search",
+        help_text=(
+            "The maximum ratio between the uncompressed and compressed size of files "
+            "in (zip and 7z) archives. Files or archives with a higher compression "
+            "ratio are not extracted, which protects the workers against zip bombs."
+        ),
+    ),
+    "ARCHIVE_EXTRACTION_THREADS": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_ARCHIVE_EXTRACTION_THREADS",
+        default=4,
+        group="Elastic Search",
+        help_text=(
+            "The number of threads used (per indexing task) to decompress and "
+            "encode the files of (zip and 7z) archives concurrently. The files of 7z "
+            "archives are decompressed one after another, only their encoding is "
+            "concurrent. More threads than CPU cores don't speed up the extraction."
+        ),
+    ),
+    "PAYLOAD_CACHE_SIZE": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_PAYLOAD_CACHE_SIZE",
+        default=50 * 1000 * 1000,  # 50mb
+        group="Elastic Search",
+        help_text=(
+            "The maximum size (in bytes) of the in-memory cache of prepared file "
+            "contents, per worker process. Identical files attached to multiple "
+            "documents are then only encoded once. Use `0` to disable the cache."
+        ),
+    ),
+    "STORE_FILE_CONTENTS": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_STORE_FILE_CONTENTS",
+        default=True,
+        group="Elastic Search",
+        help_text=(
+            "Store the extracted file contents of documents in the index, in addition "
+            "to making them searchable. Disabling this considerably reduces the index "
+            "size, but documents can then no longer be updated in place - the "
+            "publication changes are not propagated to its documents and the sync "
+            "commands skip the documents index, and search results cannot include "
+            "highlighted snippets of the file contents. Only applies when the index "
+            "is created."
+        ),
+    ),
+    "HIGHLIGHT_FRAGMENT_SIZE": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_HIGHLIGHT_FRAGMENT_SIZE",
+        default=150,
+        group="Elastic Search",
+        help_text=(
+            "The approximate size (in characters) of the highlighted snippets "
+            "returned for search results."
+        ),
+    ),
+    "HIGHLIGHT_NUMBER_OF_FRAGMENTS": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_HIGHLIGHT_NUMBER_OF_FRAGMENTS",
+        default=3,
+        group="Elastic Search",
+        help_text=(
+            "The maximum number of highlighted snippets returned per field of a "
+            "search result."
+        ),
+    ),
+    "SUGGEST_TIMEOUT": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_SUGGEST_TIMEOUT",
+        default=200,
+        group="Elastic Search",
+        help_text=(
+            "Time budget (in milliseconds) for autocomplete suggestions. Elastic "
+            "Search returns the suggestions found within this time, and no "
+            "suggestions are returned at all if the cluster does not respond within "
+            "twice this time."
+        ),
+    ),
+    "COALESCE_SEARCHES": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_COALESCE_SEARCHES",
+        default=True,
+        group="Elastic Search",
+        help_text=(
+            "Execute identical search requests that arrive concurrently only once, "
+            "sharing the results. Only applies to requests handled by the same "
+            "process (i.e. by multiple threads), unless "
+            "`ELASTICSEARCH_COALESCE_SEARCHES_ACROSS_PROCESSES` is enabled too."
+        ),
+    ),
+    "COALESCE_SEARCHES_ACROSS_PROCESSES": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_COALESCE_SEARCHES_ACROSS_PROCESSES",
+        default=False,
+        group="Elastic Search",
+        help_text=(
+            "Coalesce identical concurrent search requests across processes too, "
+            "using the cache as lock and to share the results. This adds some cache "
+            "round trips to every search request."
+        ),
+    ),
+    "SEARCH_TIMEOUT": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_SEARCH_TIMEOUT",
+        default=5000,
+        group="Elastic Search",
+        help_text=(
+            "Time budget (in milliseconds) for search requests. Elastic Search "
+            "returns the results found within this time (flagged as partial), and the "
+            "search fails if the cluster does not respond within twice this time."
+        ),
+    ),
+    "DEGRADED_SEARCH_THRESHOLD": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_DEGRADED_SEARCH_THRESHOLD",
+        default=2000,
+        group="Elastic Search",
+        help_text=(
+            "Duration (in milliseconds) above which a search request is considered "
+            "slow. After too many consecutive slow searches, searches are degraded: "
+            "the facets and highlights are skipped (and flagged as such) until the "
+            "circuit breaker resets."
+        ),
+    ),
+    "CIRCUIT_BREAKER_FAILURE_THRESHOLD": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_CIRCUIT_BREAKER_FAILURE_THRESHOLD",
+        default=5,
+        group="Elastic Search",
+        help_text=(
+            "Number of consecutive failed search requests after which searches fail "
+            "immediately, without contacting Elastic Search, until the circuit "
+            "breaker resets. The same number of consecutive slow searches makes "
+            "searches degrade."
+        ),
+    ),
+    "CIRCUIT_BREAKER_RESET_TIMEOUT": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_CIRCUIT_BREAKER_RESET_TIMEOUT",
+        default=30,
+        group="Elastic Search",
+        help_text=(
+            "Number of seconds after which searches are attempted again (in full) "
+            "after the circuit breaker opened."
+        ),
+    ),
+    "REQUEST_CACHE_DATE_ROUNDING": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_REQUEST_CACHE_DATE_ROUNDING",
+        default="",
+        group="Elastic Search",
+        help_text=(
+            "Make search requests eligible for the Elastic Search caches by rounding "
+            "the current time and the date filters to a whole minute (`m`), hour "
+            "(`h`) or day (`d`). The date filters are widened to whole units. The "
+            "facets are then requested separately without hits, which allows the "
+            "shard request cache to serve them. Leave empty to disable."
+        ),
+    ),
+    "FACET_LABELS_TTL": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_FACET_LABELS_TTL",
+        default=300,
+        group="Elastic Search",
+        help_text=(
+            "Number of seconds the names of the publishers, information categories "
+            "and topics displayed in the facets are cached in memory (per process). "
+            "Renamed objects are displayed with their previous name until then."
+        ),
+    ),
+    "NUMBER_OF_SHARDS": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_NUMBER_OF_SHARDS",
+        default=1,
+        group="Elastic Search",
+        help_text=(
+            "Number of primary shards of the indices. Only applied when an index is "
+            "created."
+        ),
+    ),
+    "REFRESH_INTERVAL": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_REFRESH_INTERVAL",
+        default="1s",
+        group="Elastic Search",
+        help_text=(
+            "How often the indices are refreshed, making indexed changes visible to "
+            "searches. Longer intervals reduce the indexing load. Use `-1` to disable "
+            "the periodic refreshes."
+        ),
+    ),
+    "INDEX_CODEC": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_INDEX_CODEC",
+        default="best_compression",
+        group="Elastic Search",
+        help_text=(
+            "Compression of the stored fields of the indices: `best_compression` "
+            "for a smaller index (at the expense of slower retrieval of the stored "
+            "fields) or `default`. Only applied when an index is created."
+        ),
+    ),
+    "TRACK_TOTAL_HITS": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_TRACK_TOTAL_HITS",
+        default=10000,
+        group="Elastic Search",
+        help_text=(
+            "Number of search results that are counted exactly. Beyond this number, "
+            "the count is reported as a lower bound, which saves Elastic Search from "
+            "visiting every matching record for broad searches."
+        ),
+    ),
+    "ROUTE_BY_PUBLISHER": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_ROUTE_BY_PUBLISHER",
+        default=False,
+        group="Elastic Search",
+        help_text=(
+            "Store the publications and documents of a publisher in the same shard, "
+            "and maintain a filtered alias (`publisher-<uuid>`) per publisher. "
+            "Searches for a single publisher then only search the shard of the "
+            "publisher. Only useful with multiple shards. Changing this setting "
+            "requires recreating the indices and indexing all data again."
+        ),
+    ),
+    "DOCUMENT_PARTITIONING": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_DOCUMENT_PARTITIONING",
+        default="",
+        group="Elastic Search",
+        help_text=(
+            "Store the documents in a separate index per year (`year`) or month "
+            "(`month`) of their registration date, searched through the `document` "
+            "alias. Searches with a registration date range only search the indices "
+            "of the range. Leave empty to store all documents in a single index. "
+            "Changing this setting requires recreating the indices and indexing all "
+            "data again."
+        ),
+    ),
+    "LANDING_PAGE_REFRESH_INTERVAL": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_LANDING_PAGE_REFRESH_INTERVAL",
+        default=0,
+        group="Elastic Search",
+        help_text=(
+            "Interval (in seconds) at which Celery beat precomputes the results of "
+            "the landing page search: the search with the default parameters, "
+            "sorted chronologically. The search endpoint serves the precomputed "
+            "results for this search, which are also refreshed shortly after "
+            "records are (re-)indexed or removed. Set to 0 to disable."
+        ),
+    ),
+    "IDENTIFIER_QUERY_PATTERNS": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_IDENTIFIER_QUERY_PATTERNS",
+        default="",
+        cast=str.split,
+        group="Elastic Search",
+        help_text=(
+            "Space separated regular expressions of search queries that look like "
+            "an identifier, e.g. ``ZAAK-\\d{4}-\\d+`` for case numbers like "
+            "ZAAK-2024-001. These queries are looked up in the identifiers of the "
+            "records first - only when no record has the identifier, a full text "
+            "search is performed. Keep the patterns specific to the identifiers of "
+            "the organisation, as other search queries matching them (e.g. "
+            "'covid-19' or dates) are affected too. Leave empty to always perform a "
+            "full text search."
+        ),
+    ),
+    "QUERY_MAX_CLAUSES": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_QUERY_MAX_CLAUSES",
+        default=128,
+        group="Elastic Search",
+        help_text=(
+            "Maximum number of terms and quoted phrases in a search query. More "
+            "complex search queries are rejected. Each of them is searched for in "
+            "every search field, so keep the limit well below the maximum number "
+            "of clauses of Elastic Search."
+        ),
+    ),
+    "QUERY_MAX_TERM_LENGTH": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_QUERY_MAX_TERM_LENGTH",
+        default=100,
+        group="Elastic Search",
+        help_text=(
+            "Maximum number of characters of a term in a search query. Search "
+            "queries with longer terms are rejected."
+        ),
+    ),
+    "QUERY_MAX_PHRASES": config(  # pyright: ignore[reportCallIssue]
+        "ELASTICSEARCH_QUERY_MAX_PHRASES",
+        default=5,
+        group="Elastic Search",
+        help_text=(
+            "Maximum number of quoted phrases in a search query. Search queries with "
+            "more phrases are rejected."
+        ),
+    ),
 }
 
 SEARCH_INDEXABLE_FILE_TYPES = SimpleLazyObject(
@@ -458,6 +781,12 @@ CELERY_TASK_SOFT_TIME_LIMIT = config(
 
 CELERY_BEAT_SCHEDULE = {}
 
+if landing_page_refresh_interval := SEARCH_INDEX["LANDING_PAGE_REFRESH_INTERVAL"]:
+    CELERY_BEAT_SCHEDULE["refresh-landing-page"] = {
+        "task": "woo_search.search_index.tasks.refresh_landing_page",
+        "schedule": landing_page_refresh_interval,
+    }
+
 # Only ACK when the task has been executed. This prevents tasks from getting lost, with
 # the drawback that tasks should be idempotent (if they execute partially, the mutations
 # executed will be executed again!)
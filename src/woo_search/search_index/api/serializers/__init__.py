@@ -2,15 +2,26 @@ from .publications import (
     DocumentIndexSerializer,
     DocumentSerializer,
     PublicationSerializer,
+    RemovePublicationSerializer,
     TopicSerializer,
 )
-from .search import SearchResponseSerializer, SearchSerializer
+from .search import (
+    SearchResponseSerializer,
+    SearchSerializer,
+    SuggestResponseSerializer,
+    SuggestSerializer,
+    get_result_source_fields,
+)
 
 __all__ = [
     "DocumentSerializer",
     "DocumentIndexSerializer",
     "PublicationSerializer",
+    "RemovePublicationSerializer",
     "TopicSerializer",
     "SearchResponseSerializer",
     "SearchSerializer",
+    "SuggestResponseSerializer",
+    "SuggestSerializer",
+    "get_result_source_fields",
 ]
@@ -250,6 +250,16 @@ class PublicationSerializer(serializers.Serializer):
         return attrs
 
 
+class RemovePublicationSerializer(serializers.Serializer):
+    cascade = serializers.BooleanField(
+        help_text=_(
+            "Also remove all the documents belonging to the publication from the index."
+        ),
+        required=False,
+        default=False,
+    )
+
+
 class TopicSerializer(serializers.Serializer):
     uuid = serializers.CharField()
     officiele_titel = serializers.CharField(max_length=255)
@@ -1,3 +1,6 @@
+from functools import cache
+from typing import cast
+
 from django.utils.translation import gettext_lazy as _
 
 from drf_polymorphic.serializers import PolymorphicSerializer
@@ -9,9 +12,11 @@ from ...client import (
     ResultTypeBucket,
     SearchResult,
     SearchResults,
+    Suggestion,
     TopicBucket,
 )
-from ...constants import ResultTypeChoices, SortChoices
+from ...constants import CountRelationChoices, ResultTypeChoices, SortChoices
+from ...query_parser import QueryTooComplex, parse_query
 from ...typing import SearchParameters
 from . import DocumentSerializer, PublicationSerializer, TopicSerializer
 
@@ -166,6 +171,22 @@ class SearchSerializer(serializers.Serializer):
         allow_empty=True,
         help_text=_("Filter results related to (one of) the given topics' `uuid`."),
     )
+    highlight = serializers.BooleanField(
+        default=False,
+        help_text=_(
+            "Include highlighted snippets of the description and document content "
+            "matching the search query in the results. Only applies when a `query` "
+            "is provided."
+        ),
+    )
+
+    def validate_query(self, value: str) -> str:
+        # reject expensive queries before they reach Elastic Search
+        try:
+            parse_query(value)
+        except QueryTooComplex as exc:
+            raise serializers.ValidationError(str(exc), code="too_complex") from exc
+        return value
 
     def validate(self, attrs: SearchParameters) -> SearchParameters:
         # only the Document index has creatiedatum
@@ -294,6 +315,13 @@ class TopicResultSerializer(serializers.Serializer[SearchResult]):
 
 class SearchResultsSerializer(PolymorphicSerializer):
     type = serializers.CharField()
+    highlights = serializers.ListField(
+        child=serializers.CharField(),
+        help_text=_(
+            "Snippets of the content matching the search query, with the matching "
+            "terms wrapped in `<em>` tags. Empty unless `highlight` is requested."
+        ),
+    )
 
     discriminator_field = "type"
     serializer_mapping = {
@@ -306,14 +334,104 @@ class SearchResultsSerializer(PolymorphicSerializer):
 class SearchResponseSerializer(serializers.Serializer[SearchResults]):
     facets = SearchFacetsSerializer(source="*")
     count = serializers.IntegerField(source="total_count")
+    count_relation = serializers.ChoiceField(
+        source="total_count_relation",
+        choices=CountRelationChoices.choices,
+        help_text=_(
+            "Indicates whether the `count` is exact (`eq`) or a lower bound (`gte`). "
+            "Counting stops after a (configured) number of results, and for "
+            "chronologically sorted results after the records needed to determine "
+            "the `next` page."
+        ),
+    )
     next = serializers.SerializerMethodField(method_name="get_has_next")
     previous = serializers.SerializerMethodField(method_name="get_has_previous")
     results = SearchResultsSerializer(many=True)
+    degraded = serializers.BooleanField(
+        help_text=_(
+            "Indicates that the search engine is under heavy load. The facets and "
+            "highlights are then left out to reduce the load - the facets are empty."
+        ),
+    )
+    # the declared fields are taken off the class, this doesn't replace the partial
+    # attribute of the serializer itself
+    partial = serializers.BooleanField(  # pyright: ignore[reportAssignmentType]
+        help_text=_(
+            "Indicates that the search did not complete within its time budget. The "
+            "results (and count) are then based on part of the index only."
+        ),
+    )
 
     def get_has_next(self, instance: SearchResults) -> bool:
         page: int = self.context["page"]
         page_size: int = self.context["page_size"]
+        # a lower bound count includes at least one result beyond the requested page
+        # if there is one
         return page * page_size < instance.total_count
 
     def get_has_previous(self, instance: SearchResults) -> bool:
         return self.context["page"] > 1
+
+
+class SuggestSerializer(serializers.Serializer):
+    query = serializers.CharField(
+        max_length=100,
+        help_text=_(
+            "The search term(s) typed so far. Records with a title (`officieleTitel` "
+            "or `verkorteTitel`) containing these terms are suggested, where the last "
+            "term may be incomplete."
+        ),
+    )
+    result_types = serializers.ListField(
+        child=serializers.ChoiceField(choices=ResultTypeChoices.choices),
+        help_text=_(
+            "Specify to which document types the suggestions should be limited. If "
+            "left blank or an empty list is provided, all result types are included."
+        ),
+        default=list,
+    )
+    size = serializers.IntegerField(
+        default=5,
+        min_value=1,
+        max_value=20,
+        help_text=_("Maximum number of suggestions to return."),
+    )
+
+
+class SuggestionSerializer(serializers.Serializer[Suggestion]):
+    type = serializers.ChoiceField(
+        choices=ResultTypeChoices.choices,
+        help_text=_("Indicates the type of record/index that was hit."),
+    )
+    uuid = serializers.UUIDField(
+        label=_("UUID"),
+        help_text=_("Unique ID identifying the record in GPP-publicatiebank."),
+    )
+    officiele_titel = serializers.CharField(label=_("Official title"))
+    verkorte_titel = serializers.CharField(
+        label=_("Short title"),
+        help_text=_("Empty for topics, as they don't have a short title."),
+    )
+
+
+class SuggestResponseSerializer(serializers.Serializer):
+    results = SuggestionSerializer(many=True)
+
+
+@cache
+def get_result_source_fields() -> frozenset[str]:
+    """
+    Determine the (top level) fields of the indexed records that are rendered in the
+    search results.
+    """
+    return frozenset(
+        # bound fields always have a (string) source
+        cast(str, field.source)
+        for serializer_cls in (
+            DocumentSerializer,
+            PublicationSerializer,
+            TopicSerializer,
+        )
+        for field in serializer_cls().fields.values()
+        if not field.write_only
+    )
@@ -1,14 +1,42 @@
+from functools import partial
+
+from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
 from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.exceptions import APIException
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from woo_search.api.permissions import TokenAuthReadPermission
 
-from ..client import get_search_results
-from ..typing import SearchParameters
-from .serializers import SearchResponseSerializer, SearchSerializer
+from ..client import (
+    SearchResults,
+    SearchUnavailable,
+    get_search_results_from_parameters,
+    get_suggestions,
+)
+from ..landing_page import get_landing_page_results, is_landing_page_search
+from ..typing import SearchParameters, SuggestParameters
+from ..utils import SingleFlight, get_parameters_key
+from .serializers import (
+    SearchResponseSerializer,
+    SearchSerializer,
+    SuggestResponseSerializer,
+    SuggestSerializer,
+    get_result_source_fields,
+)
+
+
+class ServiceUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("The search engine is temporarily unavailable, try again later.")
+    default_code = "service_unavailable"
+
+
+# identical searches that are in flight are executed only once
+search_single_flight = SingleFlight[SearchResults]("search")
 
 
 class SearchView(APIView):
@@ -28,31 +56,70 @@ class SearchView(APIView):
 
         params: SearchParameters = query_serializer.validated_data
 
-        search_results = get_search_results(
-            query=params["query"],
-            publishers=params["publishers"],
-            information_categories=params["informatie_categorieen"],
-            topics=params["onderwerpen"],
-            result_types=params["result_types"],
-            registration_date_from=params["registratiedatum_vanaf"],
-            registration_date_to=params["registratiedatum_tot"],
-            gepubliceerd_op_vanaf=params["gepubliceerd_op_vanaf"],
-            gepubliceerd_op_tot=params["gepubliceerd_op_tot"],
-            last_modified_from=params["laatst_gewijzigd_datum_vanaf"],
-            last_modified_to=params["laatst_gewijzigd_datum_tot"],
-            creatiedatum_from=params["creatiedatum_vanaf"],
-            creatiedatum_to=params["creatiedatum_tot_en_met"],
-            datum_begin_geldigheid_vanaf=params["datum_begin_geldigheid_vanaf"],
-            datum_begin_geldigheid_tot=params["datum_begin_geldigheid_tot"],
-            datum_einde_geldigheid_vanaf=params["datum_einde_geldigheid_vanaf"],
-            datum_einde_geldigheid_tot=params["datum_einde_geldigheid_tot"],
-            page=(page := params["page"]),
-            page_size=(page_size := params["page_size"]),
-            sort=params["sort"],
+        search = partial(
+            get_search_results_from_parameters,
+            params,
+            source_fields=get_result_source_fields(),
+        )
+        # the landing page search is precomputed periodically
+        search_results = (
+            get_landing_page_results()
+            if settings.SEARCH_INDEX["LANDING_PAGE_REFRESH_INTERVAL"]
+            and is_landing_page_search(params)
+            else None
         )
+        if search_results is None:
+            try:
+                search_results = (
+                    search_single_flight.do(
+                        get_parameters_key(params),
+                        search,
+                        shared=settings.SEARCH_INDEX[
+                            "COALESCE_SEARCHES_ACROSS_PROCESSES"
+                        ],
+                        # don't wait longer than the search itself may take
+                        timeout=2 * settings.SEARCH_INDEX["SEARCH_TIMEOUT"] / 1000,
+                    )
+                    if settings.SEARCH_INDEX["COALESCE_SEARCHES"]
+                    else search()
+                )
+            except SearchUnavailable as exc:
+                raise ServiceUnavailable() from exc
 
         response = SearchResponseSerializer(
             instance=search_results,
-            context={"page": page, "page_size": page_size},
+            context={"page": params["page"], "page_size": params["page_size"]},
+        )
+        return Response(response.data)
+
+
+class SuggestView(APIView):
+    permission_classes = (TokenAuthReadPermission,)
+
+    @extend_schema(
+        tags=["search"],
+        summary=_("Suggest"),
+        operation_id="suggest",
+        description=_(
+            "Suggest publication, document and/or topic records whose title matches "
+            "the (partially) typed search terms, for example to autocomplete a "
+            "search box. Unlike the search endpoint, no facets are calculated and "
+            "only the titles are returned, in favour of a quick response."
+        ),
+        request=SuggestSerializer,
+        responses={200: SuggestResponseSerializer},
+    )
+    def post(self, request, *args, **kwargs):
+        query_serializer = SuggestSerializer(data=request.data)
+        query_serializer.is_valid(raise_exception=True)
+
+        params: SuggestParameters = query_serializer.validated_data
+
+        suggestions = get_suggestions(
+            query=params["query"],
+            result_types=params["result_types"],
+            size=params["size"],
         )
+
+        response = SuggestResponseSerializer(instance={"results": suggestions})
         return Response(response.data)
@@ -16,7 +16,12 @@ from ..tasks import (
     remove_topic_from_index,
 )
 from ..typing import DocumentIndexType, PublicationType, TopicType
-from .serializers import DocumentIndexSerializer, PublicationSerializer, TopicSerializer
+from .serializers import (
+    DocumentIndexSerializer,
+    PublicationSerializer,
+    RemovePublicationSerializer,
+    TopicSerializer,
+)
 
 
 @extend_schema(tags=["index"])
@@ -117,10 +122,16 @@ class PublicationViewSet(viewsets.ViewSet):
             "Remove the referenced publication data from the index.\n"
             "Note that this schedules a background task to perform the actual removal."
         ),
+        parameters=[RemovePublicationSerializer],
         responses={202: CeleryTaskIdSerializer},
     )
     def destroy(self, request: Request, uuid: str):
-        result = remove_publication_from_index.delay(uuid=uuid)
+        serializer = RemovePublicationSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        result = remove_publication_from_index.delay(
+            uuid=uuid, cascade=serializer.validated_data["cascade"]
+        )
         return Response(data={"task_id": result.id}, status=status.HTTP_202_ACCEPTED)
 
 
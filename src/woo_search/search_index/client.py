@@ -1,24 +1,130 @@
 import operator
 import os
 import re
+import time
+from collections import Counter
 from collections.abc import Collection, Sequence
-from dataclasses import dataclass
-from datetime import date, datetime
-from functools import reduce
-from typing import Literal, assert_never
+from dataclasses import dataclass, replace
+from datetime import UTC, date, datetime, timedelta
+from functools import lru_cache, partial, reduce
+from importlib.metadata import version
+from typing import Any, Literal, assert_never
 from urllib.parse import urlsplit
 from uuid import UUID
 
 from django.conf import settings
 
-from elasticsearch import Elasticsearch
-from elasticsearch.dsl import Q, Query, Search
+import cbor2
+import structlog
+from elastic_transport import Serializer, TransportError
+from elasticsearch import ApiError, Elasticsearch
+from elasticsearch.dsl import MultiSearch, Q, Query, Search
+from elasticsearch.dsl.response import Response
+
+from .facets import FacetKind, facet_labels
+from .index import (
+    DOCUMENT_PARTITION_PATTERN,
+    FILE_CONTENTS_FIELD,
+    SUGGEST_SUBFIELD,
+    Document,
+    Publication,
+    Topic,
+    get_document_partitions,
+    get_result_type,
+)
+from .query_parser import QueryTooComplex, compile_query, parse_query
+from .typing import IndexName, SearchParameters
+from .utils import CircuitBreaker
+
+__all__ = [
+    "QueryTooComplex",
+    "SearchUnavailable",
+    "get_client",
+    "get_search_results",
+    "get_search_results_from_parameters",
+    "get_suggestions",
+]
+
+logger = structlog.stdlib.get_logger(__name__)
+
+# opens when Elastic Search fails to respond (in time) - searches then fail fast
+search_breaker = CircuitBreaker("search")
+# opens when full searches are slow - searches then skip the aggregations and
+# highlighting
+full_search_breaker = CircuitBreaker("full_search")
+# opens when Elastic Search fails to respond (in time) to suggestion requests, which
+# have a much tighter time budget than searches - suggestions are then skipped
+suggest_breaker = CircuitBreaker("suggest")
+
+
+type DateRoundingUnit = Literal["m", "h", "d"]
+
+DATE_ROUNDING_UNITS: dict[DateRoundingUnit, timedelta] = {
+    "m": timedelta(minutes=1),
+    "h": timedelta(hours=1),
+    "d": timedelta(days=1),
+}
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+# upper bound of the number of indices - with the document partitions
+RESULT_TYPE_BUCKETS_SIZE = 1000
+
+# the (nested) field holding the extracted text of the file contents
+CONTENT_FIELD = f"{FILE_CONTENTS_FIELD}.attachment.content"
+
+# the fields (and their boosts) the search terms are matched against
+QUERY_FIELDS = [
+    "identifiers^3",
+    "officiele_titel^2",
+    "verkorte_titel^1.5",
+    "omschrijving^1.2",
+    CONTENT_FIELD,
+]
+
+
+class SearchUnavailable(Exception):
+    """
+    Elastic Search failed to respond (in time), or is considered unavailable after
+    recent failures.
+    """
+
+
+CBOR_MIMETYPE = "application/vnd.elasticsearch+cbor"
+# the elasticsearch client only applies the compatibility header to JSON bodies
+CBOR_CONTENT_TYPE = (
+    f"{CBOR_MIMETYPE}; compatible-with={version('elasticsearch').split('.')[0]}"
+)
 
-from .constants import ResultTypeChoices
-from .index import Document, Publication, Topic
-from .typing import IndexName
 
-__all__ = ["get_client", "get_search_results"]
+class CborSerializer(Serializer):
+    """
+    Serialize request bodies to CBOR.
+
+    Unlike JSON, CBOR supports binary values natively, which allows sending (large)
+    file contents to the ingest pipelines without base64 encoding them first.
+    """
+
+    mimetype = CBOR_MIMETYPE
+
+    def loads(self, data: bytes) -> Any:
+        return cbor2.loads(data)
+
+    def dumps(self, data: Any) -> bytes:
+        return cbor2.dumps(_prepare_cbor_value(data))
+
+
+def _prepare_cbor_value(value: Any) -> Any:
+    # CBOR has its own (tagged) datetime representation - send strings just like the
+    # JSON serializer does so that Elastic Search's date parsing applies.
+    match value:
+        case dict():
+            return {key: _prepare_cbor_value(item) for key, item in value.items()}
+        case list() | tuple():
+            return [_prepare_cbor_value(item) for item in value]
+        case date():  # also handles datetime
+            return value.isoformat()
+        case _:
+            return value
 
 
 def get_client() -> Elasticsearch:
@@ -42,6 +148,7 @@ def get_client() -> Elasticsearch:
         host,
         basic_auth=basic_auth,
         timeout=settings.SEARCH_INDEX["TIMEOUT"],
+        serializers={CBOR_MIMETYPE: CborSerializer()},
         **extra,
     )
 
@@ -50,6 +157,7 @@ def get_client() -> Elasticsearch:
 class SearchResult:
     type: IndexName
     record: Document | Publication | Topic
+    highlights: Sequence[str] = ()
 
 
 @dataclass
@@ -79,6 +187,14 @@ class InformationCategoryBucket:
     count: int
 
 
+@dataclass
+class Suggestion:
+    type: IndexName
+    uuid: UUID
+    officiele_titel: str
+    verkorte_titel: str = ""
+
+
 @dataclass
 class SearchResults:
     total_count: int
@@ -87,33 +203,37 @@ class SearchResults:
     publisher_buckets: Sequence[PublisherBucket]
     topic_buckets: Sequence[TopicBucket]
     information_category_buckets: Sequence[InformationCategoryBucket]
+    degraded: bool = False
+    """
+    The aggregations and highlights were skipped because Elastic Search is slow.
+    """
+    partial: bool = False
+    """
+    Not all shards responded within the time budget, so results may be missing.
+    """
+    total_count_relation: Literal["eq", "gte"] = "eq"
+    """
+    Whether the total count is exact (``eq``) or a lower bound (``gte``), because
+    counting stopped early.
+    """
 
 
-def clean_str_query(query: str) -> str:
-    """
-    Make the query suitable for ``simple_query_string`` search.
+@lru_cache
+def _compile_identifier_patterns(patterns: tuple[str, ...]) -> re.Pattern[str] | None:
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
 
-    While the ``query_string`` supports ``AND`` and ``OR`` out of the box, the
-    ``simple_query_string`` does not appear to do so and requires us to convert
-    this into the proper boolean operators (``+`` and ``|``).
-    """
-    # Pattern matches either a quoted substring (including quotes) or non-quote parts.
-    pattern = r'"[^"]*"|[^"]+'
-    parts: list[str] = re.findall(pattern, query)
-
-    processed_parts = []
-    for part in parts:
-        # If the part starts and ends with a quote, assume it's a quoted phrase and
-        # leave it unchanged.
-        if part.startswith('"') and part.endswith('"'):
-            processed_parts.append(part)
-        else:
-            # Replace standalone AND/OR with +/| using word boundaries.
-            part = re.sub(r"\bAND\b", "+", part)
-            part = re.sub(r"\bOR\b", "|", part)
-            processed_parts.append(part)
 
-    return "".join(processed_parts)
+def is_identifier_query(query: str) -> bool:
+    """
+    Check if the search query looks like an identifier, as configured by the
+    ``IDENTIFIER_QUERY_PATTERNS``.
+    """
+    pattern = _compile_identifier_patterns(
+        tuple(settings.SEARCH_INDEX["IDENTIFIER_QUERY_PATTERNS"])
+    )
+    return pattern is not None and pattern.fullmatch(query.strip()) is not None
 
 
 def _combine_queries(*queries: Query | None) -> Query:
@@ -129,6 +249,125 @@ def _combine_queries(*queries: Query | None) -> Query:
     return reduce(operator.and_, non_empty_queries)
 
 
+def _get_result_type_filter(
+    result_types: Collection[IndexName] | None,
+) -> Query | None:
+    if not result_types:
+        return None
+    if (
+        not settings.SEARCH_INDEX["DOCUMENT_PARTITIONING"]
+        or Document.Index.name not in result_types
+    ):
+        return Q("terms", _index=sorted(result_types))
+
+    # the documents are stored in the partitions, which don't match the name of the
+    # alias
+    queries = [Q("wildcard", _index=DOCUMENT_PARTITION_PATTERN)]
+    if other_result_types := sorted(
+        result_type
+        for result_type in set(result_types)
+        if result_type != Document.Index.name
+    ):
+        queries.append(Q("terms", _index=other_result_types))
+    return reduce(operator.or_, queries)
+
+
+def _get_facet_uuids(aggs) -> dict[FacetKind, list[str]]:
+    return {
+        "publisher": [
+            bucket.key for bucket in aggs.Publisher.FilteredPublisher.buckets
+        ],
+        "information_category": [
+            bucket.key
+            for bucket in aggs.InformationCategories.FilteredCategories.buckets
+        ],
+        "topic": [bucket.key for bucket in aggs.Topics.FilteredTopics.buckets],
+    }
+
+
+def _round_datetime(
+    value: datetime | None,
+    unit: DateRoundingUnit | Literal[""],
+    *,
+    up: bool = False,
+) -> datetime | None:
+    """
+    Round the timestamp down (or up) to a whole unit of time (in UTC).
+
+    Equivalent searches then result in identical requests, which can be served from
+    the Elastic Search caches.
+    """
+    if value is None or not unit:
+        return value
+    step = DATE_ROUNDING_UNITS[unit]
+    offset = value.astimezone(UTC) - EPOCH
+    rounded = EPOCH + offset // step * step
+    if up and rounded < EPOCH + offset:
+        rounded += step
+    return rounded
+
+
+def _is_cluster_failure(exc: TransportError | ApiError) -> bool:
+    """
+    Determine if the request failed because of the state of the cluster (unavailable,
+    overloaded...) rather than because of the request itself.
+    """
+    if isinstance(exc, ApiError):
+        return exc.meta.status >= 500 or exc.meta.status == 429
+    return True
+
+
+def _execute_multi_search(
+    client: Elasticsearch, search: Search, facets_search: Search
+) -> tuple[Response, Response | None]:
+    """
+    Execute the search and the (separate) facets search in a single request.
+
+    The searches of a multi search request fail individually, while the request
+    itself succeeds. A failed search raises an :class:`ApiError` with the status of
+    that search instead - except when the facets search fails because of the cluster
+    state, then the facets response is ``None``.
+    """
+    multi_search = MultiSearch().add(search).add(facets_search)
+    raw_response = client.msearch(body=multi_search.to_dict())
+    responses: list[Response | None] = []
+    for item_search, item in zip(
+        (search, facets_search), raw_response["responses"], strict=True
+    ):
+        if not item.get("error"):
+            responses.append(Response(item_search, item))
+            continue
+        exc = ApiError(
+            message=str(item["error"].get("type", "N/A")),
+            meta=replace(raw_response.meta, status=item.get("status", 500)),
+            body=item,
+        )
+        if item_search is search or not _is_cluster_failure(exc):
+            raise exc
+        logger.warning("search_facets_failed", exc_info=exc)
+        responses.append(None)
+
+    response, facets_response = responses
+    assert response is not None
+    return response, facets_response
+
+
+def _get_highlights(hit) -> list[str]:
+    highlights: list[dict[str, list[str]]] = []
+    if "highlight" in hit.meta:
+        highlights.append(hit.meta.highlight.to_dict())
+    # the file contents are highlighted in the inner hits of the nested query
+    if "inner_hits" in hit.meta and FILE_CONTENTS_FIELD in hit.meta.inner_hits:
+        inner_hits = hit.meta.inner_hits[FILE_CONTENTS_FIELD].to_dict()["hits"]["hits"]
+        highlights += [inner_hit.get("highlight", {}) for inner_hit in inner_hits]
+    return [
+        fragment
+        for fields in highlights
+        for fragments in fields.values()
+        for fragment in fragments
+    ]
+
+
 def get_search_results(
     # query
     query: str,
@@ -152,6 +391,9 @@ def get_search_results(
     page: int = 1,
     page_size: int = 10,
     sort: Literal["relevance", "chronological"] = "relevance",
+    source_fields: Collection[str] | None = None,
+    highlight: bool = False,
+    exact_identifier: bool = False,
 ) -> SearchResults:
     """
     Perform the search query in elastic search.
@@ -161,9 +403,9 @@ def get_search_results(
     collected and returned so they can be post-processed if needed.
 
     :arg query: The search terms entered by the user. These may contain double quotes
-      for exact matches and/or the AND/OR operators. See
-      https://www.elastic.co/guide/en/elasticsearch/reference/8.17/query-dsl-query-string-query.html
-      for all the details on how ES processes this.
+      for exact matches, the AND/OR operators and parentheses. See
+      :mod:`woo_search.search_index.query_parser` for the details. Raises
+      :class:`QueryTooComplex` when the query exceeds the configured limits.
     :arg publishers: A collection of publisher UUIDs. If provided, search results will
       be limited to provided publisher IDs.
     :arg information_categories: A collection of information category UUIDs. Only
@@ -189,8 +431,53 @@ def get_search_results(
     :arg page: The page number of results to retrieve. Counting starts at ``1``.
     :arg page_size: The number of results to return within a single page.
     :arg sort: Sort order to apply to the results. Relevance orders by score (from best
-      to worst), chronological orders by last modification date.
+      to worst), chronological orders by publication date (newest first) and the
+      uuid of the records published at the same time.
+
+    The total count is exact up to the ``TRACK_TOTAL_HITS`` threshold, and a lower
+    bound beyond it. The count is always exact beyond the requested page if there are
+    more results, so it can be used to determine if there's a next page. For
+    chronologically sorted results, the count is a lower bound as soon as there are
+    more results than the requested page(s).
+    :arg source_fields: The (top level) fields of the records that are needed to
+      process the results. If provided, other fields are not returned by Elastic
+      Search. The extracted file contents are never returned.
+    :arg highlight: Include highlighted snippets of the description and file contents
+      matching the search terms in the results.
+    :arg exact_identifier: Only include the records that have the query as (one of
+      their) identifiers, ignoring the case, instead of performing a full text search.
+
+    The search is subject to the ``SEARCH_TIMEOUT`` time budget. When recent searches
+    exceeded the ``DEGRADED_SEARCH_THRESHOLD``, the search is degraded - the
+    aggregations and highlighting are skipped to reduce the load. When Elastic Search
+    fails to respond (in time), :class:`SearchUnavailable` is raised - and after
+    repeated failures, it's raised without sending the request at all.
     """
+    es_settings = settings.SEARCH_INDEX
+    reset_timeout: int = es_settings["CIRCUIT_BREAKER_RESET_TIMEOUT"]
+    if not search_breaker.allows_request(reset_timeout=reset_timeout):
+        raise SearchUnavailable("Too many recent search failures.")
+    degraded = not full_search_breaker.allows_request(reset_timeout=reset_timeout)
+    timeout: int = es_settings["SEARCH_TIMEOUT"]
+    date_rounding: DateRoundingUnit | Literal[""] = es_settings[
+        "REQUEST_CACHE_DATE_ROUNDING"
+    ]
+    # The indices are sorted chronologically, so the shards can stop collecting hits as
+    # soon as the page is filled - unless all hits need to be counted/aggregated.
+    chronological_fast_path = sort == "chronological"
+    # The records are routed by publisher, searches scoped to a single publisher only
+    # need to search the shard(s) of the publisher.
+    routing = (
+        str(next(iter(publishers)))
+        if es_settings["ROUTE_BY_PUBLISHER"] and len(publishers) == 1
+        else None
+    )
+    # The shard request cache only applies to requests without hits. Facets also need
+    # to be requested separately when the hits are routed, as the publisher facet
+    # includes the other publishers.
+    separate_facets = (
+        bool(date_rounding) or chronological_fast_path or routing is not None
+    ) and not degraded
 
     # build up the search object from the provided arguments
     search = (
@@ -207,38 +494,51 @@ def get_search_results(
     )
 
     # process the query (terms)
-    if query:
+    parsed_query = parse_query(query) if query and not exact_identifier else None
+    if query and exact_identifier:
+        # a cheap lookup in the keyword field, without any text analysis
         search = search.query(
-            "simple_query_string",
-            query=clean_str_query(query),
-            fields=[
-                "identifiers^3",
-                "officiele_titel^2",
-                "verkorte_titel^1.5",
-                "omschrijving^1.2",
-                "document_data.attachment.content",
-            ],
-            flags="OR|AND|PHRASE|PRECEDENCE|WHITESPACE",
-            default_operator="AND",
+            "term", identifiers={"value": query.strip(), "case_insensitive": True}
         )
+    elif parsed_query is not None:
+        search = search.query(compile_query(parsed_query, QUERY_FIELDS))
 
     # process the date filters
     if registration_date_from or registration_date_to:
         # as soon as one bound is given, construct the filter
+        registration_date_gte = _round_datetime(registration_date_from, date_rounding)
+        registration_date_lt = _round_datetime(
+            registration_date_to, date_rounding, up=True
+        )
         search = search.filter(
             "range",
-            registratiedatum={
-                "gte": registration_date_from,
-                "lt": registration_date_to,
-            },
+            registratiedatum={"gte": registration_date_gte, "lt": registration_date_lt},
         )
+        # the documents may be partitioned by registration date, then only the
+        # partitions of the range need to be searched
+        if (
+            registration_date_gte
+            and registration_date_lt
+            and (
+                partitions := get_document_partitions(
+                    registration_date_gte, registration_date_lt
+                )
+            )
+            is not None
+        ):
+            search = (
+                search.index()
+                .index(Publication.Index.name, *partitions, Topic.Index.name)
+                # the partitions of periods without documents don't exist
+                .params(ignore_unavailable=True)
+            )
 
     if gepubliceerd_op_vanaf or gepubliceerd_op_tot:
         search = search.filter(
             "range",
             gepubliceerd_op={
-                "gte": gepubliceerd_op_vanaf,
-                "lt": gepubliceerd_op_tot,
+                "gte": _round_datetime(gepubliceerd_op_vanaf, date_rounding),
+                "lt": _round_datetime(gepubliceerd_op_tot, date_rounding, up=True),
             },
         )
 
@@ -246,8 +546,10 @@ def get_search_results(
         search = search.filter(
             "range",
             datum_begin_geldigheid={
-                "gte": datum_begin_geldigheid_vanaf,
-                "lt": datum_begin_geldigheid_tot,
+                "gte": _round_datetime(datum_begin_geldigheid_vanaf, date_rounding),
+                "lt": _round_datetime(
+                    datum_begin_geldigheid_tot, date_rounding, up=True
+                ),
             },
         )
 
@@ -255,8 +557,10 @@ def get_search_results(
         search = search.filter(
             "range",
             datum_einde_geldigheid={
-                "gte": datum_einde_geldigheid_vanaf,
-                "lt": datum_einde_geldigheid_tot,
+                "gte": _round_datetime(datum_einde_geldigheid_vanaf, date_rounding),
+                "lt": _round_datetime(
+                    datum_einde_geldigheid_tot, date_rounding, up=True
+                ),
             },
         )
 
@@ -265,8 +569,8 @@ def get_search_results(
         search = search.filter(
             "range",
             laatst_gewijzigd_datum={
-                "gte": last_modified_from,
-                "lt": last_modified_to,
+                "gte": _round_datetime(last_modified_from, date_rounding),
+                "lt": _round_datetime(last_modified_to, date_rounding, up=True),
             },
         )
 
@@ -277,27 +581,25 @@ def get_search_results(
             creatiedatum={"gte": creatiedatum_from, "lte": creatiedatum_to},
         )
 
-    result_type_filter = Q("terms", _index=result_types) if result_types else None
+    # the filter values are sorted, so equivalent searches result in identical requests
+    result_type_filter = _get_result_type_filter(result_types)
     if result_type_filter:
         search = search.post_filter(result_type_filter)
 
     publisher_filter = (
-        Q("terms", publisher__uuid__keyword=[str(item) for item in publishers])
+        Q("terms", publisher__uuid__keyword=sorted(str(item) for item in publishers))
         if publishers
         else None
     )
     if publisher_filter:
         search = search.post_filter(publisher_filter)
 
+    # the flattened uuid fields avoid (expensive) nested queries
     information_categories_filter = (
         Q(
-            "nested",
-            path="informatie_categorieen",
-            query=Q(
-                "terms",
-                informatie_categorieen__uuid__keyword=[
-                    str(item) for item in information_categories
-                ],
+            "terms",
+            informatie_categorie_uuids=sorted(
+                str(item) for item in information_categories
             ),
         )
         if information_categories
@@ -307,14 +609,7 @@ def get_search_results(
         search = search.post_filter(information_categories_filter)
 
     topics_filter = (
-        Q(
-            "nested",
-            path="onderwerpen",
-            query=Q(
-                "terms",
-                onderwerpen__uuid__keyword=[str(item) for item in topics],
-            ),
-        )
+        Q("terms", onderwerp_uuids=sorted(str(item) for item in topics))
         if topics
         else None
     )
@@ -331,7 +626,8 @@ def get_search_results(
             {
                 "gauss": {
                     "registratiedatum": {
-                        "origin": "now",
+                        # rounding makes the query cacheable
+                        "origin": f"now/{date_rounding}" if date_rounding else "now",
                         # after ~two weeks, the decay will be 0.5
                         "scale": "15d",
                         # only start appylying decay to documents older than a week
@@ -344,79 +640,110 @@ def get_search_results(
         score_mode="multiply",
     )
 
-    # add aggregations
-    search.aggs.bucket(
-        "ResultType",
-        "filter",
-        filter=_combine_queries(
-            information_categories_filter,
-            topics_filter,
-            publisher_filter,
-        ),
-    ).bucket(
-        "FilteredResultType",
-        "terms",
-        field="_index",
+    # add aggregations, unless the cluster is struggling. Note that the aggregations
+    # are added in place - to the search itself, unless they're requested separately.
+    facets_search = (
+        search[:0].extra(track_total_hits=False).params(request_cache=True)
+        if separate_facets
+        else search
     )
+    if not degraded:
+        facets_search.aggs.bucket(
+            "ResultType",
+            "filter",
+            filter=_combine_queries(
+                information_categories_filter,
+                topics_filter,
+                publisher_filter,
+            ),
+        ).bucket(
+            "FilteredResultType",
+            "terms",
+            field="_index",
+            # one bucket per index, the document partitions are separate indices
+            size=RESULT_TYPE_BUCKETS_SIZE,
+        )
 
-    search.aggs.bucket(
-        "Publisher",
-        "filter",
-        filter=_combine_queries(
-            information_categories_filter,
-            topics_filter,
-            result_type_filter,
-        ),
-    ).bucket(
-        "FilteredPublisher",
-        "multi_terms",
-        terms=[
-            {"field": "publisher.uuid.keyword"},
-            {"field": "publisher.naam.keyword"},
-        ],
-    )
+        facets_search.aggs.bucket(
+            "Publisher",
+            "filter",
+            filter=_combine_queries(
+                information_categories_filter,
+                topics_filter,
+                result_type_filter,
+            ),
+        ).bucket(
+            # the names are looked up in the facet labels registry
+            "FilteredPublisher",
+            "terms",
+            field="publisher.uuid.keyword",
+        )
 
-    search.aggs.bucket(
-        "InformationCategories",
-        "filter",
-        filter=_combine_queries(
-            publisher_filter,
-            topics_filter,
-            result_type_filter,
-        ),
-    ).bucket(
-        "Categories",
-        "nested",
-        path="informatie_categorieen",
-    ).bucket(
-        "FilteredCategories",
-        "multi_terms",
-        terms=[
-            {"field": "informatie_categorieen.uuid.keyword"},
-            {"field": "informatie_categorieen.naam.keyword"},
-        ],
-    )
+        facets_search.aggs.bucket(
+            "InformationCategories",
+            "filter",
+            filter=_combine_queries(
+                publisher_filter,
+                topics_filter,
+                result_type_filter,
+            ),
+        ).bucket(
+            "FilteredCategories",
+            "terms",
+            field="informatie_categorie_uuids",
+        )
 
-    search.aggs.bucket(
-        "Topics",
-        "filter",
-        filter=_combine_queries(
-            information_categories_filter,
-            publisher_filter,
-            result_type_filter,
-        ),
-    ).bucket(
-        "Topics",
-        "nested",
-        path="onderwerpen",
-    ).bucket(
-        "FilteredTopics",
-        "multi_terms",
-        terms=[
-            {"field": "onderwerpen.uuid.keyword"},
-            {"field": "onderwerpen.officiele_titel.keyword"},
-        ],
+        facets_search.aggs.bucket(
+            "Topics",
+            "filter",
+            filter=_combine_queries(
+                information_categories_filter,
+                publisher_filter,
+                result_type_filter,
+            ),
+        ).bucket(
+            "FilteredTopics",
+            "terms",
+            field="onderwerp_uuids",
+        )
+
+    # The extracted file contents can be huge (up to INDEXED_CHARS per file) and are
+    # not displayed - don't ship them over the wire.
+    search = search.source(
+        includes=sorted(source_fields) if source_fields else None,
+        excludes=[FILE_CONTENTS_FIELD],
     )
+    if highlight and parsed_query is not None and not degraded:
+        # the highlighted fields store their term offsets, which the fast vector
+        # highlighter uses instead of re-analyzing the field values
+        highlight_options = {
+            "type": "fvh",
+            "fragment_size": es_settings["HIGHLIGHT_FRAGMENT_SIZE"],
+            "number_of_fragments": es_settings["HIGHLIGHT_NUMBER_OF_FRAGMENTS"],
+        }
+        search = search.highlight_options(**highlight_options).highlight("omschrijving")
+        # The file contents are nested documents, which are only highlighted in the
+        # inner hits of a nested query. The clause is optional and doesn't score, so
+        # the matching records and their order are unaffected.
+        search.query = Q(  # pyright: ignore[reportAttributeAccessIssue]
+            "bool",
+            must=[search.query],
+            should=[
+                Q(
+                    "nested",
+                    path=FILE_CONTENTS_FIELD,
+                    query=compile_query(parsed_query, [CONTENT_FIELD]),
+                    score_mode="none",
+                    inner_hits={
+                        "_source": False,
+                        "highlight": {
+                            **highlight_options,
+                            "fields": {CONTENT_FIELD: {}},
+                        },
+                    },
+                )
+            ],
+        )
 
     # add ordering configuration. note that sorting on score defaults to DESC, see:
     # https://www.elastic.co/guide/en/elasticsearch/reference/current/sort-search-results.html#_sort_order
@@ -424,76 +751,272 @@ def get_search_results(
         case "relevance":
             search = search.sort("_score", "-gepubliceerd_op")
         case "chronological":
-            search = search.sort("-gepubliceerd_op", "_score")
+            # early termination requires the sort to match the index sorting,
+            # including the tie breaker
+            search = search.sort("-gepubliceerd_op", "-uuid.keyword")
         case _:  # pragma: no cover
             assert_never(sort)
 
     # and paginate it
     page_from = page_size * (page - 1)
     search = search[page_from : page_from + page_size]
+    # Counting one hit beyond the page is enough to know if there's a next page. Beyond
+    # the threshold, the total count is a lower bound - which saves visiting every
+    # match for broad searches.
+    track_total_hits = page_from + page_size + 1
+    if not chronological_fast_path:
+        track_total_hits = max(track_total_hits, es_settings["TRACK_TOTAL_HITS"])
+    search = search.extra(track_total_hits=track_total_hits)
+    if routing is not None:
+        search = search.params(routing=routing)
+
+    # the time budget is applied per shard, which then return the hits found so far
+    search = search.extra(timeout=f"{timeout}ms")
+    facets_search = facets_search.extra(timeout=f"{timeout}ms")
 
     # bind it to the client containing the connection details
     with get_client() as client:
-        search = search.using(client)
-        response = search.execute()
+        # allow some time for the network on top of the search itself
+        client = client.options(request_timeout=2 * timeout / 1000)
+        start = time.monotonic()
+        try:
+            if separate_facets:
+                response, facets_response = _execute_multi_search(
+                    client, search, facets_search
+                )
+            else:
+                response = facets_response = search.using(client).execute()
+        except (TransportError, ApiError) as exc:
+            if not _is_cluster_failure(exc):
+                raise
+            logger.warning("search_failed", exc_info=exc, degraded=degraded)
+            failure_threshold = es_settings["CIRCUIT_BREAKER_FAILURE_THRESHOLD"]
+            search_breaker.record_failure(failure_threshold=failure_threshold)
+            if not degraded:
+                full_search_breaker.record_failure(failure_threshold=failure_threshold)
+            raise SearchUnavailable("Elastic Search did not respond.") from exc
+        duration = (time.monotonic() - start) * 1000
+
+        if facets_response is None:
+            # the hits are still usable - return them without the facets, like a
+            # degraded search
+            full_search_breaker.record_failure(
+                failure_threshold=es_settings["CIRCUIT_BREAKER_FAILURE_THRESHOLD"]
+            )
+            degraded = True
+            facets_response = response
+
+        # the facets only contain the uuids of the related objects
+        labels = (
+            facet_labels.get_labels(
+                client,
+                _get_facet_uuids(facets_response.aggregations),
+                ttl=es_settings["FACET_LABELS_TTL"],
+            )
+            if not degraded
+            else {}
+        )
+
+    search_breaker.record_success()
+    partial: bool = response.timed_out or facets_response.timed_out
+    if not degraded:
+        if partial or duration > es_settings["DEGRADED_SEARCH_THRESHOLD"]:
+            logger.warning("search_slow", duration=round(duration), partial=partial)
+            full_search_breaker.record_failure(
+                failure_threshold=es_settings["CIRCUIT_BREAKER_FAILURE_THRESHOLD"]
+            )
+        else:
+            full_search_breaker.record_success()
 
     # process the results
     results = [
         SearchResult(
-            type=hit.meta.index,
+            type=get_result_type(hit.meta.index),
             # ES-DSL typing isn't fancy enough yet...
             record=hit,  # pyright: ignore[reportArgumentType]
+            highlights=_get_highlights(hit),
         )
         for hit in response.hits
     ]
 
-    aggs = response.aggregations
+    if degraded:
+        return SearchResults(
+            total_count=response.hits.total.value,  # pyright: ignore[reportAttributeAccessIssue]
+            results=results,
+            result_type_buckets=[],
+            publisher_buckets=[],
+            topic_buckets=[],
+            information_category_buckets=[],
+            degraded=True,
+            partial=partial,
+            total_count_relation=response.hits.total.relation,  # pyright: ignore[reportAttributeAccessIssue]
+        )
+
+    aggs = facets_response.aggregations
 
     # The ordered list of result types we want to limit and order the
     # result_type_buckets
-    ordered_bucket_result_types: list[ResultTypeChoices] = [
-        ResultTypeChoices.topic,
-        ResultTypeChoices.publication,
-        ResultTypeChoices.document,
-    ]
+    ordered_bucket_result_types: list[IndexName] = ["topic", "publication", "document"]
+
+    result_type_counts: Counter[IndexName] = Counter()
+    for bucket in aggs.ResultType.FilteredResultType.buckets:
+        result_type_counts[get_result_type(bucket.key)] += bucket.doc_count
 
     return SearchResults(
         total_count=response.hits.total.value,  # pyright: ignore[reportAttributeAccessIssue]
         results=results,
         result_type_buckets=[
-            ResultTypeBucket(result_type=bucket.key, count=bucket.doc_count)
-            for bucket in sorted(
-                aggs.ResultType.FilteredResultType.buckets,
-                key=lambda bucket: ordered_bucket_result_types.index(bucket.key),
-            )
+            ResultTypeBucket(result_type=result_type, count=count)
+            for result_type in ordered_bucket_result_types
+            if (count := result_type_counts[result_type])
         ],
         publisher_buckets=[
             PublisherBucket(
-                # items are ordered by the fields specified in the aggregation
-                uuid=UUID(bucket.key[0]),
-                name=bucket.key[1],
+                uuid=UUID(bucket.key),
+                name=labels["publisher"][bucket.key],
                 count=bucket.doc_count,
             )
             for bucket in aggs.Publisher.FilteredPublisher.buckets
         ],
         information_category_buckets=[
             InformationCategoryBucket(
-                # items are ordered by the fields specified in the aggregation
-                uuid=UUID(bucket.key[0]),
-                name=bucket.key[1],
+                uuid=UUID(bucket.key),
+                name=labels["information_category"][bucket.key],
                 count=bucket.doc_count,
             )
-            for bucket in (
-                aggs.InformationCategories.Categories.FilteredCategories.buckets
-            )
+            for bucket in aggs.InformationCategories.FilteredCategories.buckets
         ],
         topic_buckets=[
             TopicBucket(
-                # items are ordered by the fields specified in the aggregation
-                uuid=UUID(bucket.key[0]),
-                name=bucket.key[1],
+                uuid=UUID(bucket.key),
+                name=labels["topic"][bucket.key],
                 count=bucket.doc_count,
             )
-            for bucket in aggs.Topics.Topics.FilteredTopics.buckets
+            for bucket in aggs.Topics.FilteredTopics.buckets
         ],
+        partial=partial,
+        total_count_relation=response.hits.total.relation,  # pyright: ignore[reportAttributeAccessIssue]
+    )
+
+
+def get_search_results_from_parameters(
+    params: SearchParameters, **kwargs
+) -> SearchResults:
+    """
+    Search with the (validated) parameters of a search request.
+
+    The keyword arguments are passed to :func:`get_search_results`. Queries that look
+    like an identifier are looked up in the identifiers of the records first, the full
+    text search is only performed if no record has the identifier.
+    """
+    search = partial(
+        get_search_results,
+        query=params["query"],
+        publishers=params["publishers"],
+        information_categories=params["informatie_categorieen"],
+        topics=params["onderwerpen"],
+        result_types=params["result_types"],
+        registration_date_from=params["registratiedatum_vanaf"],
+        registration_date_to=params["registratiedatum_tot"],
+        gepubliceerd_op_vanaf=params["gepubliceerd_op_vanaf"],
+        gepubliceerd_op_tot=params["gepubliceerd_op_tot"],
+        last_modified_from=params["laatst_gewijzigd_datum_vanaf"],
+        last_modified_to=params["laatst_gewijzigd_datum_tot"],
+        creatiedatum_from=params["creatiedatum_vanaf"],
+        creatiedatum_to=params["creatiedatum_tot_en_met"],
+        datum_begin_geldigheid_vanaf=params["datum_begin_geldigheid_vanaf"],
+        datum_begin_geldigheid_tot=params["datum_begin_geldigheid_tot"],
+        datum_einde_geldigheid_vanaf=params["datum_einde_geldigheid_vanaf"],
+        datum_einde_geldigheid_tot=params["datum_einde_geldigheid_tot"],
+        page=params["page"],
+        page_size=params["page_size"],
+        sort=params["sort"],
+        highlight=params["highlight"],
+        **kwargs,
+    )
+    if is_identifier_query(params["query"]):
+        results = search(exact_identifier=True)
+        if results.total_count:
+            return results
+        logger.debug("identifier_not_found", query=params["query"])
+    return search()
+
+
+def get_suggestions(
+    query: str,
+    result_types: Collection[IndexName] | None = None,
+    size: int = 5,
+) -> Sequence[Suggestion]:
+    """
+    Look up the records whose title(s) match the (partially typed) query.
+
+    This is a lightweight alternative to :func:`get_search_results` for autocompletion
+    - only the titles are searched, and there are no aggregations or score functions.
+    The request is subject to the ``SUGGEST_TIMEOUT`` time budget - if Elastic Search
+    fails to respond (in time), no suggestions are returned. After repeated failures,
+    or while searches fail, no suggestions are returned without sending the request
+    at all.
+
+    :arg query: The search terms entered by the user so far. The last term is matched
+      as a prefix.
+    :arg result_types: Optionally restrict the suggestions to these indices. If not
+      specified, all indices are searched.
+    :arg size: The maximum number of suggestions to return.
+    """
+    es_settings = settings.SEARCH_INDEX
+    reset_timeout: int = es_settings["CIRCUIT_BREAKER_RESET_TIMEOUT"]
+    if not (
+        search_breaker.allows_request(reset_timeout=reset_timeout)
+        and suggest_breaker.allows_request(reset_timeout=reset_timeout)
+    ):
+        logger.debug("suggestions_skipped", reason="circuit_breaker_open")
+        return []
+    timeout: int = es_settings["SUGGEST_TIMEOUT"]
+    indices = result_types or (
+        Topic.Index.name,
+        Publication.Index.name,
+        Document.Index.name,
     )
+
+    search = (
+        Search()
+        .index(*indices)
+        .query(
+            "multi_match",
+            query=query,
+            type="bool_prefix",
+            # the search_as_you_type field creates the shingle subfields
+            fields=[
+                f"{field}.{SUGGEST_SUBFIELD}{suffix}"
+                for field in ("officiele_titel", "verkorte_titel")
+                for suffix in ("", "._2gram", "._3gram")
+            ],
+        )
+        .source(["uuid", "officiele_titel", "verkorte_titel"])
+        .extra(track_total_hits=False, timeout=f"{timeout}ms")
+    )[:size]
+
+    with get_client() as client:
+        # allow some time for the network on top of the search itself
+        search = search.using(client.options(request_timeout=2 * timeout / 1000))
+        try:
+            response = search.execute()
+        except (TransportError, ApiError) as exc:
+            if not _is_cluster_failure(exc):
+                raise
+            logger.warning("suggestions_failed", exc_info=exc, timeout=timeout)
+            suggest_breaker.record_failure(
+                failure_threshold=es_settings["CIRCUIT_BREAKER_FAILURE_THRESHOLD"]
+            )
+            return []
+    suggest_breaker.record_success()
+
+    return [
+        Suggestion(
+            type=get_result_type(hit.meta.index),
+            uuid=UUID(hit.uuid),
+            officiele_titel=hit.officiele_titel,
+            verkorte_titel=hit.to_dict().get("verkorte_titel", ""),
+        )
+        for hit in response.hits
+    ]
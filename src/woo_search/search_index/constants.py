@@ -3,6 +3,17 @@ from django.utils.translation import gettext_lazy as _
 
 DOCUMENT_ATTACHMENT_PIPELINE_ID = "document_attachment"
 
+# Text formats that don't require the attachment processor (Apache Tika) for text
+# extraction - their content is decoded by the worker instead.
+PLAIN_TEXT_MIME_TYPES = frozenset(
+    {
+        "application/json",
+        "text/csv",
+        "text/html",
+        "text/plain",
+    }
+)
+
 
 class ResultTypeChoices(models.TextChoices):
     publication = "publication", _("Publication")
@@ -13,3 +24,8 @@ class ResultTypeChoices(models.TextChoices):
 class SortChoices(models.TextChoices):
     relevance = "relevance", _("Relevance")
     chronological = "chronological", _("Chronological")
+
+
+class CountRelationChoices(models.TextChoices):
+    eq = "eq", _("Exact")
+    gte = "gte", _("Lower bound")
@@ -0,0 +1,234 @@
+import operator
+import threading
+import time
+from collections.abc import Collection, Mapping
+from dataclasses import dataclass
+from functools import reduce
+from typing import Any, Literal
+
+import structlog
+from elastic_transport import TransportError
+from elasticsearch import ApiError, Elasticsearch
+from elasticsearch.dsl import Q, Search
+
+from .index import Document, Publication
+
+__all__ = ["FacetLabelRegistry", "facet_labels"]
+
+logger = structlog.stdlib.get_logger(__name__)
+
+type FacetKind = Literal["publisher", "information_category", "topic"]
+
+# don't hammer the cluster when the labels can't be loaded
+MIN_REFRESH_INTERVAL = 10  # seconds
+# how long to wait for the labels being loaded by another thread, when there are no
+# labels yet
+COLD_START_TIMEOUT = 2  # seconds
+# upper bound of the number of labels per kind
+MAX_LABELS = 10_000
+
+
+@dataclass(frozen=True)
+class FacetField:
+    field: str
+    """
+    The keyword field holding the uuids of the related objects.
+    """
+    source_field: str
+    """
+    The (nested) related objects in the ``_source`` of the records.
+    """
+    name_field: str
+
+
+FACET_FIELDS: Mapping[FacetKind, FacetField] = {
+    "publisher": FacetField("publisher.uuid.keyword", "publisher", "naam"),
+    "information_category": FacetField(
+        "informatie_categorie_uuids", "informatie_categorieen", "naam"
+    ),
+    "topic": FacetField("onderwerp_uuids", "onderwerpen", "officiele_titel"),
+}
+
+
+def _get_related_objects(source: dict[str, Any], source_field: str) -> list[dict]:
+    match source.get(source_field):
+        case None:
+            return []
+        case dict() as item:
+            return [item]
+        case list() as items:
+            return items
+        case _:  # pragma: no cover
+            raise TypeError(f"Unexpected value for {source_field!r}.")
+
+
+class FacetLabelRegistry:
+    """
+    Per-process registry of the names of the publishers, information categories and
+    topics.
+
+    The facets aggregate on the uuids only, which is a lot cheaper than aggregating
+    on the (uuid, name) pairs. The names of the buckets are looked up in the registry
+    instead, which is loaded from the index and refreshed when it expires. The names
+    of unknown uuids (e.g. of recently indexed records) are looked up separately.
+    """
+
+    def __init__(self):
+        self._labels: dict[FacetKind, dict[str, str]] = {
+            kind: {} for kind in FACET_FIELDS
+        }
+        self._refreshed_at: float | None = None
+        self._attempted_at: float | None = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._refreshed = threading.Condition(self._lock)
+
+    def get_labels(
+        self,
+        client: Elasticsearch,
+        uuids: Mapping[FacetKind, Collection[str]],
+        *,
+        ttl: int,
+    ) -> dict[FacetKind, dict[str, str]]:
+        """
+        Look up the names of the related objects with the given uuids.
+
+        A single thread refreshes the registry, the other threads are served the
+        current (stale) labels in the meantime - or wait briefly for them, if there
+        are none yet. Uuids that are not in the registry are looked up in the index,
+        they only get an empty name if that fails.
+        """
+        if not any(uuids.values()):
+            return {kind: {} for kind in uuids}
+
+        with self._lock:
+            if self._refreshing and self._refreshed_at is None:
+                self._refreshed.wait_for(
+                    lambda: not self._refreshing, timeout=COLD_START_TIMEOUT
+                )
+            now = time.monotonic()
+            expired = self._refreshed_at is None or now - self._refreshed_at >= ttl
+            may_refresh = not self._refreshing and (
+                self._attempted_at is None
+                or now - self._attempted_at >= MIN_REFRESH_INTERVAL
+            )
+            refresh = expired and may_refresh
+            if refresh:
+                self._attempted_at = now
+                self._refreshing = True
+
+        if refresh:
+            # the aggregations are expensive, don't block the other threads
+            labels = None
+            try:
+                labels = self._load_labels(client)
+            finally:
+                with self._lock:
+                    self._refreshing = False
+                    if labels is not None:
+                        self._labels = labels
+                        self._refreshed_at = time.monotonic()
+                    self._refreshed.notify_all()
+
+        current_labels = self._labels
+        missing: dict[FacetKind, list[str]] = {
+            kind: [uuid for uuid in kind_uuids if uuid not in current_labels[kind]]
+            for kind, kind_uuids in uuids.items()
+        }
+        if any(missing.values()) and (
+            found := self._load_labels(client, uuids=missing)
+        ):
+            with self._lock:
+                # merged into the current labels, a refresh may have replaced them
+                self._labels = {
+                    kind: labels | found.get(kind, {})
+                    for kind, labels in self._labels.items()
+                }
+                current_labels = self._labels
+
+        return {
+            kind: {uuid: current_labels[kind].get(uuid, "") for uuid in kind_uuids}
+            for kind, kind_uuids in uuids.items()
+        }
+
+    def _load_labels(
+        self,
+        client: Elasticsearch,
+        uuids: Mapping[FacetKind, Collection[str]] | None = None,
+    ) -> dict[FacetKind, dict[str, str]] | None:
+        """
+        Load the labels from the index - all of them, or only those of the given
+        uuids.
+        """
+        facet_fields: Mapping[FacetKind, FacetField] = (
+            FACET_FIELDS
+            if uuids is None
+            else {kind: FACET_FIELDS[kind] for kind in uuids if uuids[kind]}
+        )
+        search = (
+            Search()
+            .index(Publication.Index.name, Document.Index.name)
+            .extra(size=0, track_total_hits=False)
+        )
+        if uuids is not None:
+            search = search.filter(
+                reduce(
+                    operator.or_,
+                    (
+                        Q("terms", **{facet_field.field: sorted(uuids[kind])})
+                        for kind, facet_field in facet_fields.items()
+                    ),
+                )
+            )
+        for kind, facet_field in facet_fields.items():
+            search.aggs.bucket(
+                kind,
+                "terms",
+                field=facet_field.field,
+                **(
+                    {"size": MAX_LABELS}
+                    if uuids is None
+                    else {"include": sorted(uuids[kind]), "size": len(uuids[kind])}
+                ),
+            ).metric(
+                # the most recently modified record has the current name
+                "Latest",
+                "top_hits",
+                size=1,
+                sort=[{"laatst_gewijzigd_datum": "desc"}],
+                _source={"includes": [facet_field.source_field]},
+            )
+
+        try:
+            response = search.using(client).execute()
+        except (TransportError, ApiError) as exc:
+            # keep the (stale) labels, the facets are still usable
+            logger.warning(
+                "facet_labels_refresh_failed",
+                missing_only=uuids is not None,
+                exc_info=exc,
+            )
+            return None
+
+        all_labels: dict[FacetKind, dict[str, str]] = {}
+        for kind, facet_field in facet_fields.items():
+            labels: dict[str, str] = {}
+            for bucket in response.aggregations[kind].buckets:
+                (hit,) = bucket.Latest.hits.hits
+                labels.update(
+                    (item["uuid"], item[facet_field.name_field])
+                    for item in _get_related_objects(
+                        hit._source.to_dict(), facet_field.source_field
+                    )
+                    if item["uuid"] == bucket.key
+                )
+            all_labels[kind] = labels
+        return all_labels
+
+    def clear(self) -> None:
+        with self._lock:
+            self._labels = {kind: {} for kind in FACET_FIELDS}
+            self._refreshed_at = self._attempted_at = None
+
+
+facet_labels = FacetLabelRegistry()
@@ -1,5 +1,8 @@
-from datetime import date, datetime
-from typing import TYPE_CHECKING
+from datetime import UTC, date, datetime
+from fnmatch import fnmatch
+from typing import TYPE_CHECKING, Any, Literal, cast
+
+from django.conf import settings
 
 from elasticsearch.dsl import (
     Date,
@@ -10,6 +13,7 @@ from elasticsearch.dsl import (
     Mapping,
     Nested,
     Object,
+    SearchAsYouType,
     Text,
     mapped_field,
 )
@@ -21,41 +25,118 @@ from .typing import (
     NestedTopicType,
 )
 
+# field holding the (extracted) file contents of documents
+FILE_CONTENTS_FIELD = "document_data"
+
+
+# The titles have a ``suggest`` subfield, which indexes the (shingled) prefixes of the
+# words for autocompletion.
+SUGGEST_SUBFIELD = "suggest"
+
+# Text fields that are highlighted in search results. Storing the term offsets allows
+# the fast vector highlighter to build snippets without re-analyzing the (potentially
+# huge) field values at query time.
+HIGHLIGHT_TERM_VECTOR = "with_positions_offsets"
+
+# The names of the related objects are displayed, but not searched - so they don't
+# need the (scoring) norms.
+NAME_FIELD = Text(required=True, norms=False, fields={"keyword": Keyword()})
+
+# The uuid of the records - the keyword is the tie breaker of the index sorting. Note
+# that (unlike changing its type) a subfield can be added to an existing field.
+UUID_FIELD = Text(required=True, fields={"keyword": Keyword()})
+
+# Index settings, applied by the ``initialize_mappings`` management command. Note that
+# the number of shards, the codec and the index sorting can only be set when the index
+# is created.
+INDEX_SETTINGS = {
+    "number_of_shards": settings.SEARCH_INDEX["NUMBER_OF_SHARDS"],
+    "refresh_interval": settings.SEARCH_INDEX["REFRESH_INTERVAL"],
+    "codec": settings.SEARCH_INDEX["INDEX_CODEC"],
+    # store the records in chronological order (newest first), so that searches in
+    # this order can stop as soon as enough hits are collected. The uuid breaks the
+    # ties, so that the order is stable between the pages.
+    "sort.field": ["gepubliceerd_op", "uuid.keyword"],
+    "sort.order": ["desc", "desc"],
+}
+
 
 class DocumentData(InnerDoc):
-    attachment = Object(properties={"content": Text(analyzer="dutch")})
+    attachment = Object(
+        properties={
+            "content": Text(analyzer="dutch", term_vector=HIGHLIGHT_TERM_VECTOR)
+        }
+    )
 
 
 class NestedPublisher(InnerDoc):
     # TODO in next major version, change uuid to keyword instead of Text
-    uuid: M[str] = mapped_field(Text(required=True, fields={"keyword": Keyword()}))
-    naam: M[str] = mapped_field(Text(required=True, fields={"keyword": Keyword()}))
+    uuid: M[str] = mapped_field(
+        # the publishers are aggregated on for the facets
+        Text(required=True, fields={"keyword": Keyword(eager_global_ordinals=True)})
+    )
+    naam: M[str] = mapped_field(NAME_FIELD)
 
 
 class NestedInformationCategory(InnerDoc):
     # TODO in next major version, change uuid to keyword instead of Text
     uuid: M[str] = mapped_field(Text(required=True, fields={"keyword": Keyword()}))
-    naam: M[str] = mapped_field(Text(required=True, fields={"keyword": Keyword()}))
+    naam: M[str] = mapped_field(NAME_FIELD)
 
 
 class NestedTopic(InnerDoc):
     # TODO in next major version, change uuid to keyword instead of Text
     uuid: M[str] = mapped_field(Text(required=True, fields={"keyword": Keyword()}))
-    officiele_titel: M[str] = mapped_field(
-        Text(required=True, fields={"keyword": Keyword()})
-    )
+    officiele_titel: M[str] = mapped_field(NAME_FIELD)
+
+
+# Flattened copies of the uuids of the nested (denormalized) relations, mapping the
+# flattened field to the nested field. Filtering and aggregating on these is much
+# cheaper than the equivalent nested queries/aggregations.
+FLATTENED_UUID_FIELDS = {
+    "informatie_categorie_uuids": "informatie_categorieen",
+    "onderwerp_uuids": "onderwerpen",
+}
+
+
+def get_flattened_uuids(items: list | None) -> list[str]:
+    return [item["uuid"] for item in items or []]
+
+
+class FlattenedUUIDsMixin:
+    """
+    Populate the :data:`FLATTENED_UUID_FIELDS` from the nested relations when the
+    record is saved.
+    """
+
+    def clean(self) -> None:
+        super().clean()  # pyright: ignore[reportAttributeAccessIssue]
+        for field, nested_field in FLATTENED_UUID_FIELDS.items():
+            setattr(self, field, get_flattened_uuids(getattr(self, nested_field)))
+
+
+def get_publisher_alias(publisher_uuid: str) -> str:
+    """
+    Get the name of the filtered alias of the publication and document indices,
+    limited to the records of the publisher.
+    """
+    return f"publisher-{publisher_uuid}"
 
 
 # create empty base mapping instance
 DOCUMENT_MAPPING = Mapping()
 # add the document_data to the mapping without adding it to the `Document` class.
-DOCUMENT_MAPPING.field("document_data", Nested(DocumentData)._mapping.to_dict())
+DOCUMENT_MAPPING.field(FILE_CONTENTS_FIELD, Nested(DocumentData)._mapping.to_dict())
+if not settings.SEARCH_INDEX["STORE_FILE_CONTENTS"]:
+    # the extracted contents remain searchable, but are not stored - note that this can
+    # only be set when the index is created
+    DOCUMENT_MAPPING.meta("_source", excludes=[FILE_CONTENTS_FIELD])
 
 
-class Document(ES_Document):
+class Document(FlattenedUUIDsMixin, ES_Document):
     # See https://elasticsearch-dsl.readthedocs.io/en/latest/persistence.html#python-type-hints
     # for typing support.
-    uuid: M[str] = mapped_field(Text(required=True))
+    uuid: M[str] = mapped_field(UUID_FIELD)
     publicatie: M[str] = mapped_field(Text(required=True))
     informatie_categorieen: M[list[NestedInformationCategoryType]] = mapped_field(
         Nested(NestedInformationCategory, required=True)
@@ -63,19 +144,38 @@ class Document(ES_Document):
     onderwerpen: M[list[NestedTopicType]] = mapped_field(
         Nested(NestedTopic, required=False)
     )
+    # populated when saving, see FlattenedUUIDsMixin
+    informatie_categorie_uuids: M[list[str]] = mapped_field(
+        Keyword(multi=True, required=False, eager_global_ordinals=True), init=False
+    )
+    onderwerp_uuids: M[list[str]] = mapped_field(
+        Keyword(multi=True, required=False, eager_global_ordinals=True), init=False
+    )
     publisher: M[NestedPublisherType] = mapped_field(
         Object(NestedPublisher, required=True)
     )
     identifiers: M[list[str]] = mapped_field(Keyword(multi=True, required=False))
     # TODO: in a future release, drop this from the mapping!
-    identifier: M[str] = mapped_field(Text(analyzer="dutch", required=False))
+    identifier: M[str] = mapped_field(
+        Text(analyzer="dutch", required=False, norms=False)
+    )
     """
     DeprecationWarning
     """
 
-    officiele_titel: M[str] = mapped_field(Text(analyzer="dutch", required=True))
-    verkorte_titel: M[str] = mapped_field(Text(analyzer="dutch"))
-    omschrijving: M[str] = mapped_field(Text(analyzer="dutch"))
+    officiele_titel: M[str] = mapped_field(
+        Text(
+            analyzer="dutch",
+            required=True,
+            fields={SUGGEST_SUBFIELD: SearchAsYouType()},
+        )
+    )
+    verkorte_titel: M[str] = mapped_field(
+        Text(analyzer="dutch", fields={SUGGEST_SUBFIELD: SearchAsYouType()})
+    )
+    omschrijving: M[str] = mapped_field(
+        Text(analyzer="dutch", term_vector=HIGHLIGHT_TERM_VECTOR)
+    )
     # ES stores everything internally as a datetime, but always returns a string when
     # reading it. elasticsearch-dsl then takes care of parsing this string into a date
     # instance rather than datetime. Note that ES will assume UTC for this, but the
@@ -96,10 +196,16 @@ class Document(ES_Document):
 
     class Index:
         name: IndexName = "document"
+        settings = INDEX_SETTINGS
+
+    @classmethod
+    def _matches(cls, hit: dict[str, Any]) -> bool:
+        # the hits can come from the partitions of the index too
+        return fnmatch(hit.get("_index", ""), f"{cls.Index.name}*")
 
 
-class Publication(ES_Document):
-    uuid: M[str] = mapped_field(Text(required=True))
+class Publication(FlattenedUUIDsMixin, ES_Document):
+    uuid: M[str] = mapped_field(UUID_FIELD)
     publisher: M[NestedPublisherType] = mapped_field(
         Object(NestedPublisher, required=True)
     )
@@ -109,10 +215,27 @@ class Publication(ES_Document):
     onderwerpen: M[list[NestedTopicType]] = mapped_field(
         Nested(NestedTopic, required=False)
     )
+    # populated when saving, see FlattenedUUIDsMixin
+    informatie_categorie_uuids: M[list[str]] = mapped_field(
+        Keyword(multi=True, required=False, eager_global_ordinals=True), init=False
+    )
+    onderwerp_uuids: M[list[str]] = mapped_field(
+        Keyword(multi=True, required=False, eager_global_ordinals=True), init=False
+    )
     identifiers: M[list[str]] = mapped_field(Keyword(multi=True, required=False))
-    officiele_titel: M[str] = mapped_field(Text(analyzer="dutch", required=True))
-    verkorte_titel: M[str] = mapped_field(Text(analyzer="dutch"))
-    omschrijving: M[str] = mapped_field(Text(analyzer="dutch"))
+    officiele_titel: M[str] = mapped_field(
+        Text(
+            analyzer="dutch",
+            required=True,
+            fields={SUGGEST_SUBFIELD: SearchAsYouType()},
+        )
+    )
+    verkorte_titel: M[str] = mapped_field(
+        Text(analyzer="dutch", fields={SUGGEST_SUBFIELD: SearchAsYouType()})
+    )
+    omschrijving: M[str] = mapped_field(
+        Text(analyzer="dutch", term_vector=HIGHLIGHT_TERM_VECTOR)
+    )
     registratiedatum: M[datetime] = mapped_field(Date(required=True))
     # TODO: DeprecationWarning - make this required in v3 (breaking change)
     gepubliceerd_op: M[datetime | None] = mapped_field(Date(required=False))
@@ -126,12 +249,21 @@ class Publication(ES_Document):
 
     class Index:
         name: IndexName = "publication"
+        settings = INDEX_SETTINGS
 
 
 class Topic(ES_Document):
-    uuid: M[str] = mapped_field(Text(required=True))
-    officiele_titel: M[str] = mapped_field(Text(analyzer="dutch", required=True))
-    omschrijving: M[str] = mapped_field(Text(analyzer="dutch"))
+    uuid: M[str] = mapped_field(UUID_FIELD)
+    officiele_titel: M[str] = mapped_field(
+        Text(
+            analyzer="dutch",
+            required=True,
+            fields={SUGGEST_SUBFIELD: SearchAsYouType()},
+        )
+    )
+    omschrijving: M[str] = mapped_field(
+        Text(analyzer="dutch", term_vector=HIGHLIGHT_TERM_VECTOR)
+    )
     registratiedatum: M[datetime] = mapped_field(Date(required=True))
     gepubliceerd_op: M[datetime] = mapped_field(Date(required=True))
     laatst_gewijzigd_datum: M[datetime] = mapped_field(Date(required=True))
@@ -142,3 +274,65 @@ class Topic(ES_Document):
 
     class Index:
         name: IndexName = "topic"
+        settings = INDEX_SETTINGS
+
+
+# The documents can be partitioned by registration date. The partitions are created
+# from an index template when the first document of the period is indexed, and are
+# searched through an alias named after the (unpartitioned) document index.
+type PartitionUnit = Literal["year", "month"]
+
+PARTITION_FORMATS: dict[PartitionUnit, str] = {"year": "%Y", "month": "%Y-%m"}
+
+DOCUMENT_PARTITION_PATTERN = f"{Document.Index.name}-*"
+
+# searches spanning more partitions than this search the alias instead
+MAX_SEARCHED_PARTITIONS = 50
+
+
+def get_document_index_name(registratiedatum: datetime) -> str:
+    """
+    Get the name of the index that stores the documents with the given registration
+    date.
+    """
+    unit: PartitionUnit | Literal[""] = settings.SEARCH_INDEX["DOCUMENT_PARTITIONING"]
+    if not unit:
+        return Document.Index.name
+    period = registratiedatum.astimezone(UTC).strftime(PARTITION_FORMATS[unit])
+    return f"{Document.Index.name}-{period}"
+
+
+def get_document_partitions(start: datetime, end: datetime) -> list[str] | None:
+    """
+    Get the names of the document partitions with documents registered between
+    ``start`` and ``end`` (inclusive), or ``None`` if the documents are not
+    partitioned or the range spans too many partitions.
+
+    The partitions don't need to exist.
+    """
+    unit: PartitionUnit | Literal[""] = settings.SEARCH_INDEX["DOCUMENT_PARTITIONING"]
+    if not unit:
+        return None
+
+    start, end = start.astimezone(UTC), end.astimezone(UTC)
+    # count the months (since year 0), so the periods can be enumerated
+    first, last = start.year * 12 + start.month - 1, end.year * 12 + end.month - 1
+    step = 12 if unit == "year" else 1
+    first, last = first - first % step, last - last % step
+    if (last - first) // step >= MAX_SEARCHED_PARTITIONS:
+        return None
+
+    return [
+        get_document_index_name(datetime(month // 12, month % 12 + 1, 1, tzinfo=UTC))
+        for month in range(first, last + 1, step)
+    ]
+
+
+def get_result_type(index_name: str) -> IndexName:
+    """
+    Get the type of the records stored in the index - the document partitions store
+    documents.
+    """
+    if fnmatch(index_name, DOCUMENT_PARTITION_PATTERN):
+        return Document.Index.name
+    return cast(IndexName, index_name)
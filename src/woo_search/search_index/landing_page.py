@@ -0,0 +1,83 @@
+"""
+Precomputed results of the landing page search.
+
+The landing pages of the portals search without any query or filters, which
+aggregates the facets over all records. The results of this search are precomputed
+periodically (and shortly after the indexed records change) into the (shared) cache,
+so the search endpoint doesn't need to query Elastic Search for it.
+"""
+
+from functools import cache as memoize
+
+from django.conf import settings
+from django.core.cache import cache
+
+import structlog
+
+from .api.serializers import SearchSerializer, get_result_source_fields
+from .client import SearchResults, SearchUnavailable, get_search_results_from_parameters
+from .constants import SortChoices
+from .typing import SearchParameters
+from .utils import get_parameters_key
+
+__all__ = [
+    "get_landing_page_results",
+    "is_landing_page_search",
+    "refresh_landing_page_results",
+]
+
+logger = structlog.stdlib.get_logger(__name__)
+
+LANDING_PAGE_CACHE_KEY = "search_index:landing_page"
+
+
+@memoize
+def get_landing_page_parameters() -> SearchParameters:
+    """
+    Get the parameters of the landing page search - the default parameters, sorted
+    chronologically.
+    """
+    serializer = SearchSerializer(data={"sort": SortChoices.chronological})
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+def is_landing_page_search(params: SearchParameters) -> bool:
+    return get_parameters_key(params) == get_parameters_key(
+        get_landing_page_parameters()
+    )
+
+
+def get_landing_page_results() -> SearchResults | None:
+    """
+    Get the precomputed results of the landing page search, if available.
+    """
+    return cache.get(LANDING_PAGE_CACHE_KEY)
+
+
+def refresh_landing_page_results() -> None:
+    """
+    Execute the landing page search and store the results in the cache.
+
+    Incomplete results are not stored, the previous results are kept instead.
+    """
+    try:
+        results = get_search_results_from_parameters(
+            get_landing_page_parameters(), source_fields=get_result_source_fields()
+        )
+    except SearchUnavailable as exc:
+        logger.warning("landing_page_refresh_failed", exc_info=exc)
+        return
+
+    if results.degraded or results.partial:
+        logger.warning(
+            "landing_page_refresh_failed",
+            degraded=results.degraded,
+            partial=results.partial,
+        )
+        return
+
+    # the results expire when the periodic refresh stops
+    timeout = 3 * settings.SEARCH_INDEX["LANDING_PAGE_REFRESH_INTERVAL"]
+    cache.set(LANDING_PAGE_CACHE_KEY, results, timeout=timeout)
+    logger.info("landing_page_refreshed", total_count=results.total_count)
@@ -1,13 +1,113 @@
+from typing import Any
+
+from django.conf import settings
 from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
 
 from elastic_transport import ConnectionError
-from elasticsearch import ApiError
+from elasticsearch import ApiError, Elasticsearch
+from elasticsearch.dsl import Document as ES_Document, Index
 
 from ...client import get_client
 from ...constants import DOCUMENT_ATTACHMENT_PIPELINE_ID
+from ...index import (
+    DOCUMENT_PARTITION_PATTERN,
+    INDEX_SETTINGS,
+    Document,
+    get_document_index_name,
+)
 from ...ingest import setup_document_attachment_processor
 from ...utils import get_index_document_types
 
+# index settings that can only be set when the index is created, with the value
+# Elastic Search uses when they're not set
+STATIC_INDEX_SETTINGS: dict[str, str | list[str]] = {
+    "number_of_shards": "1",
+    "codec": "default",
+    "sort.field": [],
+    "sort.order": [],
+}
+
+
+def _as_list(value: Any) -> list[str]:
+    return [str(item) for item in value] if isinstance(value, list) else [str(value)]
+
+
+def get_static_setting_changes(client: Elasticsearch, index_name: str) -> list[str]:
+    """
+    Return the names of the configured index settings that differ from the settings
+    of the existing index, but can't be updated.
+    """
+    response = client.indices.get_settings(index=index_name, flat_settings=True)
+    current_settings = response.body[index_name]["settings"]
+    return [
+        setting
+        for setting, default in STATIC_INDEX_SETTINGS.items()
+        if _as_list(current_settings.get(f"index.{setting}", default))
+        != _as_list(INDEX_SETTINGS[setting])
+    ]
+
+
+def get_index(
+    client: Elasticsearch, doc_type: type[ES_Document]
+) -> tuple[Index, list[str]]:
+    """
+    Get the index definition to apply, excluding the static settings when the index
+    already exists. The skipped settings are returned too.
+    """
+    index: Index = doc_type._index
+    if not index.exists(using=client):
+        return index, []
+
+    index = index.clone()
+    index._settings = {
+        setting: value
+        for setting, value in index._settings.items()
+        if setting not in STATIC_INDEX_SETTINGS
+    }
+    return index, get_static_setting_changes(client, doc_type.Index.name)
+
+
+def save_document_partitions_template(client: Elasticsearch) -> None:
+    """
+    Save the index template of the document partitions, and update the mappings of
+    the existing partitions.
+
+    The partitions are added to the ``document`` alias. The partition of the current
+    period is created, so that the alias always exists.
+    """
+    alias = Document.Index.name
+    if client.indices.exists(index=alias) and not client.indices.exists_alias(
+        name=alias
+    ):
+        raise CommandError(
+            f"The index '{alias}' needs to be removed to partition the documents - "
+            "the alias of the partitions has the same name. The data then needs to "
+            "be re-indexed."
+        )
+
+    index = Document._index.clone()
+    index.aliases(**{alias: {}})
+    index.as_composable_template(alias, pattern=DOCUMENT_PARTITION_PATTERN).save(
+        using=client
+    )
+
+    # the template only applies to new partitions
+    client.indices.put_mapping(
+        index=DOCUMENT_PARTITION_PATTERN,
+        allow_no_indices=True,
+        **Document._doc_type.mapping.to_dict(),
+    )
+    client.indices.put_settings(
+        index=DOCUMENT_PARTITION_PATTERN,
+        allow_no_indices=True,
+        settings={"refresh_interval": INDEX_SETTINGS["refresh_interval"]},
+    )
+
+    current_partition = get_document_index_name(timezone.now())
+    if not client.indices.exists(index=current_partition):
+        client.indices.create(index=current_partition)
+
 
 class Command(BaseCommand):
     help = "Initialize Elastic Search mappings"
@@ -64,10 +164,33 @@ class Command(BaseCommand):
                         ending="",
                     )
 
-                doc_type.init(using=client)
+                try:
+                    if (
+                        doc_type is Document
+                        and settings.SEARCH_INDEX["DOCUMENT_PARTITIONING"]
+                    ):
+                        # the static settings are applied to new partitions only
+                        skipped_settings = []
+                        save_document_partitions_template(client)
+                    else:
+                        index, skipped_settings = get_index(client, doc_type)
+                        index.save(using=client)
+                except ApiError as exc:
+                    raise CommandError(
+                        f"Could not update the index '{doc_type.Index.name}': "
+                        f"{exc}. The index needs to be recreated and the data "
+                        "re-indexed."
+                    ) from exc
 
                 if verbosity >= 1:
                     self.stdout.write(" [OK]", self.style.SUCCESS)
+                if skipped_settings:
+                    self.stderr.write(
+                        f"    The settings {', '.join(skipped_settings)} were not "
+                        "applied, this requires recreating the index and indexing "
+                        "all data again.",
+                        self.style.WARNING,
+                    )
 
             self.stdout.write(
                 "  Initializing ingest pipelines "
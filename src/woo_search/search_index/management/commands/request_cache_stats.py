@@ -0,0 +1,43 @@
+from typing import Any
+
+from django.core.management import BaseCommand
+
+from ...client import get_client
+from ...utils import get_index_document_types
+
+
+def _format_cache_stats(stats: dict[str, Any]) -> str:
+    hits: int = stats["hit_count"]
+    misses: int = stats["miss_count"]
+    hit_ratio = f"{hits / (hits + misses):.0%}" if hits + misses else "-"
+    return (
+        f"{hits} hits, {misses} misses (hit ratio: {hit_ratio}), "
+        f"{stats['evictions']} evictions, {stats['memory_size_in_bytes']} bytes"
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the hit/miss statistics of the shard request cache and the query cache "
+        "of the indices, since the nodes were started."
+    )
+
+    def handle(self, **options):
+        index_names = sorted(
+            doc_type.Index.name for doc_type in get_index_document_types()
+        )
+        with get_client() as client:
+            response = client.indices.stats(
+                index=index_names,
+                metric=["request_cache", "query_cache"],
+            )
+
+        for index_name, stats in sorted(response.body["indices"].items()):
+            self.stdout.write(index_name, self.style.MIGRATE_LABEL)
+            self.stdout.write(
+                "  Request cache: "
+                + _format_cache_stats(stats["total"]["request_cache"])
+            )
+            self.stdout.write(
+                "  Query cache: " + _format_cache_stats(stats["total"]["query_cache"])
+            )
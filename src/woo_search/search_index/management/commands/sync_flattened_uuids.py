@@ -0,0 +1,73 @@
+from django.core.management import BaseCommand
+
+from elasticsearch.dsl import UpdateByQuery
+
+from ...client import get_client
+from ...index import FLATTENED_UUID_FIELDS, Document, Publication
+from ...utils import stores_file_contents
+
+# copy the uuids of the nested relations into the flattened fields
+SCRIPT = """
+for (def field : params.fields.entrySet()) {
+    def uuids = [];
+    def items = ctx._source[field.getValue()];
+    if (items != null) {
+        for (def item : items) {
+            uuids.add(item.uuid);
+        }
+    }
+    ctx._source[field.getKey()] = uuids;
+}
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the flattened category and topic uuid fields of the records indexed "
+        "before these fields were introduced."
+    )
+
+    def handle(self, **options):
+        verbosity = options["verbosity"]
+
+        with get_client() as client:
+            if verbosity >= 1:
+                self.stdout.write("Pinging cluster...", ending=" ")
+
+            connected = client.ping()
+            if not connected:
+                self.stdout.write("")
+                self.stderr.write(
+                    "Could not connect to configured Elastic Search host!"
+                )
+                return
+
+            if verbosity >= 1:
+                self.stdout.write("Cluster online.", self.style.SUCCESS)
+
+            doc_types = [Publication, Document]
+            if not stores_file_contents(client):
+                self.stderr.write(
+                    "The file contents of documents are not stored in the index, "
+                    "skipping the documents. Index the documents again instead.",
+                    self.style.WARNING,
+                )
+                doc_types.remove(Document)
+
+            ubq = UpdateByQuery().doc_type(*doc_types)
+            ubq = ubq.query(
+                "bool",
+                must_not=[
+                    {"exists": {"field": field}} for field in FLATTENED_UUID_FIELDS
+                ],
+            )
+            ubq = ubq.script(source=SCRIPT, params={"fields": FLATTENED_UUID_FIELDS})
+
+            ubq = ubq.using(client)
+            ubq._index = tuple(doc_type.Index.name for doc_type in doc_types)  # pyright: ignore[reportAttributeAccessIssue]
+            response = ubq.execute()
+
+            if verbosity >= 1:
+                self.stdout.write(
+                    f"Synced {response.updated} es documents", self.style.SUCCESS
+                )
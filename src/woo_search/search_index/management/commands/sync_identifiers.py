@@ -1,9 +1,10 @@
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
 
 from elasticsearch.dsl import UpdateByQuery
 
 from ...client import get_client
 from ...index import Document
+from ...utils import stores_file_contents
 
 
 class Command(BaseCommand):
@@ -30,6 +31,13 @@ class Command(BaseCommand):
             if verbosity >= 1:
                 self.stdout.write("Cluster online.", self.style.SUCCESS)
 
+            if not stores_file_contents(client):
+                raise CommandError(
+                    "The file contents of documents are not stored in the index, "
+                    "updating the documents in place would make their contents "
+                    "unsearchable. Index the documents again instead."
+                )
+
             ubq = UpdateByQuery().doc_type(Document)
 
             ubq = ubq.from_dict(
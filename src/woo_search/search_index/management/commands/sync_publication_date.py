@@ -4,6 +4,7 @@ from elasticsearch.dsl import UpdateByQuery
 
 from ...client import get_client
 from ...index import Document, Publication, Topic
+from ...utils import stores_file_contents
 
 
 class Command(BaseCommand):
@@ -27,7 +28,16 @@ class Command(BaseCommand):
             if verbosity >= 1:
                 self.stdout.write("Cluster online.", self.style.SUCCESS)
 
-            ubq = UpdateByQuery().doc_type(Document, Publication, Topic)
+            doc_types = [Publication, Document, Topic]
+            if not stores_file_contents(client):
+                self.stderr.write(
+                    "The file contents of documents are not stored in the index, "
+                    "skipping the documents. Index the documents again instead.",
+                    self.style.WARNING,
+                )
+                doc_types.remove(Document)
+
+            ubq = UpdateByQuery().doc_type(*doc_types)
 
             ubq = ubq.from_dict(
                 {
@@ -41,7 +51,7 @@ class Command(BaseCommand):
             )
 
             ubq = ubq.using(client)
-            ubq._index = (Publication.Index.name, Document.Index.name, Topic.Index.name)  # pyright: ignore[reportAttributeAccessIssue]
+            ubq._index = tuple(doc_type.Index.name for doc_type in doc_types)  # pyright: ignore[reportAttributeAccessIssue]
             response = ubq.execute()
 
             if verbosity >= 1:
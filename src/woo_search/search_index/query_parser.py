@@ -0,0 +1,289 @@
+"""
+Parse the search queries entered by users into Elastic Search queries.
+
+The supported syntax:
+
+* terms, separated by whitespace - all terms must match (implicit ``AND``)
+* ``"quoted phrases"``, matching the words in that order
+* the ``AND`` (or ``+``) and ``OR`` (or ``|``) operators, where ``AND`` takes
+  precedence over ``OR``
+* parentheses to group (sub)queries
+
+Anything else is searched for literally. The parser is lenient - unbalanced quotes
+and parentheses, and dangling operators, don't result in errors. Queries that would
+result in expensive Elastic Search queries are rejected, see :class:`QueryLimits`.
+"""
+
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Literal
+
+from django.conf import settings
+from django.utils.translation import gettext
+
+from elasticsearch.dsl import Q, Query
+
+__all__ = ["QueryTooComplex", "compile_query", "parse_query"]
+
+# the number of distinct parsed queries that are kept, per process
+PARSED_QUERIES_CACHE_SIZE = 1024
+
+# deeper nesting of parentheses is rejected
+MAX_DEPTH = 10
+
+type TokenKind = Literal["term", "phrase", "and", "or", "(", ")"]
+
+OPERATORS: dict[str, TokenKind] = {
+    "AND": "and",
+    "+": "and",
+    "OR": "or",
+    "|": "or",
+}
+
+
+class QueryTooComplex(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class QueryLimits:
+    max_clauses: int
+    """
+    The maximum number of terms and phrases.
+    """
+    max_term_length: int
+    """
+    The maximum number of characters of a term (or each word of a phrase).
+    """
+    max_phrases: int
+
+
+@dataclass(frozen=True)
+class Term:
+    text: str
+
+
+@dataclass(frozen=True)
+class Phrase:
+    text: str
+
+
+@dataclass(frozen=True)
+class And:
+    children: tuple["Node", ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    children: tuple["Node", ...]
+
+
+type Node = Term | Phrase | And | Or
+
+
+@dataclass(frozen=True)
+class Token:
+    kind: TokenKind
+    text: str = ""
+
+
+def tokenize(query: str) -> Iterator[Token]:
+    word: list[str] = []
+
+    def end_word() -> Iterator[Token]:
+        if not word:
+            return
+        text = "".join(word)
+        word.clear()
+        if (kind := OPERATORS.get(text)) is not None:
+            yield Token(kind)
+        else:
+            yield Token("term", text)
+
+    position = 0
+    while position < len(query):
+        char = query[position]
+        position += 1
+        if char.isspace():
+            yield from end_word()
+        elif char == '"':
+            yield from end_word()
+            # an unbalanced quote runs until the end of the query
+            end = query.find('"', position)
+            end = len(query) if end == -1 else end
+            if text := " ".join(query[position:end].split()):
+                yield Token("phrase", text)
+            position = end + 1
+        elif char in "()":
+            yield from end_word()
+            yield Token(char)
+        elif char in "+|":
+            yield from end_word()
+            yield Token(OPERATORS[char])
+        else:
+            word.append(char)
+    yield from end_word()
+
+
+def _combine(node_type: type[And] | type[Or], nodes: Sequence[Node]) -> Node | None:
+    children: list[Node] = []
+    for node in nodes:
+        # flatten nested operations of the same type
+        if isinstance(node, node_type):
+            children.extend(node.children)
+        else:
+            children.append(node)
+    match children:
+        case []:
+            return None
+        case [child]:
+            return child
+        case _:
+            return node_type(tuple(children))
+
+
+class _Parser:
+    """
+    Recursive descent parser of the token stream::
+
+        expression := conjunction ("or" conjunction)*
+        conjunction := operand ("and"? operand)*
+        operand := term | phrase | "(" expression ")"
+    """
+
+    def __init__(self, tokens: Sequence[Token]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> Token | None:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def parse(self) -> Node | None:
+        nodes: list[Node] = []
+        while self.peek() is not None:
+            if node := self.expression(depth=0):
+                nodes.append(node)
+            # ignore unbalanced closing parentheses
+            if (token := self.peek()) is not None and token.kind == ")":
+                self.position += 1
+        return _combine(And, nodes)
+
+    def expression(self, depth: int) -> Node | None:
+        if depth > MAX_DEPTH:
+            raise QueryTooComplex(gettext("The search query is nested too deeply."))
+        conjunctions: list[Node] = []
+        while (token := self.peek()) is not None and token.kind != ")":
+            if token.kind == "or":
+                self.position += 1
+                continue
+            if node := self.conjunction(depth):
+                conjunctions.append(node)
+        return _combine(Or, conjunctions)
+
+    def conjunction(self, depth: int) -> Node | None:
+        operands: list[Node] = []
+        while (token := self.peek()) is not None and token.kind not in ("or", ")"):
+            self.position += 1
+            match token.kind:
+                case "and":
+                    # implicit, like adjacent operands
+                    continue
+                case "term":
+                    operands.append(Term(token.text))
+                case "phrase":
+                    operands.append(Phrase(token.text))
+                case "(":
+                    if node := self.expression(depth + 1):
+                        operands.append(node)
+                    # a missing closing parenthesis closes the group at the end
+                    if (token := self.peek()) is not None and token.kind == ")":
+                        self.position += 1
+        return _combine(And, operands)
+
+
+def _iter_leaves(node: Node) -> Iterator[Term | Phrase]:
+    match node:
+        case Term() | Phrase():
+            yield node
+        case And(children) | Or(children):
+            for child in children:
+                yield from _iter_leaves(child)
+
+
+def _check_limits(node: Node, limits: QueryLimits) -> None:
+    leaves = list(_iter_leaves(node))
+    if len(leaves) > limits.max_clauses:
+        raise QueryTooComplex(
+            gettext("The search query contains more than {max_clauses} terms.").format(
+                max_clauses=limits.max_clauses
+            )
+        )
+    if sum(isinstance(leaf, Phrase) for leaf in leaves) > limits.max_phrases:
+        raise QueryTooComplex(
+            gettext(
+                "The search query contains more than {max_phrases} quoted phrases."
+            ).format(max_phrases=limits.max_phrases)
+        )
+    if any(
+        len(word) > limits.max_term_length
+        for leaf in leaves
+        for word in leaf.text.split()
+    ):
+        raise QueryTooComplex(
+            gettext(
+                "The search query contains terms longer than {max_term_length} "
+                "characters."
+            ).format(max_term_length=limits.max_term_length)
+        )
+
+
+@lru_cache(maxsize=PARSED_QUERIES_CACHE_SIZE)
+def _parse_query(query: str, limits: QueryLimits) -> Node | None:
+    node = _Parser(tuple(tokenize(query))).parse()
+    if node is not None:
+        _check_limits(node, limits)
+    return node
+
+
+def parse_query(query: str) -> Node | None:
+    """
+    Parse the search query, returning ``None`` if there's nothing to search for.
+
+    :raises QueryTooComplex: if the query exceeds the configured limits.
+    """
+    limits = QueryLimits(
+        max_clauses=settings.SEARCH_INDEX["QUERY_MAX_CLAUSES"],
+        max_term_length=settings.SEARCH_INDEX["QUERY_MAX_TERM_LENGTH"],
+        max_phrases=settings.SEARCH_INDEX["QUERY_MAX_PHRASES"],
+    )
+    return _parse_query(query, limits)
+
+
+def compile_query(node: Node, fields: Sequence[str]) -> Query:
+    """
+    Compile the parsed query into an Elastic Search query on the given fields.
+    """
+    match node:
+        case Term(text):
+            # all words of the analyzed term must match, but they may be spread over
+            # the fields (like the terms of a query are)
+            return Q(
+                "multi_match",
+                query=text,
+                fields=fields,
+                type="cross_fields",
+                operator="and",
+            )
+        case Phrase(text):
+            return Q("multi_match", query=text, fields=fields, type="phrase")
+        case And(children):
+            return Q("bool", must=[compile_query(child, fields) for child in children])
+        case Or(children):
+            return Q(
+                "bool",
+                should=[compile_query(child, fields) for child in children],
+                minimum_should_match=1,
+            )
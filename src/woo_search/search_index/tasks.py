@@ -1,72 +1,716 @@
 import base64
+import codecs
+import hashlib
 import io
+import re
 import warnings
 import zipfile
-from collections.abc import Callable, Iterator
+from collections.abc import Callable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
-from typing import IO, TypedDict
+from functools import partial
+from typing import IO, Any, TypedDict, Unpack
+from urllib.parse import quote
 
 from django.conf import settings
+from django.core.cache import cache
+from django.utils.html import strip_tags
 
 import magic
 import py7zr
 import requests
 import structlog
-from elasticsearch import NotFoundError
+from celery import Task
+from celery.signals import (
+    before_task_publish,
+    task_failure,
+    task_retry,
+    task_success,
+)
+from elasticsearch import ConflictError, Elasticsearch, NotFoundError
+from elasticsearch.dsl import Q, Query, Search, UpdateByQuery
 from zgw_consumers.client import build_client
 from zgw_consumers.models import Service
 
 from woo_search.celery import app
 
-from .client import get_client
-from .constants import DOCUMENT_ATTACHMENT_PIPELINE_ID
-from .index import Document, Publication, Topic
+from .client import CBOR_CONTENT_TYPE, get_client
+from .constants import DOCUMENT_ATTACHMENT_PIPELINE_ID, PLAIN_TEXT_MIME_TYPES
+from .index import (
+    FLATTENED_UUID_FIELDS,
+    Document,
+    Publication,
+    Topic,
+    get_document_index_name,
+    get_flattened_uuids,
+    get_publisher_alias,
+)
+from .landing_page import refresh_landing_page_results
 from .typing import NestedInformationCategoryType, NestedPublisherType, NestedTopicType
+from .utils import SizeBoundedLRUCache, stores_file_contents
 
 logger = structlog.stdlib.get_logger(__name__)
 
 
-class DocumentData(TypedDict):
-    document_data: str
+class AttachmentData(TypedDict):
+    content: str
+
+
+class DocumentData(TypedDict, total=False):
+    # base64 encoded for JSON requests, raw bytes when the CBOR transport is used
+    document_data: str | bytes
+    # set by the ingest pipeline, or directly for plain text files
+    attachment: AttachmentData
 
 
 type NestedDocumentData = list[DocumentData]
 
 
+class VersionKwargs(TypedDict, total=False):
+    version: int
+    version_type: str
+
+
+class RoutingKwargs(TypedDict, total=False):
+    routing: str
+
+
 type FileMeta = tuple[IO[bytes], int]
 
+# Index tasks are coalesced per record - when the same record is submitted multiple
+# times in quick succession, only the most recently published task is executed.
+LATEST_TASK_CACHE_TIMEOUT = 60 * 60  # 1 hour
+
+
+def _get_latest_task_cache_key(task_name: str, uuid: str) -> str:
+    return f"search_index:latest_task:{task_name}:{uuid}"
+
+
+@before_task_publish.connect
+def track_latest_index_task(
+    sender: str | None = None, headers=None, body=None, **kwargs
+):
+    """
+    Record the ID of the most recently published index task for a record.
+
+    Earlier tasks for the same record that are still in the queue compare their own
+    ID against this one and skip themselves when they've been superseded.
+    """
+    if sender not in COALESCED_TASK_NAMES or not headers or not body:
+        return
+    # task message protocol v2: body is ``(args, kwargs, embed)``
+    _, task_kwargs, _ = body
+    if not (uuid := task_kwargs.get("uuid")):
+        return
+    cache.set(
+        _get_latest_task_cache_key(sender, uuid),
+        headers["id"],
+        timeout=LATEST_TASK_CACHE_TIMEOUT,
+    )
+
+
+def _release_latest_index_task(task_name: str, task_id: str, uuid: str) -> None:
+    key = _get_latest_task_cache_key(task_name, uuid)
+    # a newer task may have been published in the meantime
+    if cache.get(key) == task_id:
+        cache.delete(key)
+
+
+@task_failure.connect
+def release_failed_index_task(
+    sender: Task | None = None, task_id: str | None = None, kwargs=None, **extra
+):
+    """
+    Let the superseded tasks for the record run when the latest task failed.
+
+    The superseded tasks that were already skipped are lost, but the ones still in
+    the queue are executed instead of being skipped too.
+    """
+    if sender is None or sender.name not in COALESCED_TASK_NAMES or not task_id:
+        return
+    if uuid := (kwargs or {}).get("uuid"):
+        _release_latest_index_task(sender.name, task_id, uuid)
+
+
+@task_retry.connect
+def release_retried_index_task(sender: Task | None = None, request=None, **extra):
+    """
+    Let the superseded tasks for the record run while the latest task is retried.
+    """
+    if sender is None or sender.name not in COALESCED_TASK_NAMES or request is None:
+        return
+    if uuid := (request.kwargs or {}).get("uuid"):
+        _release_latest_index_task(sender.name, request.id, uuid)
+
+
+def _is_superseded(task: Task, uuid: str) -> bool:
+    # not executed by a worker (e.g. called directly) -> there's nothing to coalesce
+    if (task_id := task.request.id) is None:
+        return False
+    latest_task_id = cache.get(_get_latest_task_cache_key(task.name, uuid))
+    if latest_task_id is None or latest_task_id == task_id:
+        return False
+    logger.info(
+        "index_task_skipped",
+        reason="superseded",
+        task_name=task.name,
+        record_uuid=uuid,
+        task_id=task_id,
+        latest_task_id=latest_task_id,
+    )
+    return True
+
+
+def _get_version(laatst_gewijzigd_datum: datetime) -> int:
+    return int(laatst_gewijzigd_datum.timestamp() * 1000)
+
+
+def _get_version_kwargs(laatst_gewijzigd_datum: datetime) -> VersionKwargs:
+    """
+    Derive the external version of the record from its last modification timestamp.
+
+    ``external_gte`` (rather than ``external``) is used so that re-submitting the
+    exact same record (e.g. task retries or a full reindex) is not rejected.
+    """
+    if not settings.SEARCH_INDEX["EXTERNAL_VERSIONING"]:
+        return {}
+    return {
+        "version": _get_version(laatst_gewijzigd_datum),
+        "version_type": "external_gte",
+    }
+
+
+def _get_stored_version(
+    client: Elasticsearch,
+    index_name: str,
+    uuid: str,
+    laatst_gewijzigd_datum: datetime,
+    **routing_kwargs: Unpack[RoutingKwargs],
+) -> int | None:
+    """
+    Get the version of the stored copy of the record, unless it was modified after
+    ``laatst_gewijzigd_datum``.
+
+    Every update by query (the propagated publication changes and the sync management
+    commands) increments the version of the records it updates, beyond the version
+    derived from their last modification timestamp. A write rejected because of that
+    version is not stale.
+    """
+    try:
+        response = client.get(
+            index=index_name,
+            id=uuid,
+            source_includes=["laatst_gewijzigd_datum"],
+            **routing_kwargs,
+        )
+    except NotFoundError:
+        # removed with a more recent version
+        return None
+    stored = datetime.fromisoformat(response["_source"]["laatst_gewijzigd_datum"])
+    if _get_version(stored) > _get_version(laatst_gewijzigd_datum):
+        return None
+    return response["_version"]
+
+
+def _save_versioned(
+    save: Callable[..., object],
+    client: Elasticsearch,
+    index_name: str,
+    uuid: str,
+    laatst_gewijzigd_datum: datetime,
+    **routing_kwargs: Unpack[RoutingKwargs],
+) -> None:
+    """
+    Save the record with its external version.
+
+    :arg save: Callable saving the record, with the version parameters.
+    :raises ConflictError: if a more recent copy of the record is stored.
+    """
+    version_kwargs = _get_version_kwargs(laatst_gewijzigd_datum)
+    try:
+        save(**version_kwargs)
+    except ConflictError:
+        if not version_kwargs:
+            raise
+        version = _get_stored_version(
+            client, index_name, uuid, laatst_gewijzigd_datum, **routing_kwargs
+        )
+        if version is None:
+            raise
+        # a concurrent write in between makes this conflict again
+        save(version=version, version_type="external_gte")
+
+
+def _get_routing_kwargs(publisher: NestedPublisherType) -> RoutingKwargs:
+    """
+    Route the records of a publisher to the same shard, so that searches scoped to a
+    single publisher only need to query that shard.
+    """
+    if not settings.SEARCH_INDEX["ROUTE_BY_PUBLISHER"]:
+        return {}
+    return {"routing": publisher["uuid"]}
+
+
+def _get_aliases(
+    client: Elasticsearch, index_name: str
+) -> dict[str, dict[str, dict[str, Any]]]:
+    """
+    Get the aliases of the (concrete) indices of the index or alias, by index.
+
+    The aliases are part of the cluster state, so unlike search results, they're up to
+    date.
+    """
+    try:
+        response = client.indices.get_alias(index=index_name)
+    except NotFoundError:
+        return {}
+    return {name: data["aliases"] for name, data in response.body.items()}
+
+
+def _get_stored_copies(
+    client: Elasticsearch,
+    uuid: str,
+    *,
+    aliases: Mapping[str, Mapping[str, dict[str, Any]]],
+    routed: bool,
+    exclude: tuple[str, str | None] | None = None,
+) -> list[tuple[str, str | None]]:
+    """
+    Look up the indices and routings the record is stored with.
+
+    The copies are looked up with a (real-time) multi get in each index, with the
+    routing of each publisher alias of the index if the records are routed - so
+    copies that aren't searchable yet are found too. Every routed write adds the
+    index to the alias of the publisher, see :func:`_ensure_publisher_alias`.
+
+    :arg aliases: The aliases of the indices to look up the stored copies in, see
+      :func:`_get_aliases`.
+    :arg exclude: The index and routing of a copy to ignore.
+    """
+    candidates: set[tuple[str, str | None]] = set()
+    for index_name, index_aliases in aliases.items():
+        # the publisher aliases have the routing of the publisher
+        routings = (
+            {
+                alias["index_routing"]
+                for alias in index_aliases.values()
+                if "index_routing" in alias
+            }
+            if routed
+            else {None}
+        )
+        candidates.update((index_name, routing) for routing in routings)
+    if exclude is not None:
+        candidates.discard(exclude)
+    if not candidates:
+        return []
+
+    response = client.mget(
+        docs=[
+            {"_index": index_name, "_id": uuid}
+            | ({"routing": routing} if routing else {})
+            for index_name, routing in sorted(
+                candidates, key=lambda candidate: (candidate[0], candidate[1] or "")
+            )
+        ],
+        source=False,
+    )
+    # different routing values can point to the same shard
+    stored_copies = dict.fromkeys(
+        (doc["_index"], doc.get("_routing"))
+        for doc in response["docs"]
+        if doc.get("found")
+    )
+    if exclude is not None:
+        stored_copies.pop(exclude, None)
+    return list(stored_copies)
+
+
+def _remove_moved_copies(
+    client: Elasticsearch,
+    uuid: str,
+    *,
+    aliases: Mapping[str, Mapping[str, dict[str, Any]]],
+    target_index: str,
+    routing: str | None = None,
+    **version_kwargs: Unpack[VersionKwargs],
+) -> None:
+    """
+    Prepare the index for (re-)indexing the record in the target index, with the
+    given routing.
+
+    A record that moved to another publisher is stored in another shard, and a
+    document with another registration date in another partition. The copies stored
+    previously are removed - unless they're more recent, then a
+    :class:`ConflictError` is raised.
+
+    :arg aliases: The aliases of the indices to look up the stored copies in, see
+      :func:`_get_aliases`.
+    """
+    stored_copies = _get_stored_copies(
+        client,
+        uuid,
+        aliases=aliases,
+        routed=routing is not None,
+        exclude=(target_index, routing),
+    )
+    for index_name, previous_routing in stored_copies:
+        client.delete(
+            index=index_name, id=uuid, routing=previous_routing, **version_kwargs
+        )
+        logger.info(
+            "index_record_moved",
+            index=index_name,
+            uuid=uuid,
+            previous_routing=previous_routing,
+            target_index=target_index,
+            routing=routing,
+        )
+
+
+def _ensure_publisher_alias(
+    client: Elasticsearch,
+    index_name: str,
+    routing: str,
+    *,
+    aliases: Mapping[str, Mapping[str, dict[str, Any]]],
+) -> None:
+    """
+    Add the index to the filtered alias of the publisher, if needed.
+
+    :arg aliases: The current aliases of the indices, see :func:`_get_aliases`. The
+      document partitions are created on the fly, so the alias is checked per index.
+    """
+    alias = get_publisher_alias(routing)
+    if alias in aliases.get(index_name, {}):
+        return
+    client.indices.put_alias(
+        index=index_name,
+        name=alias,
+        filter={"term": {"publisher.uuid.keyword": routing}},
+        routing=routing,
+    )
+
+
+def _delete_from_index(client: Elasticsearch, index_name: str, uuid: str) -> bool:
+    """
+    Remove the record from the index, returning whether it was found.
+    """
+    routed = (
+        index_name != Topic.Index.name and settings.SEARCH_INDEX["ROUTE_BY_PUBLISHER"]
+    )
+    partitioned = (
+        index_name == Document.Index.name
+        and settings.SEARCH_INDEX["DOCUMENT_PARTITIONING"]
+    )
+    if not (routed or partitioned):
+        try:
+            client.delete(index=index_name, id=uuid)
+        except NotFoundError:
+            return False
+        return True
+
+    # the routing (publisher) and/or partition (registration date) of the record are
+    # unknown - remove it from all (routed) shards of all partitions in a single
+    # request
+    response = client.delete_by_query(
+        index=index_name,
+        query={"ids": {"values": [uuid]}},
+        conflicts="proceed",
+    )
+    return response["deleted"] > 0
+
+
+# the contents of these HTML elements are code, not text - note that an unclosed
+# element runs until the end of the document
+NON_TEXT_HTML_ELEMENTS = re.compile(
+    r"<(script|style)\b.*?(?:</\1\s*>|$)", re.IGNORECASE | re.DOTALL
+)
+
+
+def _strip_html(content: str) -> str:
+    return strip_tags(NON_TEXT_HTML_ELEMENTS.sub(" ", content))
+
+
+def _decode_text(file_contents: bytes) -> str:
+    encoding = magic.Magic(mime_encoding=True).from_buffer(file_contents)
+    try:
+        codec = codecs.lookup(encoding)
+    except LookupError:  # e.g. 'binary' or 'unknown-8bit'
+        codec = codecs.lookup("utf-8")
+    # strip the byte order mark, if present
+    if codec.name == "utf-8":
+        codec = codecs.lookup("utf-8-sig")
+    return codec.decode(file_contents, "replace")[0]
+
+
+# Prepared payloads of file contents, by content hash. The same files (e.g. a
+# standard form) are often attached to many documents, or included multiple times in
+# an archive - those only need to be prepared once per worker process.
+type PayloadCacheKey = tuple[str, str, bool, bool, int]
+
+payload_cache: SizeBoundedLRUCache[PayloadCacheKey, DocumentData] = (
+    SizeBoundedLRUCache()
+)
+
+
+def _get_payload_size(document_data: DocumentData) -> int:
+    if "attachment" in document_data:
+        return len(document_data["attachment"]["content"])
+    return len(document_data.get("document_data", ""))
+
+
+def _get_document_data(file_contents: bytes, mime_type: str) -> DocumentData:
+    if not (max_size := settings.SEARCH_INDEX["PAYLOAD_CACHE_SIZE"]):
+        return _prepare_document_data(file_contents, mime_type)
+
+    # the payload depends on these settings too
+    key: PayloadCacheKey = (
+        hashlib.sha256(file_contents).hexdigest(),
+        mime_type,
+        settings.SEARCH_INDEX["EXTRACT_PLAIN_TEXT"],
+        settings.SEARCH_INDEX["CBOR_TRANSPORT"],
+        settings.SEARCH_INDEX["INDEXED_CHARS"],
+    )
+    if (document_data := payload_cache.get(key)) is not None:
+        logger.debug("payload_cache_hit", content_hash=key[0])
+        return document_data
+
+    document_data = _prepare_document_data(file_contents, mime_type)
+    payload_cache.set(
+        key, document_data, size=_get_payload_size(document_data), max_size=max_size
+    )
+    return document_data
+
+
+def _prepare_document_data(file_contents: bytes, mime_type: str) -> DocumentData:
+    if (
+        settings.SEARCH_INDEX["EXTRACT_PLAIN_TEXT"]
+        and mime_type in PLAIN_TEXT_MIME_TYPES
+        and mime_type in settings.SEARCH_INDEXABLE_FILE_TYPES
+    ):
+        content = _decode_text(file_contents)
+        if mime_type == "text/html":
+            content = _strip_html(content)
+        # mimic the attachment processor output
+        content = content.strip()
+        if (indexed_chars := settings.SEARCH_INDEX["INDEXED_CHARS"]) >= 0:
+            content = content[:indexed_chars]
+        return {"attachment": {"content": content}}
+
+    if settings.SEARCH_INDEX["CBOR_TRANSPORT"]:
+        return {"document_data": file_contents}
+    return {"document_data": base64.b64encode(file_contents).decode("ascii")}
+
+
+# chunk size for incremental reads of archive members
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def _exceeds_compression_ratio(uncompressed_size: int, compressed_size: int) -> bool:
+    max_ratio = settings.SEARCH_INDEX["MAX_COMPRESSION_RATIO"]
+    return uncompressed_size > max_ratio * max(compressed_size, 1)
+
+
+def _read_bounded(file: IO[bytes], max_size: int) -> bytes | None:
+    """
+    Read the file in chunks, aborting as soon as more than ``max_size`` bytes are
+    read.
+
+    Archive headers can lie about the uncompressed size of their members - this
+    guarantees that we never hold more in memory than what was accounted for.
+    Returns ``None`` if the file turns out to be larger than ``max_size``.
+    """
+    buffer = bytearray()
+    while chunk := file.read(min(READ_CHUNK_SIZE, max_size + 1 - len(buffer))):
+        buffer += chunk
+        if len(buffer) > max_size:
+            return None
+    return bytes(buffer)
+
 
 def _iter_zip_content(document_file: io.BytesIO) -> Iterator[FileMeta]:
     with zipfile.ZipFile(file=document_file, mode="r") as zip_file:
         for info in zip_file.infolist():
-            with zip_file.open(info.filename) as file:
-                yield file, info.file_size
+            # inspect the central directory before decompressing anything
+            if _exceeds_compression_ratio(info.file_size, info.compress_size):
+                logger.warning(
+                    "file_skipped",
+                    reason="compression_ratio_exceeded",
+                    filename=info.filename,
+                    file_size=info.file_size,
+                    compressed_size=info.compress_size,
+                )
+                continue
+            # the member is read (and closed) by the consumer, which may happen after
+            # the next members have been opened
+            yield zip_file.open(info.filename), info.file_size
 
 
 def _iter_7z_content(document_file: io.BytesIO) -> Iterator[FileMeta]:
+    max_size = settings.SEARCH_INDEX["MAX_INDEX_FILE_SIZE"]
     with py7zr.SevenZipFile(document_file, mode="r") as zip_file:
-        if not (zip_file_dict := zip_file.readall()):
+        members = [info for info in zip_file.list() if not info.is_directory]
+        # members of solid archives don't have an individual compressed size, so the
+        # ratio is checked for the archive as a whole
+        total_size = sum(info.uncompressed for info in members)
+        if _exceeds_compression_ratio(total_size, document_file.getbuffer().nbytes):
+            logger.warning(
+                "archive_skipped",
+                reason="compression_ratio_exceeded",
+                uncompressed_size=total_size,
+            )
             return
-        filesizes: dict[str, int] = {
-            file_info.filename: file_info.uncompressed for file_info in zip_file.list()
-        }
-        for name, file in zip_file_dict.items():
-            yield file, filesizes[name]
+
+        # read the members in batches that fit in the index size budget rather than
+        # decompressing everything at once - together with the members selected for
+        # indexing, a task holds at most twice the budget in decompressed data.
+        # Members that exceed the budget on their own can never be indexed, so
+        # they're not decompressed at all.
+        batch: dict[str, int] = {}
+        batch_size = 0
+        for info in members:
+            if info.uncompressed > max_size:
+                logger.debug("file_skipped", reason="exceeding_max_index_file_size")
+                continue
+            if info.compressed and _exceeds_compression_ratio(
+                info.uncompressed, info.compressed
+            ):
+                logger.warning(
+                    "file_skipped",
+                    reason="compression_ratio_exceeded",
+                    filename=info.filename,
+                    file_size=info.uncompressed,
+                    compressed_size=info.compressed,
+                )
+                continue
+            if batch and batch_size + info.uncompressed > max_size:
+                yield from _read_7z_members(zip_file, batch)
+                batch, batch_size = {}, 0
+            batch[info.filename] = info.uncompressed
+            batch_size += info.uncompressed
+
+        if batch:
+            yield from _read_7z_members(zip_file, batch)
+
+
+class DeclaredSizeExceeded(Exception):
+    def __init__(self, filename: str):
+        super().__init__(filename)
+        self.filename = filename
+
+
+class BoundedMemoryWriter(py7zr.Py7zIO):
+    """
+    Collect a decompressed 7z member in memory, aborting the decompression as soon as
+    it exceeds its declared size.
+    """
+
+    def __init__(self, filename: str, max_size: int):
+        self.filename = filename
+        self.max_size = max_size
+        self.file = io.BytesIO()
+
+    def write(self, s: bytes | bytearray) -> int:
+        if self.file.tell() + len(s) > self.max_size:
+            raise DeclaredSizeExceeded(self.filename)
+        return self.file.write(s)
+
+    def read(self, size: int | None = None) -> bytes:
+        return self.file.read(size)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self.file.seek(offset, whence)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def size(self) -> int:
+        return self.file.getbuffer().nbytes
+
+
+class BoundedMemoryWriterFactory(py7zr.WriterFactory):
+    def __init__(self, filesizes: Mapping[str, int]):
+        self.filesizes = filesizes
+        # in the order of decompression
+        self.writers: dict[str, BoundedMemoryWriter] = {}
+
+    def create(self, filename: str) -> BoundedMemoryWriter:
+        writer = self.writers[filename] = BoundedMemoryWriter(
+            filename, max_size=self.filesizes.get(filename, 0)
+        )
+        return writer
+
+
+def _read_7z_members(
+    zip_file: py7zr.SevenZipFile, filesizes: Mapping[str, int]
+) -> Iterator[FileMeta]:
+    """
+    Decompress the members into memory, but never more than their declared size.
+
+    The archive headers can lie about the uncompressed sizes. The decompression of a
+    member is aborted with the first block (written by py7zr) that exceeds its declared
+    size, the member is skipped and the remaining members are decompressed.
+    """
+    targets = list(filesizes)
+    while targets:
+        factory = BoundedMemoryWriterFactory(filesizes)
+        try:
+            zip_file.extract(targets=targets, factory=factory)
+        except DeclaredSizeExceeded as exc:
+            logger.warning(
+                "file_skipped",
+                reason="exceeding_declared_file_size",
+                filename=exc.filename,
+            )
+            del factory.writers[exc.filename]
+            targets = [
+                name
+                for name in targets
+                if name != exc.filename and name not in factory.writers
+            ]
+        else:
+            targets = []
+        finally:
+            # rewind for the next extraction
+            zip_file.reset()
+
+        for name, writer in factory.writers.items():
+            writer.file.seek(0)
+            yield writer.file, filesizes[name]
+
+
+def _read_archive_member(
+    member: tuple[IO[bytes], int, str],
+) -> DocumentData | None:
+    file, size_in_bytes, document_mime = member
+    with file:
+        # now read the full file, but never more than what was accounted for
+        file.seek(0)
+        if (file_contents := _read_bounded(file, size_in_bytes)) is None:
+            logger.warning("file_skipped", reason="exceeding_declared_file_size")
+            return None
+    return _get_document_data(file_contents, document_mime)
 
 
 def _extract_documents(
     document_file: io.BytesIO,
     iter_archive: Callable[[io.BytesIO], Iterator[FileMeta]],
 ) -> NestedDocumentData:
-    file_list: NestedDocumentData = []
+    selected: list[tuple[IO[bytes], int, str]] = []
     total_size: int = 0
 
+    # Select the files to index first - this only needs the file type and the
+    # declared size, so the (relatively expensive) decompression and encoding of
+    # the files can happen concurrently afterwards, without affecting which files
+    # fit in the budget.
     for file, size_in_bytes in iter_archive(document_file):
         document_mime = magic.from_buffer(file.read(2048), mime=True)
         # NOTE: we deliberately do not recurse into nested archives, see
         # https://github.com/GPP-Woo/GPP-zoeken/pull/89#issuecomment-2890840775
         if document_mime not in settings.SEARCH_INDEXABLE_FILE_TYPES:
             logger.debug("file_skipped", mime_type=document_mime)
+            file.close()
             continue
 
         # update the total size based on the non-base64 encoded file size - we don't
@@ -75,22 +719,25 @@ def _extract_documents(
         new_total_size = total_size + size_in_bytes
         if new_total_size > settings.SEARCH_INDEX["MAX_INDEX_FILE_SIZE"]:
             logger.debug("file_skipped", reason="exceeding_max_index_file_size")
+            file.close()
             continue
 
-        # okay, we have headroom, prepare the file and next loop iteration
+        # okay, we have headroom, select the file and next loop iteration
         total_size = new_total_size
-        # now read the full file - there's still a risk if going OOM here if the
-        # compression ratio is very high
-        file.seek(0)
-        file_contents = file.read()
-        document_data = base64.b64encode(file_contents).decode("ascii")
-        file_list.append({"document_data": document_data})
+        selected.append((file, size_in_bytes, document_mime))
 
         # once our limit is reached, we can stop processing the archives entirely
         if total_size >= settings.SEARCH_INDEX["MAX_INDEX_FILE_SIZE"]:
             break
 
-    return file_list
+    # decompression (zlib, lzma...) releases the GIL, so threads suffice
+    with ThreadPoolExecutor(
+        max_workers=settings.SEARCH_INDEX["ARCHIVE_EXTRACTION_THREADS"]
+    ) as executor:
+        # map preserves the order of the files in the archive
+        document_data = list(executor.map(_read_archive_member, selected))
+
+    return [data for data in document_data if data is not None]
 
 
 def _download_document(document_url: str) -> NestedDocumentData | None:
@@ -138,13 +785,36 @@ def _download_document(document_url: str) -> NestedDocumentData | None:
             case "application/x-7z-compressed":
                 return list(_extract_documents(document_file, _iter_7z_content))
             case _:
-                return [
-                    {
-                        "document_data": base64.b64encode(response.content).decode(
-                            "ascii"
-                        )
-                    }
-                ]
+                return [_get_document_data(response.content, document_mime)]
+
+
+def _requires_ingest_pipeline(file_data: NestedDocumentData | None) -> bool:
+    # without plain text extraction, the pipeline takes care of all file formats
+    if not settings.SEARCH_INDEX["EXTRACT_PLAIN_TEXT"]:
+        return True
+    # only binary file content needs the attachment processor
+    return any("document_data" in data for data in file_data or ())
+
+
+def _save_document(
+    client: Elasticsearch, document: Document, index: str, **params
+) -> None:
+    if not settings.SEARCH_INDEX["CBOR_TRANSPORT"] or not document.document_data:
+        document.save(using=client, index=index, **params)
+        return
+
+    # Elasticsearch-DSL (and the index API of the client) always send JSON, so the
+    # index request is performed directly to be able to send the body as CBOR.
+    document.full_clean()
+    client.perform_request(
+        "PUT",
+        f"/{quote(index, safe='')}/_doc/{quote(document.meta.id, safe='')}",
+        params=params,
+        headers={"accept": "application/json", "content-type": CBOR_CONTENT_TYPE},
+        body=document.to_dict(),
+        endpoint_id="index",
+        path_parts={"index": index, "id": document.meta.id},
+    )
 
 
 @app.task()
@@ -167,6 +837,9 @@ def index_document(
     download_url: str = "",
     file_size: int | None = None,
 ):
+    if _is_superseded(index_document, uuid):
+        return
+
     if identifier:
         warnings.warn(
             "'identifier' is deprecated, use 'identifiers' list instead",
@@ -191,19 +864,66 @@ def index_document(
         laatst_gewijzigd_datum=laatst_gewijzigd_datum,
     )
 
+    file_data: NestedDocumentData | None = None
     if (
         download_url
         and file_size
         and file_size <= settings.SEARCH_INDEX["MAX_INDEX_FILE_SIZE"]
     ):
-        document.document_data = _download_document(document_url=download_url)
+        file_data = _download_document(document_url=download_url)
+        document.document_data = file_data
+
+    pipeline_kwargs = (
+        {"pipeline": DOCUMENT_ATTACHMENT_PIPELINE_ID}
+        if _requires_ingest_pipeline(file_data)
+        else {}
+    )
+
+    routing_kwargs = _get_routing_kwargs(publisher)
+    version_kwargs = _get_version_kwargs(laatst_gewijzigd_datum)
+    # the partition when the documents are partitioned by registration date
+    index_name = get_document_index_name(registratiedatum)
 
     with get_client() as client:
-        document.save(
-            using=client,
-            refresh=settings.SEARCH_INDEX["REFRESH"],
-            pipeline=DOCUMENT_ATTACHMENT_PIPELINE_ID,
-        )
+        try:
+            aliases = {}
+            if routing_kwargs or index_name != Document.Index.name:
+                aliases = _get_aliases(client, Document.Index.name)
+                _remove_moved_copies(
+                    client,
+                    uuid,
+                    aliases=aliases,
+                    target_index=index_name,
+                    **routing_kwargs,
+                    **version_kwargs,
+                )
+            _save_versioned(
+                partial(
+                    _save_document,
+                    client,
+                    document,
+                    index=index_name,
+                    refresh=settings.SEARCH_INDEX["REFRESH"],
+                    **pipeline_kwargs,
+                    **routing_kwargs,
+                ),
+                client,
+                index_name,
+                uuid,
+                laatst_gewijzigd_datum,
+                **routing_kwargs,
+            )
+            if routing_kwargs:
+                _ensure_publisher_alias(
+                    client, index_name, aliases=aliases, **routing_kwargs
+                )
+        except ConflictError as exc:
+            logger.info(
+                "index_write_rejected",
+                reason="stale_version",
+                document_uuid=uuid,
+                exc_info=exc,
+            )
 
 
 @app.task()
@@ -214,19 +934,107 @@ def remove_document_from_index(uuid: str) -> None:
     :arg uuid: The ID of the document in Elastic Search.
     """
     with get_client() as client:
-        try:
-            document = Document.get(using=client, id=uuid)
-            assert document is not None
-        except NotFoundError as exc:
+        if not _delete_from_index(client, Document.Index.name, uuid):
             logger.info(
                 "index_removal_aborted",
                 reason="document_not_found",
                 document_uuid=uuid,
-                exc_info=exc,
             )
+
+
+# The publication fields that are copied onto each document of the publication.
+DENORMALIZED_PUBLICATION_FIELDS = ("informatie_categorieen", "onderwerpen", "publisher")
+
+
+def _get_publication_documents_query(uuid: str) -> Query:
+    # publicatie is a text field - the phrase query ensures all the (analyzed) parts of
+    # the UUID match in order
+    return Q("match_phrase", publicatie=uuid)
+
+
+def _get_changed_denormalized_fields(
+    client: Elasticsearch,
+    publication: Publication,
+    **routing_kwargs: Unpack[RoutingKwargs],
+) -> dict[str, Any]:
+    """
+    Compare the publication with the indexed version and return the changed fields
+    that are denormalized onto its documents.
+    """
+    try:
+        response = client.get(
+            index=Publication.Index.name,
+            id=publication.meta.id,
+            source_includes=list(DENORMALIZED_PUBLICATION_FIELDS),
+            **routing_kwargs,
+        )
+    except NotFoundError:
+        current = {}
+    else:
+        current = response["_source"]
+
+    new = publication.to_dict(skip_empty=False)
+    changes = {
+        field: new[field]
+        for field in DENORMALIZED_PUBLICATION_FIELDS
+        # empty values are not stored in the index
+        if (current.get(field) or None) != (new[field] or None)
+    }
+    # keep the flattened copies in sync with the nested relations
+    for field, nested_field in FLATTENED_UUID_FIELDS.items():
+        if nested_field in changes:
+            changes[field] = get_flattened_uuids(changes[nested_field])
+    return changes
+
+
+def _propagate_to_documents(
+    client: Elasticsearch, publication_uuid: str, changes: dict[str, Any]
+) -> None:
+    """
+    Update the denormalized publication fields of all documents of the publication
+    with a single update-by-query operation, avoiding a full reindex of each
+    document (including the file download and text extraction).
+    """
+    if "publisher" in changes and settings.SEARCH_INDEX["ROUTE_BY_PUBLISHER"]:
+        # the documents are routed by publisher - they need to move to another shard,
+        # which requires indexing them again
+        logger.warning(
+            "publication_documents_not_rerouted",
+            publication_uuid=publication_uuid,
+        )
+        changes = {
+            field: value for field, value in changes.items() if field != "publisher"
+        }
+        if not changes:
             return
-        else:
-            document.delete(using=client)
+
+    if not stores_file_contents(client):
+        logger.warning(
+            "publication_documents_not_updated",
+            reason="file_contents_not_stored",
+            publication_uuid=publication_uuid,
+            fields=sorted(changes),
+        )
+        return
+
+    script = "; ".join(f"ctx._source.{field} = params.{field}" for field in changes)
+    response = (
+        UpdateByQuery(index=Document.Index.name)
+        .query(_get_publication_documents_query(publication_uuid))
+        .script(source=script, params=changes)
+        .params(
+            conflicts="proceed",
+            refresh=bool(settings.SEARCH_INDEX["REFRESH"]),
+        )
+        .using(client)
+        .execute()
+    )
+    logger.info(
+        "publication_documents_updated",
+        publication_uuid=publication_uuid,
+        fields=sorted(changes),
+        updated=response.updated,
+    )
 
 
 @app.task()
@@ -246,6 +1054,9 @@ def index_publication(
     datum_begin_geldigheid: datetime | None,
     datum_einde_geldigheid: datetime | None,
 ):
+    if _is_superseded(index_publication, uuid):
+        return
+
     publication = Publication(
         _id=uuid,
         uuid=uuid,
@@ -263,31 +1074,92 @@ def index_publication(
         datum_einde_geldigheid=datum_einde_geldigheid,
     )
 
+    routing_kwargs = _get_routing_kwargs(publisher)
+
     with get_client() as client:
-        publication.save(using=client, refresh=settings.SEARCH_INDEX["REFRESH"])
+        propagate = settings.SEARCH_INDEX["PROPAGATE_PUBLICATION_CHANGES"]
+        changes = (
+            _get_changed_denormalized_fields(client, publication, **routing_kwargs)
+            if propagate
+            else {}
+        )
+        version_kwargs = _get_version_kwargs(laatst_gewijzigd_datum)
+
+        try:
+            aliases = {}
+            if routing_kwargs:
+                aliases = _get_aliases(client, Publication.Index.name)
+                _remove_moved_copies(
+                    client,
+                    uuid,
+                    aliases=aliases,
+                    target_index=Publication.Index.name,
+                    **routing_kwargs,
+                    **version_kwargs,
+                )
+            _save_versioned(
+                partial(
+                    publication.save,
+                    using=client,
+                    refresh=settings.SEARCH_INDEX["REFRESH"],
+                    **routing_kwargs,
+                ),
+                client,
+                Publication.Index.name,
+                uuid,
+                laatst_gewijzigd_datum,
+                **routing_kwargs,
+            )
+            if routing_kwargs:
+                _ensure_publisher_alias(
+                    client, Publication.Index.name, aliases=aliases, **routing_kwargs
+                )
+        except ConflictError as exc:
+            logger.info(
+                "index_write_rejected",
+                reason="stale_version",
+                publication_uuid=uuid,
+                exc_info=exc,
+            )
+            return
+
+        if changes:
+            _propagate_to_documents(client, publication_uuid=uuid, changes=changes)
 
 
 @app.task()
-def remove_publication_from_index(uuid: str) -> None:
+def remove_publication_from_index(uuid: str, cascade: bool = False) -> None:
     """
     If the publication with specified ``uuid`` is present in the index, remove it.
 
-    :arg uuid: The ID of the document in Elastic Search.
+    :arg uuid: The ID of the publication in Elastic Search.
+    :arg cascade: If ``True``, also remove all documents belonging to the publication
+      from the index, in a single delete-by-query operation.
     """
     with get_client() as client:
-        try:
-            publication = Publication.get(using=client, id=uuid)
-            assert publication is not None
-        except NotFoundError as exc:
+        if cascade:
+            response = (
+                Search(index=Document.Index.name)
+                .query(_get_publication_documents_query(uuid))
+                .params(
+                    conflicts="proceed",
+                    refresh=bool(settings.SEARCH_INDEX["REFRESH"]),
+                )
+                .using(client)
+                .delete()
+            )
+            logger.info(
+                "publication_documents_removed",
+                publication_uuid=uuid,
+                removed=response.deleted,
+            )
+
+        if not _delete_from_index(client, Publication.Index.name, uuid):
             logger.info(
                 "index_removal_aborted",
                 reason="publication_not_found",
                 publication_uuid=uuid,
-                exc_info=exc,
             )
-            return
-        else:
-            publication.delete(using=client)
 
 
 @app.task()
@@ -298,6 +1170,9 @@ def index_topic(
     registratiedatum: datetime,
     laatst_gewijzigd_datum: datetime,
 ):
+    if _is_superseded(index_topic, uuid):
+        return
+
     topic = Topic(
         _id=uuid,
         uuid=uuid,
@@ -309,7 +1184,23 @@ def index_topic(
     )
 
     with get_client() as client:
-        topic.save(using=client, refresh=settings.SEARCH_INDEX["REFRESH"])
+        try:
+            _save_versioned(
+                partial(
+                    topic.save, using=client, refresh=settings.SEARCH_INDEX["REFRESH"]
+                ),
+                client,
+                Topic.Index.name,
+                uuid,
+                laatst_gewijzigd_datum,
+            )
+        except ConflictError as exc:
+            logger.info(
+                "index_write_rejected",
+                reason="stale_version",
+                topic_uuid=uuid,
+                exc_info=exc,
+            )
 
 
 @app.task()
@@ -320,16 +1211,63 @@ def remove_topic_from_index(uuid: str) -> None:
     :arg uuid: The ID of the topic in Elastic Search.
     """
     with get_client() as client:
-        try:
-            topic = Topic.get(using=client, id=uuid)
-            assert topic is not None
-        except NotFoundError as exc:
+        if not _delete_from_index(client, Topic.Index.name, uuid):
             logger.info(
                 "index_removal_aborted",
                 reason="topic_not_found",
                 topic_uuid=uuid,
-                exc_info=exc,
             )
-            return
-        else:
-            topic.delete(using=client)
+
+
+COALESCED_TASK_NAMES = frozenset(
+    task.name for task in (index_document, index_publication, index_topic)
+)
+
+
+# Wait for the changes to become searchable before refreshing the landing page
+# search, which also bundles the changes of bulk (re-)indexing into a single refresh.
+LANDING_PAGE_REFRESH_DELAY = 10  # seconds
+LANDING_PAGE_REFRESH_SCHEDULED_CACHE_KEY = "search_index:landing_page:scheduled"
+
+
+@app.task()
+def refresh_landing_page() -> None:
+    """
+    Precompute the results of the landing page search.
+    """
+    if not settings.SEARCH_INDEX["LANDING_PAGE_REFRESH_INTERVAL"]:
+        return
+    # changes from now on need another refresh
+    cache.delete(LANDING_PAGE_REFRESH_SCHEDULED_CACHE_KEY)
+    refresh_landing_page_results()
+
+
+INDEX_TASK_NAMES = frozenset(
+    task.name
+    for task in (
+        index_document,
+        remove_document_from_index,
+        index_publication,
+        remove_publication_from_index,
+        index_topic,
+        remove_topic_from_index,
+    )
+)
+
+
+@task_success.connect
+def schedule_landing_page_refresh(sender: Task | None = None, **kwargs):
+    """
+    Refresh the landing page search shortly after the indexed records changed.
+    """
+    if sender is None or sender.name not in INDEX_TASK_NAMES:
+        return
+    if not settings.SEARCH_INDEX["LANDING_PAGE_REFRESH_INTERVAL"]:
+        return
+    # a single refresh covers all changes until it starts
+    if cache.add(
+        LANDING_PAGE_REFRESH_SCHEDULED_CACHE_KEY,
+        True,
+        timeout=2 * LANDING_PAGE_REFRESH_DELAY,
+    ):
+        refresh_landing_page.apply_async(countdown=LANDING_PAGE_REFRESH_DELAY)
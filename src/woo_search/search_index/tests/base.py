@@ -10,6 +10,7 @@ from rest_framework.test import APITestCase
 from woo_search.conf.utils import config
 from woo_search.search_index.client import get_client
 
+from ..facets import facet_labels
 from ..ingest import setup_document_attachment_processor
 from ..utils import get_index_document_types
 
@@ -17,18 +18,51 @@ CI = config("CI", default=False)  # Github actions sets this to True
 
 logger = structlog.stdlib.get_logger(__name__)
 
-override_es_settings = override_settings(
-    SEARCH_INDEX={
-        "HOST": "http://localhost:9201",
-        "USER": "",
-        "PASSWORD": "",
-        "TIMEOUT": 3,
-        "CA_CERTS": "",
-        "REFRESH": "wait_for",
-        "INDEXED_CHARS": -1,
-        "MAX_INDEX_FILE_SIZE": 1 * 1000 * 1000,
-    }
-)
+ES_TEST_SETTINGS = {
+    "HOST": "http://localhost:9201",
+    "USER": "",
+    "PASSWORD": "",
+    "TIMEOUT": 3,
+    "CA_CERTS": "",
+    "REFRESH": "wait_for",
+    "INDEXED_CHARS": -1,
+    "MAX_INDEX_FILE_SIZE": 1 * 1000 * 1000,
+    # the version is derived from (generated) timestamps, which would make the
+    # request URLs unpredictable for the VCR cassettes
+    "EXTERNAL_VERSIONING": False,
+    "PROPAGATE_PUBLICATION_CHANGES": False,
+    "CBOR_TRANSPORT": False,
+    # the recorded cassettes include the ingest pipeline in the request URLs
+    "EXTRACT_PLAIN_TEXT": False,
+    "MAX_COMPRESSION_RATIO": 100,
+    "ARCHIVE_EXTRACTION_THREADS": 4,
+    "PAYLOAD_CACHE_SIZE": 0,
+    "STORE_FILE_CONTENTS": True,
+    "HIGHLIGHT_FRAGMENT_SIZE": 150,
+    "HIGHLIGHT_NUMBER_OF_FRAGMENTS": 3,
+    "SUGGEST_TIMEOUT": 200,
+    "COALESCE_SEARCHES": True,
+    "COALESCE_SEARCHES_ACROSS_PROCESSES": False,
+    "SEARCH_TIMEOUT": 5000,
+    "DEGRADED_SEARCH_THRESHOLD": 2000,
+    "CIRCUIT_BREAKER_FAILURE_THRESHOLD": 5,
+    "CIRCUIT_BREAKER_RESET_TIMEOUT": 30,
+    "REQUEST_CACHE_DATE_ROUNDING": "",
+    "FACET_LABELS_TTL": 300,
+    "NUMBER_OF_SHARDS": 1,
+    "REFRESH_INTERVAL": "1s",
+    "INDEX_CODEC": "best_compression",
+    "TRACK_TOTAL_HITS": 10000,
+    "ROUTE_BY_PUBLISHER": False,
+    "DOCUMENT_PARTITIONING": "",
+    "LANDING_PAGE_REFRESH_INTERVAL": 0,
+    "IDENTIFIER_QUERY_PATTERNS": [],
+    "QUERY_MAX_CLAUSES": 128,
+    "QUERY_MAX_TERM_LENGTH": 100,
+    "QUERY_MAX_PHRASES": 5,
+}
+
+override_es_settings = override_settings(SEARCH_INDEX=ES_TEST_SETTINGS)
 
 
 class ElasticSearchMixin:
@@ -92,6 +126,9 @@ class ElasticSearchMixin:
     def setUp(self) -> None:
         super().setUp()  # pyright: ignore[reportAttributeAccessIssue]
 
+        # the labels are loaded from the (recorded) index contents of each test
+        facet_labels.clear()
+
         if not self._es_online:
             return
 
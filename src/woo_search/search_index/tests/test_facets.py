@@ -0,0 +1,259 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from elastic_transport import ConnectionError
+
+from ..facets import FacetKind, FacetLabelRegistry
+
+PUBLISHER_UUID = "e0eb40f7-eacb-45dc-973a-2e8480f49b76"
+CATEGORY_UUID = "08462836-ee16-4ac1-a762-0c4cee0893bf"
+TOPIC_UUID = "f34eca58-201c-4ee5-ae35-f89d88d58fb8"
+
+
+def _bucket(uuid: str, source: dict) -> dict:
+    return {
+        "key": uuid,
+        "doc_count": 1,
+        "Latest": {
+            "hits": {
+                "total": {"value": 1, "relation": "eq"},
+                "hits": [{"_index": "publication", "_id": "1", "_source": source}],
+            }
+        },
+    }
+
+
+def get_refresh_response(publisher_name: str = "Maycatt") -> dict:
+    return {
+        "took": 1,
+        "timed_out": False,
+        "_shards": {"total": 2, "successful": 2, "skipped": 0, "failed": 0},
+        "hits": {"hits": []},
+        "aggregations": {
+            "publisher": {
+                "buckets": [
+                    _bucket(
+                        PUBLISHER_UUID,
+                        {"publisher": {"uuid": PUBLISHER_UUID, "naam": publisher_name}},
+                    )
+                ]
+            },
+            "information_category": {
+                "buckets": [
+                    _bucket(
+                        CATEGORY_UUID,
+                        {
+                            "informatie_categorieen": [
+                                {"uuid": "other", "naam": "Other"},
+                                {"uuid": CATEGORY_UUID, "naam": "Convenant"},
+                            ]
+                        },
+                    )
+                ]
+            },
+            "topic": {
+                "buckets": [
+                    _bucket(
+                        TOPIC_UUID,
+                        {
+                            "onderwerpen": [
+                                {"uuid": TOPIC_UUID, "officiele_titel": "Verkeer"}
+                            ]
+                        },
+                    )
+                ]
+            },
+        },
+    }
+
+
+@patch("woo_search.search_index.facets.time.monotonic", return_value=1000.0)
+class FacetLabelRegistryTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.registry = FacetLabelRegistry()
+        self.es_client = MagicMock()
+        self.es_client.search.return_value.body = get_refresh_response()
+
+    def test_labels_are_loaded_from_the_index(self, mock_monotonic: MagicMock):
+        labels = self.registry.get_labels(
+            self.es_client,
+            {
+                "publisher": [PUBLISHER_UUID],
+                "information_category": [CATEGORY_UUID],
+                "topic": [TOPIC_UUID],
+            },
+            ttl=300,
+        )
+
+        self.assertEqual(
+            labels,
+            {
+                "publisher": {PUBLISHER_UUID: "Maycatt"},
+                "information_category": {CATEGORY_UUID: "Convenant"},
+                "topic": {TOPIC_UUID: "Verkeer"},
+            },
+        )
+        self.es_client.search.assert_called_once()
+        aggs = self.es_client.search.call_args.kwargs["body"]["aggs"]
+        self.assertEqual(aggs["publisher"]["terms"]["field"], "publisher.uuid.keyword")
+
+    def test_labels_are_cached(self, mock_monotonic: MagicMock):
+        uuids: dict[FacetKind, list[str]] = {"publisher": [PUBLISHER_UUID]}
+        self.registry.get_labels(self.es_client, uuids, ttl=300)
+        self.es_client.search.return_value.body = get_refresh_response("Dimpact")
+
+        mock_monotonic.return_value += 299
+        labels = self.registry.get_labels(self.es_client, uuids, ttl=300)
+
+        self.assertEqual(labels, {"publisher": {PUBLISHER_UUID: "Maycatt"}})
+        self.es_client.search.assert_called_once()
+
+    def test_labels_are_refreshed_when_expired(self, mock_monotonic: MagicMock):
+        uuids: dict[FacetKind, list[str]] = {"publisher": [PUBLISHER_UUID]}
+        self.registry.get_labels(self.es_client, uuids, ttl=300)
+        self.es_client.search.return_value.body = get_refresh_response("Dimpact")
+
+        mock_monotonic.return_value += 300
+        labels = self.registry.get_labels(self.es_client, uuids, ttl=300)
+
+        self.assertEqual(labels, {"publisher": {PUBLISHER_UUID: "Dimpact"}})
+        self.assertEqual(self.es_client.search.call_count, 2)
+
+    def test_unknown_uuids_are_looked_up(self, mock_monotonic: MagicMock):
+        self.registry.get_labels(
+            self.es_client, {"publisher": [PUBLISHER_UUID]}, ttl=300
+        )
+        lookup_response = get_refresh_response()
+        lookup_response["aggregations"] = {
+            "topic": {
+                "buckets": [
+                    _bucket(
+                        "new-topic",
+                        {
+                            "onderwerpen": [
+                                {"uuid": "new-topic", "officiele_titel": "Nieuw"}
+                            ]
+                        },
+                    )
+                ]
+            }
+        }
+        self.es_client.search.return_value.body = lookup_response
+
+        uuids: dict[FacetKind, list[str]] = {
+            "publisher": [PUBLISHER_UUID],
+            "topic": ["new-topic"],
+        }
+        labels = self.registry.get_labels(self.es_client, uuids, ttl=300)
+
+        self.assertEqual(
+            labels,
+            {"publisher": {PUBLISHER_UUID: "Maycatt"}, "topic": {"new-topic": "Nieuw"}},
+        )
+        self.assertEqual(self.es_client.search.call_count, 2)
+        # only the unknown uuids are looked up
+        body = self.es_client.search.call_args.kwargs["body"]
+        self.assertEqual(
+            body["query"],
+            {"bool": {"filter": [{"terms": {"onderwerp_uuids": ["new-topic"]}}]}},
+        )
+        self.assertEqual(
+            body["aggs"]["topic"]["terms"],
+            {"field": "onderwerp_uuids", "include": ["new-topic"], "size": 1},
+        )
+        self.assertNotIn("publisher", body["aggs"])
+
+        with self.subTest("added to the registry"):
+            self.registry.get_labels(self.es_client, uuids, ttl=300)
+
+            self.assertEqual(self.es_client.search.call_count, 2)
+
+    def test_unknown_uuids_get_empty_name_if_lookup_fails(
+        self, mock_monotonic: MagicMock
+    ):
+        self.registry.get_labels(
+            self.es_client, {"publisher": [PUBLISHER_UUID]}, ttl=300
+        )
+        self.es_client.search.side_effect = ConnectionError("Connection refused")
+
+        with self.assertLogs("woo_search.search_index.facets", "WARNING"):
+            labels = self.registry.get_labels(
+                self.es_client, {"topic": ["unknown"]}, ttl=300
+            )
+
+        self.assertEqual(labels, {"topic": {"unknown": ""}})
+
+    def test_cold_start_waits_for_refresh(self, mock_monotonic: MagicMock):
+        uuids: dict[FacetKind, list[str]] = {"publisher": [PUBLISHER_UUID]}
+        labels_during_refresh = []
+        threads: list[threading.Thread] = []
+
+        def refresh(**kwargs):
+            # another thread looks up labels while the registry is being loaded
+            thread = threading.Thread(
+                target=lambda: labels_during_refresh.append(
+                    self.registry.get_labels(self.es_client, uuids, ttl=300)
+                )
+            )
+            thread.start()
+            thread.join(timeout=0.1)
+            self.assertTrue(thread.is_alive(), "Expected the thread to wait")
+            threads.append(thread)
+            return MagicMock(body=get_refresh_response())
+
+        self.es_client.search.side_effect = refresh
+
+        labels = self.registry.get_labels(self.es_client, uuids, ttl=300)
+        threads[0].join()
+
+        self.assertEqual(labels, {"publisher": {PUBLISHER_UUID: "Maycatt"}})
+        self.assertEqual(
+            labels_during_refresh, [{"publisher": {PUBLISHER_UUID: "Maycatt"}}]
+        )
+        self.es_client.search.assert_called_once()
+
+    def test_no_request_without_uuids(self, mock_monotonic: MagicMock):
+        labels = self.registry.get_labels(
+            self.es_client, {"publisher": [], "topic": []}, ttl=300
+        )
+
+        self.assertEqual(labels, {"publisher": {}, "topic": {}})
+        self.es_client.search.assert_not_called()
+
+    def test_stale_labels_are_kept_when_refresh_fails(self, mock_monotonic: MagicMock):
+        uuids: dict[FacetKind, list[str]] = {"publisher": [PUBLISHER_UUID]}
+        self.registry.get_labels(self.es_client, uuids, ttl=300)
+        self.es_client.search.side_effect = ConnectionError("Connection refused")
+
+        mock_monotonic.return_value += 300
+        labels = self.registry.get_labels(self.es_client, uuids, ttl=300)
+
+        self.assertEqual(labels, {"publisher": {PUBLISHER_UUID: "Maycatt"}})
+        self.assertEqual(self.es_client.search.call_count, 2)
+
+    def test_stale_labels_are_served_during_refresh(self, mock_monotonic: MagicMock):
+        uuids: dict[FacetKind, list[str]] = {"publisher": [PUBLISHER_UUID]}
+        self.registry.get_labels(self.es_client, uuids, ttl=300)
+        labels_during_refresh = []
+
+        def refresh(**kwargs):
+            # another thread looks up labels while the refresh is in progress
+            labels_during_refresh.append(
+                self.registry.get_labels(self.es_client, uuids, ttl=300)
+            )
+            return MagicMock(body=get_refresh_response("Dimpact"))
+
+        self.es_client.search.side_effect = refresh
+
+        mock_monotonic.return_value += 300
+        labels = self.registry.get_labels(self.es_client, uuids, ttl=300)
+
+        self.assertEqual(
+            labels_during_refresh, [{"publisher": {PUBLISHER_UUID: "Maycatt"}}]
+        )
+        self.assertEqual(labels, {"publisher": {PUBLISHER_UUID: "Dimpact"}})
+        self.assertEqual(self.es_client.search.call_count, 2)
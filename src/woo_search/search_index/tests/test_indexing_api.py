@@ -398,7 +398,24 @@ class RemovePublicationFromIndexAPITests(TokenAuthMixin, APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(response.json()["taskId"], "my-task-id")
-        patched_remove_publication.assert_called_once_with(uuid=publication_id)
+        patched_remove_publication.assert_called_once_with(
+            uuid=publication_id, cascade=False
+        )
+
+    @patch("woo_search.search_index.api.viewsets.remove_publication_from_index.delay")
+    def test_remove_publication_and_documents_from_index(
+        self, patched_remove_publication
+    ):
+        patched_remove_publication.return_value.id = "my-task-id"
+        publication_id = str(uuid4())
+        endpoint = reverse("api:publication-detail", kwargs={"uuid": publication_id})
+
+        response = self.client.delete(f"{endpoint}?cascade=true")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        patched_remove_publication.assert_called_once_with(
+            uuid=publication_id, cascade=True
+        )
 
 
 class PublicationApiE2ETest(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
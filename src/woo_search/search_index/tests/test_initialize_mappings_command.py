@@ -0,0 +1,164 @@
+from unittest.mock import MagicMock
+
+from django.core.management import CommandError
+from django.test import SimpleTestCase, override_settings
+
+from freezegun import freeze_time
+
+from ..client import get_client
+from ..index import Publication
+from ..management.commands.initialize_mappings import (
+    get_index,
+    save_document_partitions_template,
+)
+from ..utils import get_index_document_types
+from .base import ES_TEST_SETTINGS, ElasticSearchTestCase
+
+
+class GetIndexTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.es_client = MagicMock()
+
+    def test_new_index_is_created_with_all_settings(self):
+        self.es_client.indices.exists.return_value = False
+
+        index, skipped_settings = get_index(self.es_client, Publication)
+
+        self.assertEqual(
+            index.to_dict()["settings"],
+            {
+                "number_of_shards": 1,
+                "refresh_interval": "1s",
+                "codec": "best_compression",
+                "sort.field": ["gepubliceerd_op", "uuid.keyword"],
+                "sort.order": ["desc", "desc"],
+            },
+        )
+        self.assertEqual(skipped_settings, [])
+
+    def test_static_settings_are_not_applied_to_existing_index(self):
+        self.es_client.indices.exists.return_value = True
+        self.es_client.indices.get_settings.return_value.body = {
+            "publication": {
+                "settings": {
+                    "index.number_of_shards": "1",
+                    "index.refresh_interval": "5s",
+                    "index.sort.field": ["gepubliceerd_op", "uuid.keyword"],
+                    "index.sort.order": ["desc", "desc"],
+                }
+            }
+        }
+
+        index, skipped_settings = get_index(self.es_client, Publication)
+
+        self.assertEqual(index.to_dict()["settings"], {"refresh_interval": "1s"})
+        # the codec isn't set on the existing index
+        self.assertEqual(skipped_settings, ["codec"])
+        # the document type's index definition is unaffected
+        self.assertIn("codec", Publication._index.to_dict()["settings"])
+
+    def test_index_sorting_is_reported_for_existing_unsorted_index(self):
+        self.es_client.indices.exists.return_value = True
+        self.es_client.indices.get_settings.return_value.body = {
+            "publication": {
+                "settings": {
+                    "index.number_of_shards": "1",
+                    "index.codec": "best_compression",
+                }
+            }
+        }
+
+        _, skipped_settings = get_index(self.es_client, Publication)
+
+        self.assertEqual(skipped_settings, ["sort.field", "sort.order"])
+        self.es_client.indices.get_settings.assert_called_once_with(
+            index="publication", flat_settings=True
+        )
+
+    def test_uuid_mappings_are_compatible_with_existing_indices(self):
+        # changing the type of an existing field is a mapping conflict
+        mapping = Publication._doc_type.mapping.to_dict()["properties"]
+
+        self.assertEqual(
+            mapping["publisher"]["properties"]["uuid"],
+            {
+                "type": "text",
+                "fields": {
+                    "keyword": {"type": "keyword", "eager_global_ordinals": True}
+                },
+            },
+        )
+        self.assertEqual(
+            mapping["informatie_categorieen"]["properties"]["uuid"],
+            {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
+        )
+        # adding a subfield is not
+        self.assertEqual(
+            mapping["uuid"],
+            {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
+        )
+
+
+class IndexCreationTests(ElasticSearchTestCase):
+    """
+    Create the indices in a real cluster - the index sorting is only validated by
+    Elastic Search, e.g. against the nested fields in the mappings.
+    """
+
+    def test_indices_are_created_with_index_sorting(self):
+        if not self._es_online:
+            self.skipTest("Elastic Search is not available.")
+
+        with get_client() as client:
+            for doc_type in get_index_document_types():
+                index_name = f"test-index-creation-{doc_type.Index.name}"
+                with self.subTest(index=doc_type.Index.name):
+                    doc_type._index.clone(name=index_name).create(using=client)
+                    try:
+                        response = client.indices.get_settings(
+                            index=index_name, flat_settings=True
+                        )
+                    finally:
+                        client.indices.delete(index=index_name)
+
+                    index_settings = response.body[index_name]["settings"]
+                    self.assertEqual(
+                        index_settings["index.sort.field"],
+                        ["gepubliceerd_op", "uuid.keyword"],
+                    )
+                    self.assertEqual(
+                        index_settings["index.sort.order"], ["desc", "desc"]
+                    )
+
+
+@override_settings(SEARCH_INDEX={**ES_TEST_SETTINGS, "DOCUMENT_PARTITIONING": "year"})
+class DocumentPartitionsTemplateTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.es_client = MagicMock()
+
+    @freeze_time("2025-06-01T12:00:00Z")
+    def test_template_is_saved(self):
+        self.es_client.indices.exists.return_value = False
+
+        save_document_partitions_template(self.es_client)
+
+        kwargs = self.es_client.indices.put_index_template.call_args.kwargs
+        self.assertEqual(kwargs["name"], "document")
+        self.assertEqual(kwargs["index_patterns"], ["document-*"])
+        self.assertEqual(kwargs["template"]["aliases"], {"document": {}})
+        self.assertIn("registratiedatum", kwargs["template"]["mappings"]["properties"])
+        # the alias exists from the start
+        self.es_client.indices.create.assert_called_once_with(index="document-2025")
+
+    def test_unpartitioned_index_must_be_removed(self):
+        self.es_client.indices.exists.return_value = True
+        self.es_client.indices.exists_alias.return_value = False
+
+        with self.assertRaises(CommandError):
+            save_document_partitions_template(self.es_client)
+
+        self.es_client.indices.put_index_template.assert_not_called()
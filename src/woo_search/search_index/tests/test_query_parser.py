@@ -0,0 +1,176 @@
+"""
+Unit test parsing the search queries entered by users.
+"""
+
+from django.test import SimpleTestCase, override_settings
+
+from ..query_parser import (
+    And,
+    Or,
+    Phrase,
+    QueryTooComplex,
+    Term,
+    _parse_query,
+    compile_query,
+    parse_query,
+)
+from .base import ES_TEST_SETTINGS, override_es_settings
+
+
+@override_es_settings
+class ParseQueryTests(SimpleTestCase):
+    def test_terms(self):
+        self.assertEqual(parse_query("besluit"), Term("besluit"))
+        self.assertEqual(
+            parse_query("  besluit   gemeente "),
+            And((Term("besluit"), Term("gemeente"))),
+        )
+
+    def test_empty_queries(self):
+        for query in ("", "   ", '""', "()", "AND", "( OR )"):
+            with self.subTest(query=query):
+                self.assertIsNone(parse_query(query))
+
+    def test_phrases(self):
+        self.assertEqual(
+            parse_query('"besluit  van de" gemeente'),
+            And((Phrase("besluit van de"), Term("gemeente"))),
+        )
+        # operators are searched for literally in phrases
+        self.assertEqual(parse_query('"AND (OR)"'), Phrase("AND (OR)"))
+
+    def test_operators(self):
+        expected = Or((And((Term("one"), Term("two"))), Term("three")))
+
+        for query in ("one AND two OR three", "one + two | three", "one two|three"):
+            with self.subTest(query=query):
+                self.assertEqual(parse_query(query), expected)
+
+        # only the uppercase operators are recognized
+        self.assertEqual(
+            parse_query("one or two"),
+            And((Term("one"), Term("or"), Term("two"))),
+        )
+
+    def test_parentheses(self):
+        self.assertEqual(
+            parse_query('one AND (two OR "three four")'),
+            And((Term("one"), Or((Term("two"), Phrase("three four"))))),
+        )
+        # nested operations of the same type are flattened
+        self.assertEqual(
+            parse_query("(one OR (two OR three))"),
+            Or((Term("one"), Term("two"), Term("three"))),
+        )
+
+    def test_lenient_parsing(self):
+        cases = [
+            ('"unbalanced quote', Phrase("unbalanced quote")),
+            ("(one OR two", Or((Term("one"), Term("two")))),
+            ("one) two", And((Term("one"), Term("two")))),
+            ("OR one AND", Term("one")),
+            ("one OR OR two", Or((Term("one"), Term("two")))),
+        ]
+
+        for query, expected in cases:
+            with self.subTest(query=query):
+                self.assertEqual(parse_query(query), expected)
+
+    def test_parsed_queries_are_cached(self):
+        _parse_query.cache_clear()
+
+        parse_query("one OR two")
+        parse_query("one OR two")
+
+        self.assertEqual(_parse_query.cache_info().hits, 1)
+
+
+@override_settings(
+    SEARCH_INDEX={
+        **ES_TEST_SETTINGS,
+        "QUERY_MAX_CLAUSES": 3,
+        "QUERY_MAX_TERM_LENGTH": 10,
+        "QUERY_MAX_PHRASES": 1,
+    }
+)
+class QueryLimitsTests(SimpleTestCase):
+    def test_within_limits(self):
+        self.assertIsNotNone(parse_query('one "two three" 0123456789'))
+
+    def test_too_many_clauses(self):
+        with self.assertRaises(QueryTooComplex):
+            parse_query("one OR (two three four)")
+
+    def test_too_many_phrases(self):
+        with self.assertRaises(QueryTooComplex):
+            parse_query('"one" "two"')
+
+    def test_too_long_terms(self):
+        for query in ("01234567890", '"one 01234567890"'):
+            with self.subTest(query=query), self.assertRaises(QueryTooComplex):
+                parse_query(query)
+
+    def test_too_deeply_nested(self):
+        with self.assertRaises(QueryTooComplex):
+            parse_query("(" * 20 + "one")
+
+    def test_long_queries_are_within_default_limits(self):
+        query = " ".join(f"word{index}" for index in range(100))
+
+        with self.settings(SEARCH_INDEX=ES_TEST_SETTINGS):
+            self.assertIsNotNone(parse_query(query))
+
+    def test_limits_are_not_cached(self):
+        with self.assertRaises(QueryTooComplex):
+            parse_query('"one" "two"')
+
+        with self.settings(SEARCH_INDEX={**ES_TEST_SETTINGS, "QUERY_MAX_PHRASES": 2}):
+            self.assertIsNotNone(parse_query('"one" "two"'))
+
+
+class CompileQueryTests(SimpleTestCase):
+    def test_compile(self):
+        node = And((Term("one"), Or((Term("two"), Phrase("three four")))))
+
+        query = compile_query(node, ["titel^2", "omschrijving"])
+
+        fields = ["titel^2", "omschrijving"]
+        self.assertEqual(
+            query.to_dict(),
+            {
+                "bool": {
+                    "must": [
+                        {
+                            "multi_match": {
+                                "query": "one",
+                                "fields": fields,
+                                "type": "cross_fields",
+                                "operator": "and",
+                            }
+                        },
+                        {
+                            "bool": {
+                                "should": [
+                                    {
+                                        "multi_match": {
+                                            "query": "two",
+                                            "fields": fields,
+                                            "type": "cross_fields",
+                                            "operator": "and",
+                                        }
+                                    },
+                                    {
+                                        "multi_match": {
+                                            "query": "three four",
+                                            "fields": fields,
+                                            "type": "phrase",
+                                        }
+                                    },
+                                ],
+                                "minimum_should_match": 1,
+                            }
+                        },
+                    ]
+                }
+            },
+        )
@@ -0,0 +1,47 @@
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+
+def get_cache_stats(hits: int, misses: int) -> dict[str, int]:
+    return {
+        "hit_count": hits,
+        "miss_count": misses,
+        "evictions": 0,
+        "memory_size_in_bytes": 1024,
+    }
+
+
+class RequestCacheStatsCommandTests(SimpleTestCase):
+    @patch("woo_search.search_index.management.commands.request_cache_stats.get_client")
+    def test_report(self, mock_get_client: MagicMock):
+        client = mock_get_client.return_value.__enter__.return_value
+        client.indices.stats.return_value.body = {
+            "indices": {
+                "publication": {
+                    "total": {
+                        "request_cache": get_cache_stats(hits=3, misses=1),
+                        "query_cache": get_cache_stats(hits=0, misses=0),
+                    }
+                },
+            }
+        }
+        stdout = StringIO()
+
+        call_command("request_cache_stats", stdout=stdout)
+
+        client.indices.stats.assert_called_once_with(
+            index=["document", "publication", "topic"],
+            metric=["request_cache", "query_cache"],
+        )
+        output = stdout.getvalue()
+        self.assertIn(
+            "Request cache: 3 hits, 1 misses (hit ratio: 75%), 0 evictions, 1024 bytes",
+            output,
+        )
+        self.assertIn(
+            "Query cache: 0 hits, 0 misses (hit ratio: -), 0 evictions, 1024 bytes",
+            output,
+        )
@@ -1,5 +1,9 @@
 from datetime import UTC, date, datetime
+from unittest.mock import patch
+from uuid import UUID
 
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse_lazy
 
 from rest_framework import status
@@ -7,11 +11,13 @@ from rest_framework.test import APITestCase
 
 from woo_search.api.tests.factories import TokenAuthFactory
 from woo_search.api.tests.mixin import TokenAuthMixin
-from woo_search.utils.tests.vcr import VCRMixin
+from woo_search.utils.tests.vcr import VCRMixin, requires_recording
 
+from ..client import SearchResults, SearchUnavailable, Suggestion
 from ..constants import ResultTypeChoices, SortChoices
+from ..landing_page import LANDING_PAGE_CACHE_KEY
 from ..tasks import index_document, index_publication, index_topic
-from .base import ElasticSearchAPITestCase
+from .base import ES_TEST_SETTINGS, ElasticSearchAPITestCase
 from .factories import (
     IndexDocumentFactory,
     IndexPublicationFactory,
@@ -51,10 +57,114 @@ class SearchApiAccessTest(APITestCase):
             self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class SearchApiUnavailableTest(TokenAuthMixin, APITestCase):
+    @patch(
+        "woo_search.search_index.client.get_search_results",
+        side_effect=SearchUnavailable,
+    )
+    def test_search_engine_unavailable(self, mock_get_search_results):
+        response = self.client.post(reverse_lazy("api:search"))
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class SearchApiCoalescingTest(TokenAuthMixin, APITestCase):
+    @patch("woo_search.search_index.api.views.search_single_flight.do")
+    def test_wait_for_search_in_flight_within_time_budget(self, mock_do):
+        mock_do.side_effect = SearchUnavailable
+
+        self.client.post(reverse_lazy("api:search"))
+
+        # twice the search time budget of 5 seconds, like the search request itself
+        self.assertEqual(mock_do.call_args.kwargs["timeout"], 10.0)
+
+
+class SearchApiLowerBoundCountTest(TokenAuthMixin, APITestCase):
+    @patch("woo_search.search_index.client.get_search_results")
+    def test_next_page_with_lower_bound_count(self, mock_get_search_results):
+        mock_get_search_results.return_value = SearchResults(
+            total_count=21,
+            total_count_relation="gte",
+            results=[],
+            result_type_buckets=[],
+            publisher_buckets=[],
+            topic_buckets=[],
+            information_category_buckets=[],
+        )
+
+        response = self.client.post(
+            reverse_lazy("api:search"), {"page": 2, "pageSize": 10}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data["count"], 21)
+        self.assertEqual(data["countRelation"], "gte")
+        self.assertTrue(data["next"])
+
+
+@override_settings(
+    SEARCH_INDEX={**ES_TEST_SETTINGS, "LANDING_PAGE_REFRESH_INTERVAL": 60}
+)
+@patch("woo_search.search_index.client.get_search_results")
+class SearchApiLandingPageTest(TokenAuthMixin, APITestCase):
+    url = reverse_lazy("api:search")
+
+    def setUp(self):
+        super().setUp()
+
+        cache.set(
+            LANDING_PAGE_CACHE_KEY,
+            SearchResults(
+                total_count=1234,
+                results=[],
+                result_type_buckets=[],
+                publisher_buckets=[],
+                topic_buckets=[],
+                information_category_buckets=[],
+            ),
+        )
+        self.addCleanup(cache.delete, LANDING_PAGE_CACHE_KEY)
+
+    def test_precomputed_results_are_served(self, mock_get_search_results):
+        for body in ({"sort": "chronological"}, {"sort": "chronological", "page": 1}):
+            with self.subTest(body=body):
+                response = self.client.post(self.url, body)
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.json()["count"], 1234)
+
+        mock_get_search_results.assert_not_called()
+
+    def test_other_searches_are_not_served(self, mock_get_search_results):
+        mock_get_search_results.side_effect = SearchUnavailable
+
+        for body in (
+            {},
+            {"sort": "chronological", "page": 2},
+            {"sort": "chronological", "query": "foo"},
+        ):
+            with self.subTest(body=body):
+                response = self.client.post(self.url, body)
+
+                self.assertEqual(
+                    response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+                )
+
+    def test_search_without_precomputed_results(self, mock_get_search_results):
+        mock_get_search_results.side_effect = SearchUnavailable
+        cache.delete(LANDING_PAGE_CACHE_KEY)
+
+        response = self.client.post(self.url, {"sort": "chronological"})
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
 class SearchApiTest(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
     url = reverse_lazy("api:search")
     maxDiff = None
 
+    @requires_recording
     def test_no_body(self):
         index_topic(
             **IndexTopicFactory.build(
@@ -84,6 +194,8 @@ class SearchApiTest(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
         self.assertEqual(data["count"], 3)
         self.assertFalse(data["previous"])
         self.assertFalse(data["next"])
+        self.assertFalse(data["degraded"])
+        self.assertFalse(data["partial"])
         results = data["results"]
         self.assertEqual(len(results), 3)
         self.assertEqual(results[0]["type"], "topic")
@@ -104,6 +216,7 @@ class SearchApiTest(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
         )
         self.assertIn("publicatie", results[2]["record"])
 
+    @requires_recording
     def test_pagination_next_and_page_size(self):
         index_publication(
             **IndexPublicationFactory.build(
@@ -130,6 +243,7 @@ class SearchApiTest(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
         self.assertEqual(len(data["results"]), 1)
         self.assertEqual(data["results"][0]["type"], "publication")
 
+    @requires_recording
     def test_pagination_previous(self):
         index_publication(
             **IndexPublicationFactory.build(
@@ -157,6 +271,7 @@ class SearchApiTest(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
         self.assertEqual(len(data["results"]), 1)
         self.assertEqual(data["results"][0]["type"], "document")
 
+    @requires_recording
     def test_sort_chronological(self):
         index_publication(
             **IndexPublicationFactory.build(
@@ -178,6 +293,7 @@ class SearchApiTest(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
         data = response.json()
 
         self.assertEqual(data["count"], 2)
+        self.assertEqual(data["countRelation"], "eq")
         self.assertFalse(data["previous"])
         self.assertFalse(data["next"])
         # test if results have the same length as the count
@@ -185,6 +301,7 @@ class SearchApiTest(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
         self.assertEqual(data["results"][0]["type"], "document")
         self.assertEqual(data["results"][1]["type"], "publication")
 
+    @requires_recording
     def test_boost_topic_publication_over_document(self):
         # identical hit conditions, boosting publication should return results in the
         # following order: topic > publication > document.
@@ -224,6 +341,7 @@ class SearchApiTest(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
         self.assertEqual(second["type"], "publication")
         self.assertEqual(third["type"], "document")
 
+    @requires_recording
     def test_query(self):
         index_topic(
             **IndexTopicFactory.build(
@@ -255,6 +373,34 @@ class SearchApiTest(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
         self.assertEqual(len(data["results"]), 1)
         self.assertEqual(data["results"][0]["type"], "document")
 
+    @requires_recording
+    def test_query_highlights_file_contents(self):
+        ServiceFactory.create(for_download_url_mock_service=True)
+        index_document(
+            **IndexDocumentFactory.build(
+                uuid="0c4ed5ec-6f4d-4a4b-9e0f-2f3c0e9d7a51",
+                officiele_titel="Begroting 2026",
+                omschrijving="De begroting van de gemeente.",
+                # the mock service responds with "Document 'begroting'"
+                download_url="http://localhost/document/begroting",
+                file_size=20,
+            )
+        )
+
+        response = self.client.post(self.url, {"query": "begroting", "highlight": True})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data["count"], 1)
+        self.assertEqual(
+            data["results"][0]["highlights"],
+            [
+                "De <em>begroting</em> van de gemeente.",
+                "Document '<em>begroting</em>'",
+            ],
+        )
+
+    @requires_recording
     def test_query_field_boosts(self):
         ServiceFactory.create(for_download_url_mock_service=True)
         index_document(
@@ -342,6 +488,7 @@ class SearchApiTest(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
             data["results"][4]["record"]["uuid"], "d21c2a2f-ad02-41d5-8754-d24ba7092090"
         )
 
+    @requires_recording
     def test_query_default_search_uses_AND_instead_of_OR(self):
         index_publication(
             **IndexPublicationFactory.build(
@@ -375,12 +522,14 @@ class SearchApiTest(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
             data["results"][0]["record"]["uuid"], "da45268a-ab21-4a81-bfc4-b0430edf339b"
         )
 
+    @requires_recording
     def test_broken_query_string_syntax(self):
         # broken quotes, AND not followed by operand
         response = self.client.post(self.url, {"query": '"document two AND'})
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    @requires_recording
     def test_query_with_exact_match_using_double_quotes(self):
         index_document(
             **IndexDocumentFactory.build(
@@ -435,6 +584,7 @@ class SearchApiTest(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
                 },
             )
 
+    @requires_recording
     def test_query_boolean_operators(self):
         index_document(
             **IndexDocumentFactory.build(
@@ -525,6 +675,7 @@ class SearchApiTest(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
                 },
             )
 
+    @requires_recording
     def test_boost_published_items(self):
         # oldest, but modified more recently
         index_publication(
@@ -561,6 +712,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
     url = reverse_lazy("api:search")
     maxDiff = None
 
+    @requires_recording
     def test_filter_on_result_type(self):
         index_topic(
             **IndexTopicFactory.build(
@@ -599,6 +751,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
             self.assertEqual(result_type_facets_count[ResultTypeChoices.document], 1)
             self.assertEqual(result_type_facets_count[ResultTypeChoices.topic], 1)
 
+    @requires_recording
     def test_filter_on_result_type_and_publisher_uuid(self):
         publisher_1 = NestedPublisherFactory.build(
             uuid="f9cc8c26-7ce7-4a25-9554-e6a2892176d7",
@@ -681,6 +834,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
                 {ResultTypeChoices.document: 1, ResultTypeChoices.publication: 1},
             )
 
+    @requires_recording
     def test_filter_on_result_type_and_information_category(self):
         ic_1 = NestedInformationCategoryFactory.build(
             uuid="f9cc8c26-7ce7-4a25-9554-e6a2892176d7",
@@ -766,6 +920,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
                 {ResultTypeChoices.document: 1, ResultTypeChoices.publication: 1},
             )
 
+    @requires_recording
     def test_filter_on_registration_date(self):
         doc1 = IndexDocumentFactory.build(
             uuid="6aac4fb2-d532-490b-bd6b-87b0257c0236",
@@ -835,6 +990,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
             ids = set(result["record"]["uuid"] for result in data["results"])
             self.assertEqual(ids, expected_ids)
 
+    @requires_recording
     def test_filter_on_registration_date_all_indexes(self):
         topic1 = IndexTopicFactory.build(
             uuid="294f4b3b-3573-4f16-9beb-1aa3d49b1e39",
@@ -886,6 +1042,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
         ids = set(result["record"]["uuid"] for result in data["results"])
         self.assertEqual(ids, expected_ids)
 
+    @requires_recording
     def test_filter_on_last_modified_date(self):
         doc1 = IndexDocumentFactory.build(
             uuid="6aac4fb2-d532-490b-bd6b-87b0257c0236",
@@ -956,6 +1113,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
             ids = set(result["record"]["uuid"] for result in data["results"])
             self.assertEqual(ids, expected_ids)
 
+    @requires_recording
     def test_filter_on_last_modified_date_all_indexes(self):
         topic1 = IndexTopicFactory.build(
             uuid="f34eca58-201c-4ee5-ae35-f89d88d58fb8",
@@ -1007,6 +1165,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
         ids = set(result["record"]["uuid"] for result in data["results"])
         self.assertEqual(ids, expected_ids)
 
+    @requires_recording
     def test_filter_on_gepubliceerd_op_all_indexes(self):
         pub1 = IndexPublicationFactory.build(
             uuid="b38065ee-322e-46c7-ae64-c47112a4b408",
@@ -1060,6 +1219,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
         ids = set(result["record"]["uuid"] for result in data["results"])
         self.assertEqual(ids, expected_ids)
 
+    @requires_recording
     def test_filter_on_datum_begin_geldigheid_vanaf(self):
         pub1 = IndexPublicationFactory.build(
             uuid="b38065ee-322e-46c7-ae64-c47112a4b408",
@@ -1111,6 +1271,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
         ids = set(result["record"]["uuid"] for result in data["results"])
         self.assertEqual(ids, expected_ids)
 
+    @requires_recording
     def test_filter_on_datum_einde_geldigheid_vanaf(self):
         pub1 = IndexPublicationFactory.build(
             uuid="b38065ee-322e-46c7-ae64-c47112a4b408",
@@ -1162,6 +1323,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
         ids = set(result["record"]["uuid"] for result in data["results"])
         self.assertEqual(ids, expected_ids)
 
+    @requires_recording
     def test_filter_on_creatiedatum(self):
         doc1 = IndexDocumentFactory.build(
             uuid="6aac4fb2-d532-490b-bd6b-87b0257c0236",
@@ -1237,6 +1399,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
             ids = set(result["record"]["uuid"] for result in data["results"])
             self.assertEqual(ids, expected_ids)
 
+    @requires_recording
     def test_filter_query_by_identifiers(self):
         pub = IndexPublicationFactory.build(
             uuid="0477ebbe-018f-48aa-85a3-cbfcb5575030",
@@ -1301,6 +1464,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
             ids = set(result["record"]["uuid"] for result in data["results"])
             self.assertEqual(ids, expected_ids)
 
+    @requires_recording
     def test_filter_by_publisher_uuid(self):
         publisher_1 = NestedPublisherFactory.build(
             uuid="f9cc8c26-7ce7-4a25-9554-e6a2892176d7",
@@ -1409,6 +1573,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
             publisher_facets = data["facets"]["publishers"]
             self.assertGreater(len(publisher_facets), 1)
 
+    @requires_recording
     def test_filter_by_information_category_uuid(self):
         ic_1 = NestedInformationCategoryFactory.build(
             uuid="f9cc8c26-7ce7-4a25-9554-e6a2892176d7",
@@ -1518,6 +1683,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
             publisher_facets = data["facets"]["informatieCategorieen"]
             self.assertGreater(len(publisher_facets), 1)
 
+    @requires_recording
     def test_filter_by_topic_uuid(self):
         topic_1 = NestedTopicFactory.build(
             uuid="de662742-0c1d-427e-8b29-859d8be99356", officiele_titel="Inspanning"
@@ -1639,6 +1805,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
                 },
             )
 
+    @requires_recording
     def test_filter_by_topic_uuid_and_publisher(self):
         topic_1 = NestedTopicFactory.build(
             uuid="de662742-0c1d-427e-8b29-859d8be99356", officiele_titel="Inspanning"
@@ -1719,6 +1886,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
             }
             self.assertEqual(result_type_facets, {"publication": 1})
 
+    @requires_recording
     def test_filter_by_publisher_and_information_category(self):
         publisher_1 = NestedPublisherFactory.build(
             uuid="f9cc8c26-7ce7-4a25-9554-e6a2892176d7",
@@ -1806,6 +1974,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
             }
             self.assertEqual(result_type_facets, {})
 
+    @requires_recording
     def test_filter_by_publisher_and_information_category_and_result_type(self):
         publisher_1 = NestedPublisherFactory.build(
             uuid="f9cc8c26-7ce7-4a25-9554-e6a2892176d7",
@@ -1955,6 +2124,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
                 },
             )
 
+    @requires_recording
     def test_filter_by_topic_publisher_and_information_category_and_result_type(self):
         topic_1 = NestedTopicFactory.build(
             uuid="ccdaef6a-cf4b-4749-84a0-888afc8c495b", officiele_titel="Inspanning"
@@ -2103,6 +2273,7 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
             }
             self.assertEqual(result_type_facets, {"publication": 1})
 
+    @requires_recording
     def test_dutch_analyzer(self):
         """
         Dutch analyzer test. Use a word which is present in the example of:
@@ -2154,3 +2325,82 @@ class SearchApiFilterTests(TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase):
             self.assertEqual(response.status_code, status.HTTP_200_OK)
             data = response.json()
             self.assertEqual(data["count"], 0)
+
+
+class SuggestApiAccessTest(APITestCase):
+    def test_api_with_wrong_credentials_blocks_access(self):
+        url = reverse_lazy("api:suggest")
+        no_permission_token = TokenAuthFactory.create(permissions=[]).token
+
+        with self.subTest("no token given"):
+            response = self.client.post(url)
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        with self.subTest("token with no permission"):
+            response = self.client.post(
+                url,
+                headers={"Authorization": f"Token {no_permission_token}"},
+            )
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@patch("woo_search.search_index.api.views.get_suggestions")
+class SuggestApiTest(TokenAuthMixin, APITestCase):
+    url = reverse_lazy("api:suggest")
+
+    def test_suggestions(self, mock_get_suggestions):
+        mock_get_suggestions.return_value = [
+            Suggestion(
+                type="topic",
+                uuid=UUID("5a44e939-7305-40a8-a987-83ca1ff60d16"),
+                officiele_titel="Besluiten van de raad",
+            ),
+            Suggestion(
+                type="publication",
+                uuid=UUID("6dae9be7-4f93-4aad-b56a-10b683b16dcc"),
+                officiele_titel="Besluit over de begroting",
+                verkorte_titel="Begroting",
+            ),
+        ]
+
+        response = self.client.post(
+            self.url, data={"query": "besl", "resultTypes": ["topic", "publication"]}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_get_suggestions.assert_called_once_with(
+            query="besl", result_types=["topic", "publication"], size=5
+        )
+        self.assertEqual(
+            response.json(),
+            {
+                "results": [
+                    {
+                        "type": "topic",
+                        "uuid": "5a44e939-7305-40a8-a987-83ca1ff60d16",
+                        "officieleTitel": "Besluiten van de raad",
+                        "verkorteTitel": "",
+                    },
+                    {
+                        "type": "publication",
+                        "uuid": "6dae9be7-4f93-4aad-b56a-10b683b16dcc",
+                        "officieleTitel": "Besluit over de begroting",
+                        "verkorteTitel": "Begroting",
+                    },
+                ]
+            },
+        )
+
+    def test_invalid_parameters(self, mock_get_suggestions):
+        for data in (
+            {},
+            {"query": ""},
+            {"query": "besl", "size": 0},
+            {"query": "besl", "size": 21},
+        ):
+            with self.subTest(data=data):
+                response = self.client.post(self.url, data=data)
+
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        mock_get_suggestions.assert_not_called()
@@ -0,0 +1,848 @@
+"""
+Unit test the search request that is sent to Elastic Search.
+"""
+
+from datetime import UTC, datetime
+from typing import Any
+from unittest.mock import MagicMock, patch
+from uuid import UUID
+
+from django.test import SimpleTestCase, override_settings
+
+from elastic_transport import (
+    ApiResponseMeta,
+    ConnectionError,
+    ConnectionTimeout,
+    HttpHeaders,
+    NodeConfig,
+    ObjectApiResponse,
+)
+from elasticsearch import ApiError, BadRequestError
+
+from ..api.serializers import SearchSerializer
+from ..client import (
+    SearchResults,
+    SearchUnavailable,
+    Suggestion,
+    _round_datetime,
+    full_search_breaker,
+    get_search_results,
+    get_search_results_from_parameters,
+    get_suggestions,
+    is_identifier_query,
+    search_breaker,
+    suggest_breaker,
+)
+from .base import ES_TEST_SETTINGS, override_es_settings
+
+
+def get_es_response(hits: list[dict[str, Any]] | None = None) -> dict[str, Any]:
+    hits = hits or []
+    return {
+        "took": 1,
+        "timed_out": False,
+        "hits": {
+            "total": {"value": len(hits), "relation": "eq"},
+            "hits": hits,
+        },
+        "aggregations": {
+            "ResultType": {"FilteredResultType": {"buckets": []}},
+            "Publisher": {"FilteredPublisher": {"buckets": []}},
+            "InformationCategories": {"FilteredCategories": {"buckets": []}},
+            "Topics": {"FilteredTopics": {"buckets": []}},
+        },
+    }
+
+
+def get_msearch_response(*responses: dict[str, Any]) -> ObjectApiResponse:
+    # the meta data is only used for failed searches
+    meta = ApiResponseMeta(
+        status=200,
+        http_version="1.1",
+        headers=HttpHeaders(),
+        duration=0.0,
+        node=NodeConfig("http", "localhost", 9201),
+    )
+    return ObjectApiResponse(body={"responses": list(responses)}, meta=meta)
+
+
+def get_es_error(status: int) -> dict[str, Any]:
+    return {"error": {"type": "search_phase_execution_exception"}, "status": status}
+
+
+DEFAULT_PARAMETERS = {
+    "query": "",
+    "publishers": [],
+    "information_categories": [],
+    "topics": [],
+}
+
+
+@override_es_settings
+@patch("woo_search.search_index.client.get_client")
+class SearchRequestTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.addCleanup(search_breaker.reset)
+        self.addCleanup(full_search_breaker.reset)
+
+    def _get_client(self, mock_get_client: MagicMock, **response) -> MagicMock:
+        client = mock_get_client.return_value.__enter__.return_value
+        client.options.return_value.search.return_value.body = get_es_response(
+            **response
+        )
+        # the tests make assertions on the search calls
+        return client.options.return_value
+
+    def test_file_contents_are_excluded_from_source(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+
+        with self.subTest("without explicit fields"):
+            get_search_results(**DEFAULT_PARAMETERS)
+
+            body = client.search.call_args.kwargs["body"]
+            self.assertEqual(body["_source"], {"excludes": ["document_data"]})
+
+        with self.subTest("with explicit fields"):
+            get_search_results(
+                **DEFAULT_PARAMETERS, source_fields={"uuid", "officiele_titel"}
+            )
+
+            body = client.search.call_args.kwargs["body"]
+            self.assertEqual(
+                body["_source"],
+                {
+                    "includes": ["officiele_titel", "uuid"],
+                    "excludes": ["document_data"],
+                },
+            )
+
+    def test_highlight(self, mock_get_client: MagicMock):
+        client = self._get_client(
+            mock_get_client,
+            hits=[
+                {
+                    "_index": "document",
+                    "_id": "9a4ab4d5-8d4b-4d3a-8b1a-0a4f9f0e2b7d",
+                    "_score": 1.0,
+                    "_source": {"uuid": "9a4ab4d5-8d4b-4d3a-8b1a-0a4f9f0e2b7d"},
+                    "highlight": {"omschrijving": ["het <em>besluit</em>"]},
+                    "inner_hits": {
+                        "document_data": {
+                            "hits": {
+                                "total": {"value": 1, "relation": "eq"},
+                                "max_score": 0.0,
+                                "hits": [
+                                    {
+                                        "_index": "document",
+                                        "_id": "9a4ab4d5-8d4b-4d3a-8b1a-0a4f9f0e2b7d",
+                                        "_nested": {
+                                            "field": "document_data",
+                                            "offset": 0,
+                                        },
+                                        "_score": 0.0,
+                                        "highlight": {
+                                            "document_data.attachment.content": [
+                                                "het <em>besluit</em> van de gemeente"
+                                            ]
+                                        },
+                                    }
+                                ],
+                            }
+                        }
+                    },
+                }
+            ],
+        )
+
+        results = get_search_results(
+            **{**DEFAULT_PARAMETERS, "query": "besluit"}, highlight=True
+        )
+
+        body = client.search.call_args.kwargs["body"]
+        self.assertEqual(
+            body["highlight"],
+            {
+                "type": "fvh",
+                "fragment_size": 150,
+                "number_of_fragments": 3,
+                "fields": {"omschrijving": {}},
+            },
+        )
+        # the nested file contents are highlighted in the inner hits
+        nested_query = body["query"]["bool"]["should"][0]["nested"]
+        self.assertEqual(nested_query["path"], "document_data")
+        self.assertEqual(nested_query["score_mode"], "none")
+        self.assertEqual(
+            nested_query["inner_hits"],
+            {
+                "_source": False,
+                "highlight": {
+                    "type": "fvh",
+                    "fragment_size": 150,
+                    "number_of_fragments": 3,
+                    "fields": {"document_data.attachment.content": {}},
+                },
+            },
+        )
+        self.assertIn("function_score", body["query"]["bool"]["must"][0])
+        self.assertEqual(
+            results.results[0].highlights,
+            ["het <em>besluit</em>", "het <em>besluit</em> van de gemeente"],
+        )
+
+    def test_no_highlight_without_query(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+
+        get_search_results(**DEFAULT_PARAMETERS, highlight=True)
+
+        body = client.search.call_args.kwargs["body"]
+        self.assertNotIn("highlight", body)
+
+    def test_exact_identifier_search(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+
+        get_search_results(
+            **{**DEFAULT_PARAMETERS, "query": " ZAAK-2024-001 "},
+            highlight=True,
+            exact_identifier=True,
+        )
+
+        body = client.search.call_args.kwargs["body"]
+        self.assertEqual(
+            body["query"]["function_score"]["query"],
+            {
+                "term": {
+                    "identifiers": {"value": "ZAAK-2024-001", "case_insensitive": True}
+                }
+            },
+        )
+        self.assertNotIn("highlight", body)
+
+    def test_time_budget(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+
+        get_search_results(**DEFAULT_PARAMETERS)
+
+        mock_get_client.return_value.__enter__.return_value.options.assert_called_with(
+            request_timeout=10.0
+        )
+        body = client.search.call_args.kwargs["body"]
+        self.assertEqual(body["timeout"], "5000ms")
+
+    def test_partial_results(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+        client.search.return_value.body["timed_out"] = True
+
+        results = get_search_results(**DEFAULT_PARAMETERS)
+
+        self.assertTrue(results.partial)
+        self.assertFalse(results.degraded)
+
+    def test_search_unavailable(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+        client.search.side_effect = ConnectionTimeout("timeout")
+
+        with self.assertRaises(SearchUnavailable):
+            get_search_results(**DEFAULT_PARAMETERS)
+
+    def test_client_errors_are_not_handled(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+        client.search.side_effect = BadRequestError(
+            "bad request", meta=MagicMock(status=400), body={}
+        )
+
+        with self.assertRaises(BadRequestError):
+            get_search_results(**DEFAULT_PARAMETERS)
+
+        # the cluster is fine
+        self.assertTrue(search_breaker.allows_request(reset_timeout=30))
+
+    def test_fail_fast_after_repeated_failures(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+        client.search.side_effect = ConnectionTimeout("timeout")
+        for _ in range(5):
+            with self.assertRaises(SearchUnavailable):
+                get_search_results(**DEFAULT_PARAMETERS)
+        client.search.reset_mock()
+
+        with self.assertRaises(SearchUnavailable):
+            get_search_results(**DEFAULT_PARAMETERS)
+
+        client.search.assert_not_called()
+
+    @override_settings(
+        SEARCH_INDEX={**ES_TEST_SETTINGS, "DEGRADED_SEARCH_THRESHOLD": -1}
+    )
+    def test_degraded_after_repeated_slow_searches(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+        parameters = {**DEFAULT_PARAMETERS, "query": "besluit", "highlight": True}
+        for _ in range(5):
+            results = get_search_results(**parameters)
+            self.assertFalse(results.degraded)
+
+        results = get_search_results(**parameters)
+
+        self.assertTrue(results.degraded)
+        self.assertEqual(results.publisher_buckets, [])
+        body = client.search.call_args.kwargs["body"]
+        self.assertNotIn("aggs", body)
+        self.assertNotIn("highlight", body)
+
+    def test_filter_values_are_sorted(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+
+        get_search_results(
+            **{
+                **DEFAULT_PARAMETERS,
+                "publishers": [
+                    UUID("d2b9d4a0-1f0b-4d7e-9a1d-3c1e0b6d6f01"),
+                    UUID("5c1b8f3e-2a4d-4b1e-8f0a-6e2d9c7b4a02"),
+                ],
+            },
+            result_types=["topic", "publication"],
+        )
+
+        body = client.search.call_args.kwargs["body"]
+        self.assertEqual(
+            body["post_filter"]["bool"]["must"],
+            [
+                {"terms": {"_index": ["publication", "topic"]}},
+                {
+                    "terms": {
+                        "publisher.uuid.keyword": [
+                            "5c1b8f3e-2a4d-4b1e-8f0a-6e2d9c7b4a02",
+                            "d2b9d4a0-1f0b-4d7e-9a1d-3c1e0b6d6f01",
+                        ]
+                    }
+                },
+            ],
+        )
+
+    @override_settings(
+        SEARCH_INDEX={**ES_TEST_SETTINGS, "REQUEST_CACHE_DATE_ROUNDING": "h"}
+    )
+    def test_request_cache_friendly_search(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+        client.msearch.return_value = {
+            "responses": [
+                {**get_es_response(), "aggregations": {}},
+                {**get_es_response(), "hits": {"hits": []}},
+            ]
+        }
+
+        get_search_results(
+            **DEFAULT_PARAMETERS,
+            registration_date_from=datetime(2026, 1, 5, 12, 30, tzinfo=UTC),
+            registration_date_to=datetime(2026, 1, 6, 12, 30, tzinfo=UTC),
+        )
+
+        client.search.assert_not_called()
+        hits_header, hits_body, facets_header, facets_body = (
+            client.msearch.call_args.kwargs["body"]
+        )
+        with self.subTest("dates are rounded"):
+            self.assertEqual(
+                hits_body["query"]["function_score"]["query"]["bool"]["filter"],
+                [
+                    {
+                        "range": {
+                            "registratiedatum": {
+                                "gte": datetime(2026, 1, 5, 12, tzinfo=UTC),
+                                "lt": datetime(2026, 1, 6, 13, tzinfo=UTC),
+                            }
+                        }
+                    }
+                ],
+            )
+            gauss = hits_body["query"]["function_score"]["functions"][0]["gauss"]
+            self.assertEqual(gauss["registratiedatum"]["origin"], "now/h")
+        with self.subTest("hits request"):
+            self.assertNotIn("request_cache", hits_header)
+            self.assertNotIn("aggs", hits_body)
+            self.assertEqual(hits_body["size"], 10)
+        with self.subTest("facets request"):
+            self.assertTrue(facets_header["request_cache"])
+            self.assertEqual(facets_body["size"], 0)
+            self.assertFalse(facets_body["track_total_hits"])
+            self.assertEqual(
+                facets_body["query"], hits_body["query"], "Same query expected"
+            )
+            self.assertEqual(
+                set(facets_body["aggs"]),
+                {"ResultType", "Publisher", "InformationCategories", "Topics"},
+            )
+            self.assertNotIn("_source", facets_body)
+
+    @override_settings(SEARCH_INDEX={**ES_TEST_SETTINGS, "TRACK_TOTAL_HITS": 100})
+    def test_total_hits_threshold(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+        client.search.return_value.body["hits"]["total"] = {
+            "value": 100,
+            "relation": "gte",
+        }
+
+        with self.subTest("first page"):
+            results = get_search_results(**DEFAULT_PARAMETERS)
+
+            body = client.search.call_args.kwargs["body"]
+            self.assertEqual(body["track_total_hits"], 100)
+            self.assertEqual(results.total_count, 100)
+            self.assertEqual(results.total_count_relation, "gte")
+
+        with self.subTest("page beyond the threshold"):
+            get_search_results(**DEFAULT_PARAMETERS, page=10, page_size=20)
+
+            # one more than the results up to and including the page
+            body = client.search.call_args.kwargs["body"]
+            self.assertEqual(body["track_total_hits"], 201)
+
+    @override_settings(SEARCH_INDEX={**ES_TEST_SETTINGS, "ROUTE_BY_PUBLISHER": True})
+    def test_single_publisher_search_is_routed(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+        client.msearch.return_value = {
+            "responses": [
+                {**get_es_response(), "aggregations": {}},
+                {**get_es_response(), "hits": {"hits": []}},
+            ]
+        }
+        publisher = UUID("d2b9d4a0-1f0b-4d7e-9a1d-3c1e0b6d6f01")
+
+        with self.subTest("single publisher"):
+            get_search_results(**{**DEFAULT_PARAMETERS, "publishers": [publisher]})
+
+            client.search.assert_not_called()
+            hits_header, _, facets_header, _ = client.msearch.call_args.kwargs["body"]
+            self.assertEqual(hits_header["routing"], str(publisher))
+            # the publisher facet includes the other publishers
+            self.assertNotIn("routing", facets_header)
+
+        with self.subTest("multiple publishers"):
+            get_search_results(
+                **{
+                    **DEFAULT_PARAMETERS,
+                    "publishers": [publisher, UUID(int=1)],
+                }
+            )
+
+            client.search.assert_called_once()
+            self.assertNotIn("routing", client.search.call_args.kwargs)
+
+    @override_settings(
+        SEARCH_INDEX={**ES_TEST_SETTINGS, "DOCUMENT_PARTITIONING": "year"}
+    )
+    def test_partitioned_documents_search(self, mock_get_client: MagicMock):
+        client = self._get_client(
+            mock_get_client,
+            hits=[{"_index": "document-2024", "_id": "1", "_source": {"uuid": "1"}}],
+        )
+        client.search.return_value.body["aggregations"]["ResultType"] = {
+            "FilteredResultType": {
+                "buckets": [
+                    {"key": "document-2024", "doc_count": 3},
+                    {"key": "topic", "doc_count": 2},
+                    {"key": "document-2023", "doc_count": 1},
+                ]
+            }
+        }
+
+        with self.subTest("registration date range"):
+            results = get_search_results(
+                **DEFAULT_PARAMETERS,
+                result_types=["document"],
+                registration_date_from=datetime(2023, 3, 1, tzinfo=UTC),
+                registration_date_to=datetime(2024, 6, 1, tzinfo=UTC),
+            )
+
+            kwargs = client.search.call_args.kwargs
+            # only the partitions of the range are searched
+            self.assertEqual(
+                kwargs["index"],
+                ["publication", "document-2023", "document-2024", "topic"],
+            )
+            self.assertTrue(kwargs["ignore_unavailable"])
+            self.assertEqual(
+                kwargs["body"]["post_filter"], {"wildcard": {"_index": "document-*"}}
+            )
+            self.assertEqual(results.results[0].type, "document")
+            self.assertEqual(
+                [
+                    (bucket.result_type, bucket.count)
+                    for bucket in results.result_type_buckets
+                ],
+                [("topic", 2), ("document", 4)],
+            )
+
+        with self.subTest("open ended range"):
+            get_search_results(
+                **DEFAULT_PARAMETERS,
+                registration_date_from=datetime(2023, 3, 1, tzinfo=UTC),
+            )
+
+            kwargs = client.search.call_args.kwargs
+            self.assertEqual(kwargs["index"], ["publication", "document", "topic"])
+            self.assertNotIn("ignore_unavailable", kwargs)
+
+    def test_chronological_search_terminates_early(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+        hits_response = get_es_response(hits=[{"_index": "topic", "_id": "1"}])
+        hits_response["hits"]["total"] = {"value": 21, "relation": "gte"}
+        client.msearch.return_value = {
+            "responses": [
+                {**hits_response, "aggregations": {}},
+                {**get_es_response(), "hits": {"hits": []}},
+            ]
+        }
+
+        results = get_search_results(
+            **DEFAULT_PARAMETERS, sort="chronological", page=2, page_size=10
+        )
+
+        client.search.assert_not_called()
+        _, hits_body, _, facets_body = client.msearch.call_args.kwargs["body"]
+        with self.subTest("hits request"):
+            # the index sorting, so that the shards can terminate early
+            self.assertEqual(
+                hits_body["sort"],
+                [
+                    {"gepubliceerd_op": {"order": "desc"}},
+                    {"uuid.keyword": {"order": "desc"}},
+                ],
+            )
+            self.assertEqual(hits_body["track_total_hits"], 21)
+            self.assertNotIn("aggs", hits_body)
+        with self.subTest("facets request"):
+            self.assertIn("aggs", facets_body)
+            self.assertFalse(facets_body["track_total_hits"])
+        with self.subTest("lower bound count"):
+            self.assertEqual(results.total_count, 21)
+            self.assertEqual(results.total_count_relation, "gte")
+
+    def test_failed_facets_search_degrades(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+        hits_response = get_es_response(hits=[{"_index": "topic", "_id": "1"}])
+        client.msearch.return_value = get_msearch_response(
+            {**hits_response, "aggregations": {}}, get_es_error(503)
+        )
+
+        results = get_search_results(**DEFAULT_PARAMETERS, sort="chronological")
+
+        self.assertTrue(results.degraded)
+        self.assertEqual(len(results.results), 1)
+        self.assertEqual(results.publisher_buckets, [])
+        for _ in range(4):
+            get_search_results(**DEFAULT_PARAMETERS, sort="chronological")
+        # the failures count towards degrading the searches
+        self.assertFalse(full_search_breaker.allows_request(reset_timeout=30))
+        self.assertTrue(search_breaker.allows_request(reset_timeout=30))
+
+    def test_failed_hits_search_is_unavailable(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+        client.msearch.return_value = get_msearch_response(
+            get_es_error(429), {**get_es_response(), "hits": {"hits": []}}
+        )
+
+        for _ in range(5):
+            with self.assertRaises(SearchUnavailable):
+                get_search_results(**DEFAULT_PARAMETERS, sort="chronological")
+
+        self.assertFalse(search_breaker.allows_request(reset_timeout=30))
+
+    def test_failed_search_client_errors_are_not_handled(
+        self, mock_get_client: MagicMock
+    ):
+        client = self._get_client(mock_get_client)
+        client.msearch.return_value = get_msearch_response(
+            {**get_es_response(), "aggregations": {}}, get_es_error(400)
+        )
+
+        with self.assertRaises(ApiError) as exc_context:
+            get_search_results(**DEFAULT_PARAMETERS, sort="chronological")
+
+        self.assertEqual(exc_context.exception.status_code, 400)
+        self.assertTrue(search_breaker.allows_request(reset_timeout=30))
+        self.assertTrue(full_search_breaker.allows_request(reset_timeout=30))
+
+
+@override_settings(
+    SEARCH_INDEX={
+        **ES_TEST_SETTINGS,
+        "IDENTIFIER_QUERY_PATTERNS": [r"ZAAK-\d{4}-\d+", r"\d{4}/\d+"],
+    }
+)
+@patch("woo_search.search_index.client.get_search_results")
+class IdentifierQueryTests(SimpleTestCase):
+    def _get_params(self, query: str):
+        serializer = SearchSerializer(data={"query": query})
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def _get_results(self, total_count: int) -> SearchResults:
+        return SearchResults(
+            total_count=total_count,
+            results=[],
+            result_type_buckets=[],
+            publisher_buckets=[],
+            topic_buckets=[],
+            information_category_buckets=[],
+        )
+
+    def test_identifier_queries(self, mock_get_search_results: MagicMock):
+        for query in ("ZAAK-2024-001", "2024/123", " ZAAK-2024-12345 "):
+            with self.subTest(query=query):
+                self.assertTrue(is_identifier_query(query))
+
+        for query in (
+            "",
+            "besluit",
+            "covid 19",
+            "covid-19",
+            "2024-01-01",
+            "01-01-2024",
+            "kenmerk-1",
+            "zaak-2024-001",
+            "ZAAK-2024-001 OR ZAAK-2024-002",
+        ):
+            with self.subTest(query=query):
+                self.assertFalse(is_identifier_query(query))
+
+    @override_es_settings
+    def test_no_identifier_queries_by_default(self, mock_get_search_results: MagicMock):
+        for query in ("ZAAK-2024-001", "covid-19", "2024-01-01", "kenmerk-1"):
+            with self.subTest(query=query):
+                self.assertFalse(is_identifier_query(query))
+
+        get_search_results_from_parameters(self._get_params("ZAAK-2024-001"))
+
+        mock_get_search_results.assert_called_once()
+        self.assertNotIn("exact_identifier", mock_get_search_results.call_args.kwargs)
+
+    def test_exact_match_is_returned(self, mock_get_search_results: MagicMock):
+        mock_get_search_results.return_value = results = self._get_results(1)
+
+        result = get_search_results_from_parameters(self._get_params("ZAAK-2024-001"))
+
+        self.assertIs(result, results)
+        mock_get_search_results.assert_called_once()
+        self.assertTrue(mock_get_search_results.call_args.kwargs["exact_identifier"])
+
+    def test_full_text_search_without_exact_match(
+        self, mock_get_search_results: MagicMock
+    ):
+        mock_get_search_results.side_effect = [
+            self._get_results(0),
+            results := self._get_results(3),
+        ]
+
+        result = get_search_results_from_parameters(self._get_params("ZAAK-2024-001"))
+
+        self.assertIs(result, results)
+        self.assertEqual(mock_get_search_results.call_count, 2)
+        self.assertNotIn("exact_identifier", mock_get_search_results.call_args.kwargs)
+
+    def test_other_queries_use_full_text_search(
+        self, mock_get_search_results: MagicMock
+    ):
+        get_search_results_from_parameters(self._get_params("besluit"))
+
+        mock_get_search_results.assert_called_once()
+        self.assertNotIn("exact_identifier", mock_get_search_results.call_args.kwargs)
+
+
+@override_es_settings
+@patch("woo_search.search_index.client.get_client")
+class SuggestRequestTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.addCleanup(search_breaker.reset)
+        self.addCleanup(suggest_breaker.reset)
+
+    def _get_client(self, mock_get_client: MagicMock, **response) -> MagicMock:
+        client = mock_get_client.return_value.__enter__.return_value
+        search = client.options.return_value.search
+        search.return_value.body = {
+            "took": 1,
+            "timed_out": False,
+            "hits": {"hits": []},
+            **response,
+        }
+        return client
+
+    def test_lightweight_request(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+
+        get_suggestions("gemeente bes")
+
+        client.options.assert_called_once_with(request_timeout=0.4)
+        call_kwargs = client.options.return_value.search.call_args.kwargs
+        self.assertEqual(call_kwargs["index"], ["topic", "publication", "document"])
+        body = call_kwargs["body"]
+        self.assertEqual(
+            body,
+            {
+                "query": {
+                    "multi_match": {
+                        "query": "gemeente bes",
+                        "type": "bool_prefix",
+                        "fields": [
+                            "officiele_titel.suggest",
+                            "officiele_titel.suggest._2gram",
+                            "officiele_titel.suggest._3gram",
+                            "verkorte_titel.suggest",
+                            "verkorte_titel.suggest._2gram",
+                            "verkorte_titel.suggest._3gram",
+                        ],
+                    }
+                },
+                "_source": ["uuid", "officiele_titel", "verkorte_titel"],
+                "track_total_hits": False,
+                "timeout": "200ms",
+                "size": 5,
+            },
+        )
+
+    def test_restrict_result_types(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+
+        get_suggestions("besluit", result_types=["publication"], size=3)
+
+        call_kwargs = client.options.return_value.search.call_args.kwargs
+        self.assertEqual(call_kwargs["index"], ["publication"])
+        self.assertEqual(call_kwargs["body"]["size"], 3)
+
+    def test_results(self, mock_get_client: MagicMock):
+        self._get_client(
+            mock_get_client,
+            hits={
+                "hits": [
+                    {
+                        "_index": "topic",
+                        "_id": "5a44e939-7305-40a8-a987-83ca1ff60d16",
+                        "_score": 2.0,
+                        "_source": {
+                            "uuid": "5a44e939-7305-40a8-a987-83ca1ff60d16",
+                            "officiele_titel": "Besluiten van de raad",
+                        },
+                    },
+                    {
+                        "_index": "publication",
+                        "_id": "6dae9be7-4f93-4aad-b56a-10b683b16dcc",
+                        "_score": 1.0,
+                        "_source": {
+                            "uuid": "6dae9be7-4f93-4aad-b56a-10b683b16dcc",
+                            "officiele_titel": "Besluit over de begroting",
+                            "verkorte_titel": "Begroting",
+                        },
+                    },
+                ]
+            },
+        )
+
+        suggestions = get_suggestions("besl")
+
+        self.assertEqual(
+            suggestions,
+            [
+                Suggestion(
+                    type="topic",
+                    uuid=UUID("5a44e939-7305-40a8-a987-83ca1ff60d16"),
+                    officiele_titel="Besluiten van de raad",
+                ),
+                Suggestion(
+                    type="publication",
+                    uuid=UUID("6dae9be7-4f93-4aad-b56a-10b683b16dcc"),
+                    officiele_titel="Besluit over de begroting",
+                    verkorte_titel="Begroting",
+                ),
+            ],
+        )
+
+    def test_no_suggestions_on_timeout(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+        client.options.return_value.search.side_effect = ConnectionTimeout("timeout")
+
+        suggestions = get_suggestions("besl")
+
+        self.assertEqual(suggestions, [])
+
+    def test_no_suggestions_on_cluster_errors(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+        errors = [
+            ConnectionError("unreachable"),
+            ApiError("unavailable", meta=MagicMock(status=503), body={}),
+            ApiError("too many requests", meta=MagicMock(status=429), body={}),
+        ]
+
+        for error in errors:
+            with self.subTest(error=error):
+                client.options.return_value.search.side_effect = error
+
+                suggestions = get_suggestions("besl")
+
+                self.assertEqual(suggestions, [])
+
+    def test_client_errors_are_not_handled(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+        client.options.return_value.search.side_effect = BadRequestError(
+            "bad request", meta=MagicMock(status=400), body={}
+        )
+
+        with self.assertRaises(BadRequestError):
+            get_suggestions("besl")
+
+        self.assertTrue(suggest_breaker.allows_request(reset_timeout=30))
+
+    def test_fail_fast_after_repeated_failures(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+        search = client.options.return_value.search
+        search.side_effect = ConnectionTimeout("timeout")
+        for _ in range(5):
+            self.assertEqual(get_suggestions("besl"), [])
+        search.reset_mock()
+
+        self.assertEqual(get_suggestions("besl"), [])
+
+        search.assert_not_called()
+
+    def test_no_suggestions_while_searches_fail(self, mock_get_client: MagicMock):
+        client = self._get_client(mock_get_client)
+        for _ in range(5):
+            search_breaker.record_failure(failure_threshold=5)
+
+        self.assertEqual(get_suggestions("besl"), [])
+
+        client.options.return_value.search.assert_not_called()
+
+
+class RoundDatetimeTests(SimpleTestCase):
+    def test_round_down(self):
+        value = datetime(2026, 1, 5, 12, 30, 15, tzinfo=UTC)
+
+        self.assertEqual(
+            _round_datetime(value, "m"), datetime(2026, 1, 5, 12, 30, tzinfo=UTC)
+        )
+        self.assertEqual(
+            _round_datetime(value, "h"), datetime(2026, 1, 5, 12, tzinfo=UTC)
+        )
+        self.assertEqual(_round_datetime(value, "d"), datetime(2026, 1, 5, tzinfo=UTC))
+
+    def test_round_up(self):
+        value = datetime(2026, 1, 5, 12, 30, 15, tzinfo=UTC)
+
+        self.assertEqual(
+            _round_datetime(value, "h", up=True),
+            datetime(2026, 1, 5, 13, tzinfo=UTC),
+        )
+        # whole units are left as is
+        self.assertEqual(
+            _round_datetime(datetime(2026, 1, 5, 12, tzinfo=UTC), "h", up=True),
+            datetime(2026, 1, 5, 12, tzinfo=UTC),
+        )
+
+    def test_no_rounding(self):
+        value = datetime(2026, 1, 5, 12, 30, 15, tzinfo=UTC)
+
+        self.assertEqual(_round_datetime(value, ""), value)
+        self.assertIsNone(_round_datetime(None, "h"))
@@ -2,11 +2,12 @@
 Unit test the serializer used for the search endpoint.
 """
 
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, override_settings
 from django.utils.translation import gettext as _
 
 from ..api.serializers import SearchSerializer
 from ..constants import ResultTypeChoices
+from .base import ES_TEST_SETTINGS
 
 
 class SerializerValidationTests(SimpleTestCase):
@@ -98,3 +99,10 @@ class SerializerValidationTests(SimpleTestCase):
                         "field."
                     ),
                 )
+
+    @override_settings(SEARCH_INDEX={**ES_TEST_SETTINGS, "QUERY_MAX_PHRASES": 1})
+    def test_validate_query_complexity(self):
+        serializer = SearchSerializer(data={"query": '"one" OR "two"'})
+
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors["query"][0].code, "too_complex")
@@ -0,0 +1,72 @@
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from ..management.commands.sync_flattened_uuids import SCRIPT
+
+
+@patch("woo_search.search_index.management.commands.sync_flattened_uuids.get_client")
+class SyncFlattenedUUIDsCommandTests(SimpleTestCase):
+    def test_updates_records_without_flattened_uuids(self, mock_get_client: MagicMock):
+        client = mock_get_client.return_value.__enter__.return_value
+        client.indices.get_mapping.return_value.body = {"document": {"mappings": {}}}
+        client.update_by_query.return_value.body = {"updated": 3}
+        stdout = StringIO()
+
+        call_command("sync_flattened_uuids", stdout=stdout)
+
+        client.update_by_query.assert_called_once()
+        call_kwargs = client.update_by_query.call_args.kwargs
+        self.assertEqual(call_kwargs["index"], ("publication", "document"))
+        self.assertEqual(
+            call_kwargs["query"],
+            {
+                "bool": {
+                    "must_not": [
+                        {"exists": {"field": "informatie_categorie_uuids"}},
+                        {"exists": {"field": "onderwerp_uuids"}},
+                    ]
+                }
+            },
+        )
+        self.assertEqual(call_kwargs["script"]["source"], SCRIPT)
+        self.assertEqual(
+            call_kwargs["script"]["params"],
+            {
+                "fields": {
+                    "informatie_categorie_uuids": "informatie_categorieen",
+                    "onderwerp_uuids": "onderwerpen",
+                }
+            },
+        )
+        self.assertIn("Synced 3 es documents", stdout.getvalue())
+
+    def test_skips_documents_without_stored_file_contents(
+        self, mock_get_client: MagicMock
+    ):
+        client = mock_get_client.return_value.__enter__.return_value
+        client.indices.get_mapping.return_value.body = {
+            "document": {"mappings": {"_source": {"excludes": ["document_data"]}}}
+        }
+        client.update_by_query.return_value.body = {"updated": 1}
+        stderr = StringIO()
+
+        call_command("sync_flattened_uuids", verbosity=0, stderr=stderr)
+
+        client.update_by_query.assert_called_once()
+        self.assertEqual(
+            client.update_by_query.call_args.kwargs["index"], ("publication",)
+        )
+        self.assertIn("skipping the documents", stderr.getvalue())
+
+    def test_cluster_unavailable(self, mock_get_client: MagicMock):
+        client = mock_get_client.return_value.__enter__.return_value
+        client.ping.return_value = False
+        stderr = StringIO()
+
+        call_command("sync_flattened_uuids", verbosity=0, stderr=stderr)
+
+        client.update_by_query.assert_not_called()
+        self.assertIn("Could not connect", stderr.getvalue())
@@ -1,8 +1,11 @@
-from django.core.management import call_command
+from unittest.mock import MagicMock, patch
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
 
 from woo_search.api.tests.mixin import TokenAuthMixin
 from woo_search.search_index.client import get_client
-from woo_search.utils.tests.vcr import VCRMixin
+from woo_search.utils.tests.vcr import VCRMixin, requires_recording
 
 from ..index import Document
 from ..tasks import index_document
@@ -13,6 +16,7 @@ from .factories import IndexDocumentFactory
 class SyncIdentifiersCommandTestCase(
     TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase
 ):
+    @requires_recording
     def test_update_empty_identifiers(self):
         doc1 = IndexDocumentFactory.build(
             uuid="af9fb832-1fd7-4ca1-885f-3588bdbb3984",
@@ -41,6 +45,7 @@ class SyncIdentifiersCommandTestCase(
             assert doc2 is not None
             self.assertEqual(doc2.identifiers, ["bar"])
 
+    @requires_recording
     def test_update_set_identifiers_does_not_update(self):
         doc1 = IndexDocumentFactory.build(
             uuid="af9fb832-1fd7-4ca1-885f-3588bdbb3984",
@@ -68,3 +73,17 @@ class SyncIdentifiersCommandTestCase(
             doc2 = Document.get(using=client, id="1761cf3a-72ba-4145-94c2-7b5c0ed3cc67")
             assert doc2 is not None
             self.assertEqual(doc2.identifiers, ["identifier-2"])
+
+
+class SyncIdentifiersWithoutStoredFileContentsTests(SimpleTestCase):
+    @patch("woo_search.search_index.management.commands.sync_identifiers.get_client")
+    def test_command_refuses_to_update_documents(self, mock_get_client: MagicMock):
+        client = mock_get_client.return_value.__enter__.return_value
+        client.indices.get_mapping.return_value.body = {
+            "document": {"mappings": {"_source": {"excludes": ["document_data"]}}}
+        }
+
+        with self.assertRaises(CommandError):
+            call_command("sync_identifiers", verbosity=0)
+
+        client.update_by_query.assert_not_called()
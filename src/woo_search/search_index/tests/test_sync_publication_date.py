@@ -4,7 +4,7 @@ from django.core.management import call_command
 
 from woo_search.api.tests.mixin import TokenAuthMixin
 from woo_search.search_index.client import get_client
-from woo_search.utils.tests.vcr import VCRMixin
+from woo_search.utils.tests.vcr import VCRMixin, requires_recording
 
 from ..index import Document, Publication, Topic
 from ..tasks import index_document, index_publication
@@ -15,6 +15,7 @@ from .factories import IndexDocumentFactory, IndexPublicationFactory
 class SyncPublicationDateCommandTestCase(
     TokenAuthMixin, VCRMixin, ElasticSearchAPITestCase
 ):
+    @requires_recording
     def test_update_empty_publication_date(self):
         pub = IndexPublicationFactory.build(
             uuid="83ec1da4-bb76-43bc-ac0a-857acf9b4541",
@@ -71,6 +72,7 @@ class SyncPublicationDateCommandTestCase(
                 datetime(2025, 1, 1, 1, 1, 1, tzinfo=UTC),
             )
 
+    @requires_recording
     def test_update_set_publication_date_does_not_update(self):
         pub = IndexPublicationFactory.build(
             uuid="83ec1da4-bb76-43bc-ac0a-857acf9b4541",
@@ -1,22 +1,38 @@
+import base64
+import io
+import os
+import zipfile
 from datetime import UTC, date, datetime
+from unittest.mock import MagicMock, patch
 
-from django.test import override_settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
 
-from elasticsearch import NotFoundError
+import py7zr
+from celery.signals import before_task_publish, task_success
+from elasticsearch import ConflictError, NotFoundError
 
-from woo_search.utils.tests.vcr import VCRMixin
+from woo_search.utils.tests.vcr import VCRMixin, requires_recording
 
-from ..client import get_client
-from ..index import Document, Publication, Topic
+from ..client import SearchResults, get_client
+from ..index import Document, Publication, Topic, get_document_partitions
+from ..landing_page import LANDING_PAGE_CACHE_KEY
 from ..tasks import (
+    _extract_documents,
+    _iter_7z_content,
+    _iter_zip_content,
+    _prepare_document_data,
+    _read_7z_members,
     index_document,
     index_publication,
     index_topic,
+    payload_cache,
+    refresh_landing_page,
     remove_document_from_index,
     remove_publication_from_index,
     remove_topic_from_index,
 )
-from .base import ElasticSearchTestCase
+from .base import ES_TEST_SETTINGS, ElasticSearchTestCase
 from .factories import (
     IndexDocumentFactory,
     IndexPublicationFactory,
@@ -369,13 +385,7 @@ class DocumentTaskTest(VCRMixin, ElasticSearchTestCase):
 
     @override_settings(
         SEARCH_INDEX={
-            "HOST": "http://localhost:9201",
-            "USER": "",
-            "PASSWORD": "",
-            "TIMEOUT": 3,
-            "CA_CERTS": "",
-            "REFRESH": "wait_for",
-            "INDEXED_CHARS": -1,
+            **ES_TEST_SETTINGS,
             "MAX_INDEX_FILE_SIZE": 1000,  # byte
         }
     )
@@ -630,13 +640,7 @@ class DocumentTaskTest(VCRMixin, ElasticSearchTestCase):
 
     @override_settings(
         SEARCH_INDEX={
-            "HOST": "http://localhost:9201",
-            "USER": "",
-            "PASSWORD": "",
-            "TIMEOUT": 3,
-            "CA_CERTS": "",
-            "REFRESH": "wait_for",
-            "INDEXED_CHARS": -1,
+            **ES_TEST_SETTINGS,
             "MAX_INDEX_FILE_SIZE": 1000,  # byte
         }
     )
@@ -690,13 +694,7 @@ class DocumentTaskTest(VCRMixin, ElasticSearchTestCase):
 
     @override_settings(
         SEARCH_INDEX={
-            "HOST": "http://localhost:9201",
-            "USER": "",
-            "PASSWORD": "",
-            "TIMEOUT": 3,
-            "CA_CERTS": "",
-            "REFRESH": "wait_for",
-            "INDEXED_CHARS": -1,
+            **ES_TEST_SETTINGS,
             "MAX_INDEX_FILE_SIZE": 500,  # byte
         }
     )
@@ -976,6 +974,394 @@ class PublicationTaskTest(VCRMixin, ElasticSearchTestCase):
             )
 
 
+@override_settings(
+    SEARCH_INDEX={**ES_TEST_SETTINGS, "PROPAGATE_PUBLICATION_CHANGES": True}
+)
+class PublicationChangesPropagationTests(SimpleTestCase):
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_changed_fields_are_propagated_to_documents(
+        self, mock_get_client: MagicMock
+    ):
+        client = mock_get_client.return_value.__enter__.return_value
+        pub = IndexPublicationFactory.build(
+            uuid="ad4d66a8-1503-4743-ae55-d1765512530c",
+            publisher={
+                "uuid": "f8b2b355-1d6e-4c1a-ba18-565f422997da",
+                "naam": "Utrecht",
+            },
+            informatie_categorieen=[
+                {"uuid": "c9001845-aef0-4150-bbf0-a5f5c096e603", "naam": "Changed"}
+            ],
+        )
+        client.get.return_value = {
+            "_source": {
+                "publisher": pub["publisher"],
+                "informatie_categorieen": [
+                    {"uuid": "3c42a70a-d81d-4143-91d1-ebf62ac8b597", "naam": "WOO"}
+                ],
+            }
+        }
+
+        index_publication(**pub)
+
+        client.update_by_query.assert_called_once()
+        call_kwargs = client.update_by_query.call_args.kwargs
+        self.assertEqual(call_kwargs["index"], ["document"])
+        self.assertEqual(
+            call_kwargs["query"],
+            {"match_phrase": {"publicatie": "ad4d66a8-1503-4743-ae55-d1765512530c"}},
+        )
+        self.assertEqual(
+            call_kwargs["script"]["params"],
+            {
+                "informatie_categorieen": [
+                    {"uuid": "c9001845-aef0-4150-bbf0-a5f5c096e603", "naam": "Changed"}
+                ],
+                "informatie_categorie_uuids": ["c9001845-aef0-4150-bbf0-a5f5c096e603"],
+            },
+        )
+
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_unchanged_publication_does_not_update_documents(
+        self, mock_get_client: MagicMock
+    ):
+        client = mock_get_client.return_value.__enter__.return_value
+        pub = IndexPublicationFactory.build()
+        client.get.return_value = {
+            "_source": {
+                "publisher": pub["publisher"],
+                "informatie_categorieen": pub["informatie_categorieen"],
+            }
+        }
+
+        index_publication(**pub)
+
+        client.index.assert_called_once()
+        client.update_by_query.assert_not_called()
+
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_documents_without_stored_file_contents_are_not_updated(
+        self, mock_get_client: MagicMock
+    ):
+        client = mock_get_client.return_value.__enter__.return_value
+        client.indices.get_mapping.return_value.body = {
+            "document": {"mappings": {"_source": {"excludes": ["document_data"]}}}
+        }
+        pub = IndexPublicationFactory.build()
+        client.get.side_effect = NotFoundError(
+            "not_found", meta=MagicMock(status=404), body={}
+        )
+
+        index_publication(**pub)
+
+        client.index.assert_called_once()
+        client.update_by_query.assert_not_called()
+
+
+def get_routing_client(
+    mock_get_client: MagicMock,
+    aliases: dict[str, dict[str, dict]] | None = None,
+    stored_copies=(),
+) -> MagicMock:
+    """
+    Set up the client of the tasks with the aliases of the (concrete) indices and the
+    stored copies of the record found by the multi get.
+    """
+    client = mock_get_client.return_value.__enter__.return_value
+    client.indices.get_alias.side_effect = lambda index: MagicMock(
+        body={
+            index_name: {"aliases": index_aliases}
+            for index_name, index_aliases in (aliases or {}).items()
+            # the document partitions are in the document alias
+            if index_name == index or index_name.startswith(f"{index}-")
+        }
+    )
+    client.mget.return_value = {
+        "docs": [copy | {"found": True} for copy in stored_copies]
+    }
+    return client
+
+
+def get_publisher_alias(publisher_uuid: str) -> dict[str, dict]:
+    return {
+        f"publisher-{publisher_uuid}": {
+            "filter": {"term": {"publisher.uuid.keyword": publisher_uuid}},
+            "index_routing": publisher_uuid,
+            "search_routing": publisher_uuid,
+        }
+    }
+
+
+@override_settings(
+    SEARCH_INDEX={
+        **ES_TEST_SETTINGS,
+        "ROUTE_BY_PUBLISHER": True,
+        "PROPAGATE_PUBLICATION_CHANGES": True,
+    }
+)
+@patch("woo_search.search_index.tasks.get_client")
+class PublisherRoutingTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.publisher = {
+            "uuid": "f8b2b355-1d6e-4c1a-ba18-565f422997da",
+            "naam": "Utrecht",
+        }
+
+    def test_records_are_routed_by_publisher(self, mock_get_client: MagicMock):
+        client = get_routing_client(
+            mock_get_client,
+            aliases={
+                "publication": {},
+                "document": get_publisher_alias(self.publisher["uuid"]),
+            },
+        )
+        client.get.side_effect = NotFoundError(
+            "not_found", meta=MagicMock(status=404), body={}
+        )
+
+        index_publication(**IndexPublicationFactory.build(publisher=self.publisher))
+        index_document(**IndexDocumentFactory.build(publisher=self.publisher))
+
+        self.assertEqual(client.index.call_count, 2)
+        for index_call in client.index.call_args_list:
+            with self.subTest(index=index_call.kwargs["index"]):
+                self.assertEqual(index_call.kwargs["routing"], self.publisher["uuid"])
+        # only the index that isn't in the alias yet is added to it
+        client.indices.put_alias.assert_called_once_with(
+            index="publication",
+            name="publisher-f8b2b355-1d6e-4c1a-ba18-565f422997da",
+            filter={"term": {"publisher.uuid.keyword": self.publisher["uuid"]}},
+            routing=self.publisher["uuid"],
+        )
+        # there are no other publishers to look up previous copies for
+        client.mget.assert_not_called()
+        client.delete.assert_not_called()
+
+    def test_copy_with_previous_routing_is_removed(self, mock_get_client: MagicMock):
+        doc = IndexDocumentFactory.build(publisher=self.publisher)
+        client = get_routing_client(
+            mock_get_client,
+            aliases={
+                "document": get_publisher_alias(self.publisher["uuid"])
+                | get_publisher_alias("previous")
+                | get_publisher_alias("other")
+            },
+            stored_copies=[
+                {"_index": "document", "_id": doc["uuid"], "_routing": "previous"},
+            ],
+        )
+
+        index_document(**doc)
+
+        # the copies are looked up in real time, with the routing of the other
+        # publishers
+        client.mget.assert_called_once_with(
+            docs=[
+                {"_index": "document", "_id": doc["uuid"], "routing": "other"},
+                {"_index": "document", "_id": doc["uuid"], "routing": "previous"},
+            ],
+            source=False,
+        )
+        client.delete.assert_called_once_with(
+            index="document", id=doc["uuid"], routing="previous"
+        )
+        self.assertEqual(
+            client.index.call_args.kwargs["routing"], doc["publisher"]["uuid"]
+        )
+
+    def test_copy_in_same_shard_is_not_removed(self, mock_get_client: MagicMock):
+        doc = IndexDocumentFactory.build(publisher=self.publisher)
+        client = get_routing_client(
+            mock_get_client,
+            aliases={"document": get_publisher_alias("other")},
+            # the routing of the other publisher points to the same shard
+            stored_copies=[
+                {
+                    "_index": "document",
+                    "_id": doc["uuid"],
+                    "_routing": self.publisher["uuid"],
+                },
+            ],
+        )
+
+        index_document(**doc)
+
+        client.delete.assert_not_called()
+        client.index.assert_called_once()
+
+    def test_records_are_removed_in_all_shards(self, mock_get_client: MagicMock):
+        client = get_routing_client(
+            mock_get_client,
+            aliases={
+                "document": get_publisher_alias(self.publisher["uuid"])
+                | get_publisher_alias("other")
+            },
+        )
+        client.delete_by_query.return_value = {"deleted": 1}
+
+        remove_document_from_index(uuid="ad4d66a8-1503-4743-ae55-d1765512530c")
+
+        # the routing is unknown, a single request removes the record from all shards
+        client.delete_by_query.assert_called_once_with(
+            index="document",
+            query={"ids": {"values": ["ad4d66a8-1503-4743-ae55-d1765512530c"]}},
+            conflicts="proceed",
+        )
+        client.indices.get_alias.assert_not_called()
+        client.mget.assert_not_called()
+        client.delete.assert_not_called()
+
+    def test_topics_are_not_routed(self, mock_get_client: MagicMock):
+        client = get_routing_client(mock_get_client)
+
+        index_topic(**IndexTopicFactory.build())
+        remove_topic_from_index(uuid="ad4d66a8-1503-4743-ae55-d1765512530c")
+
+        self.assertNotIn("routing", client.index.call_args.kwargs)
+        client.indices.put_alias.assert_not_called()
+        client.delete.assert_called_once()
+
+    def test_publisher_change_is_not_propagated(self, mock_get_client: MagicMock):
+        client = get_routing_client(mock_get_client)
+        pub = IndexPublicationFactory.build(
+            publisher=self.publisher,
+            informatie_categorieen=[
+                {"uuid": "c9001845-aef0-4150-bbf0-a5f5c096e603", "naam": "Changed"}
+            ],
+        )
+        client.get.return_value = {
+            "_source": {
+                "publisher": {"uuid": "other", "naam": "Other"},
+                "informatie_categorieen": [],
+            }
+        }
+
+        index_publication(**pub)
+
+        self.assertEqual(client.get.call_args.kwargs["routing"], self.publisher["uuid"])
+        client.update_by_query.assert_called_once()
+        params = client.update_by_query.call_args.kwargs["script"]["params"]
+        self.assertNotIn("publisher", params)
+        self.assertIn("informatie_categorieen", params)
+
+
+@override_settings(SEARCH_INDEX={**ES_TEST_SETTINGS, "DOCUMENT_PARTITIONING": "year"})
+@patch("woo_search.search_index.tasks.get_client")
+class DocumentPartitioningTests(SimpleTestCase):
+    def test_document_is_stored_in_partition(self, mock_get_client: MagicMock):
+        client = get_routing_client(
+            mock_get_client, aliases={"document-2024": {"document": {}}}
+        )
+        doc = IndexDocumentFactory.build(
+            registratiedatum=datetime(2024, 12, 31, 23, 30, tzinfo=UTC)
+        )
+
+        index_document(**doc)
+
+        self.assertEqual(client.index.call_args.kwargs["index"], "document-2024")
+        # the partitions are looked up through the alias
+        client.indices.get_alias.assert_called_once_with(index="document")
+        client.mget.assert_not_called()
+        client.delete.assert_not_called()
+
+    def test_copy_in_previous_partition_is_removed(self, mock_get_client: MagicMock):
+        doc = IndexDocumentFactory.build(
+            registratiedatum=datetime(2025, 1, 2, tzinfo=UTC)
+        )
+        client = get_routing_client(
+            mock_get_client,
+            aliases={
+                "document-2024": {"document": {}},
+                "document-2025": {"document": {}},
+            },
+            stored_copies=[{"_index": "document-2024", "_id": doc["uuid"]}],
+        )
+
+        index_document(**doc)
+
+        client.mget.assert_called_once_with(
+            docs=[{"_index": "document-2024", "_id": doc["uuid"]}], source=False
+        )
+        client.delete.assert_called_once_with(
+            index="document-2024", id=doc["uuid"], routing=None
+        )
+        self.assertEqual(client.index.call_args.kwargs["index"], "document-2025")
+
+    def test_document_is_removed_from_all_partitions(self, mock_get_client: MagicMock):
+        client = get_routing_client(
+            mock_get_client,
+            aliases={
+                "document-2024": {"document": {}},
+                "document-2025": {"document": {}},
+            },
+        )
+        client.delete_by_query.return_value = {"deleted": 1}
+
+        remove_document_from_index(uuid="ad4d66a8-1503-4743-ae55-d1765512530c")
+
+        client.delete_by_query.assert_called_once_with(
+            index="document",
+            query={"ids": {"values": ["ad4d66a8-1503-4743-ae55-d1765512530c"]}},
+            conflicts="proceed",
+        )
+        client.mget.assert_not_called()
+        client.delete.assert_not_called()
+
+    def test_removal_of_unknown_document_is_logged(self, mock_get_client: MagicMock):
+        client = get_routing_client(
+            mock_get_client, aliases={"document-2024": {"document": {}}}
+        )
+        client.delete_by_query.return_value = {"deleted": 0}
+
+        with self.assertLogs("woo_search.search_index.tasks", "INFO") as logs:
+            remove_document_from_index(uuid="ad4d66a8-1503-4743-ae55-d1765512530c")
+
+        client.delete_by_query.assert_called_once()
+        self.assertIn("index_removal_aborted", logs.output[0])
+
+    def test_publications_are_not_partitioned(self, mock_get_client: MagicMock):
+        client = get_routing_client(mock_get_client)
+
+        index_publication(**IndexPublicationFactory.build())
+        remove_publication_from_index(uuid="ad4d66a8-1503-4743-ae55-d1765512530c")
+
+        self.assertEqual(client.index.call_args.kwargs["index"], "publication")
+        client.mget.assert_not_called()
+        client.delete.assert_called_once()
+
+    def test_get_document_partitions(self, mock_get_client: MagicMock):
+        start = datetime(2024, 11, 15, tzinfo=UTC)
+        end = datetime(2025, 2, 1, tzinfo=UTC)
+
+        with self.subTest("yearly"):
+            self.assertEqual(
+                get_document_partitions(start, end), ["document-2024", "document-2025"]
+            )
+
+        with (
+            self.subTest("monthly"),
+            override_settings(
+                SEARCH_INDEX={**ES_TEST_SETTINGS, "DOCUMENT_PARTITIONING": "month"}
+            ),
+        ):
+            self.assertEqual(
+                get_document_partitions(start, end),
+                [
+                    "document-2024-11",
+                    "document-2024-12",
+                    "document-2025-01",
+                    "document-2025-02",
+                ],
+            )
+
+        with self.subTest("too many partitions"):
+            self.assertIsNone(
+                get_document_partitions(datetime(1900, 1, 1, tzinfo=UTC), end)
+            )
+
+
 class TopicTaskTest(VCRMixin, ElasticSearchTestCase):
     def test_index_topic_roundtrip(self):
         topic_uuid = "d6787e70-0577-4c20-bb3a-1a67d92626a9"
@@ -1055,12 +1441,52 @@ class TopicTaskTest(VCRMixin, ElasticSearchTestCase):
             )
 
 
+class FlattenedUUIDFieldsTests(SimpleTestCase):
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_publication_is_indexed_with_flattened_uuids(
+        self, mock_get_client: MagicMock
+    ):
+        client = mock_get_client.return_value.__enter__.return_value
+        pub = IndexPublicationFactory.build()
+
+        index_publication(**pub)
+
+        client.index.assert_called_once()
+        body = client.index.call_args.kwargs["body"]
+        self.assertEqual(
+            body["informatie_categorie_uuids"],
+            [category["uuid"] for category in pub["informatie_categorieen"]],
+        )
+        self.assertEqual(
+            body.get("onderwerp_uuids", []),
+            [topic["uuid"] for topic in pub["onderwerpen"]],
+        )
+
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_document_is_indexed_with_flattened_uuids(self, mock_get_client: MagicMock):
+        client = mock_get_client.return_value.__enter__.return_value
+        doc = IndexDocumentFactory.build(onderwerpen=[])
+
+        index_document(**doc)
+
+        client.index.assert_called_once()
+        body = client.index.call_args.kwargs["body"]
+        self.assertEqual(
+            body["informatie_categorie_uuids"],
+            [category["uuid"] for category in doc["informatie_categorieen"]],
+        )
+        # empty lists are left out of the indexed body
+        self.assertNotIn("onderwerp_uuids", body)
+
+
 class RemoveFromIndexTaskTests(VCRMixin, ElasticSearchTestCase):
+    @requires_recording
     def test_remove_non_existing_document(self):
         result = remove_document_from_index("dd2635a9-228f-4cda-9bec-66310ccbb6a1")
 
         self.assertIsNone(result)
 
+    @requires_recording
     def test_remove_indexed_document(self):
         doc = IndexDocumentFactory.build(uuid="ad4d66a8-1503-4743-ae55-d1765512530c")
         index_document(**doc)
@@ -1074,11 +1500,13 @@ class RemoveFromIndexTaskTests(VCRMixin, ElasticSearchTestCase):
         ):
             Document.get(id="ad4d66a8-1503-4743-ae55-d1765512530c", using=client)
 
+    @requires_recording
     def test_remove_non_existing_publication(self):
         result = remove_publication_from_index("dd2635a9-228f-4cda-9bec-66310ccbb6a1")
 
         self.assertIsNone(result)
 
+    @requires_recording
     def test_remove_indexed_publication(self):
         pub = IndexPublicationFactory.build(uuid="ad4d66a8-1503-4743-ae55-d1765512530c")
         index_publication(**pub)
@@ -1092,11 +1520,38 @@ class RemoveFromIndexTaskTests(VCRMixin, ElasticSearchTestCase):
         ):
             Publication.get(id="ad4d66a8-1503-4743-ae55-d1765512530c", using=client)
 
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_remove_publication_cascades_to_documents(self, mock_get_client: MagicMock):
+        client = mock_get_client.return_value.__enter__.return_value
+        client.delete_by_query.return_value = {"deleted": 3}
+
+        remove_publication_from_index(
+            "ad4d66a8-1503-4743-ae55-d1765512530c", cascade=True
+        )
+
+        client.delete_by_query.assert_called_once_with(
+            index=["document"],
+            body={
+                "query": {
+                    "match_phrase": {
+                        "publicatie": "ad4d66a8-1503-4743-ae55-d1765512530c"
+                    }
+                }
+            },
+            conflicts="proceed",
+            refresh=True,
+        )
+        client.delete.assert_called_once_with(
+            index="publication", id="ad4d66a8-1503-4743-ae55-d1765512530c"
+        )
+
+    @requires_recording
     def test_remove_non_existing_topic(self):
         result = remove_topic_from_index("5c640122-843d-4352-b53a-8a405341521c")
 
         self.assertIsNone(result)
 
+    @requires_recording
     def test_remove_indexed_topic(self):
         topic = IndexTopicFactory.build(uuid="177e5bac-bdc1-4aff-b4de-96eedd8753e6")
         index_topic(**topic)
@@ -1109,3 +1564,560 @@ class RemoveFromIndexTaskTests(VCRMixin, ElasticSearchTestCase):
             self.assertRaises(NotFoundError),
         ):
             Topic.get(id="177e5bac-bdc1-4aff-b4de-96eedd8753e6", using=client)
+
+
+@override_settings(
+    SEARCH_INDEX={**ES_TEST_SETTINGS, "LANDING_PAGE_REFRESH_INTERVAL": 60}
+)
+class LandingPageRefreshTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def _get_results(self, **kwargs) -> SearchResults:
+        return SearchResults(
+            results=[],
+            result_type_buckets=[],
+            publisher_buckets=[],
+            topic_buckets=[],
+            information_category_buckets=[],
+            **{"total_count": 1, **kwargs},
+        )
+
+    @patch("woo_search.search_index.landing_page.get_search_results_from_parameters")
+    def test_results_are_precomputed(self, mock_search: MagicMock):
+        mock_search.return_value = results = self._get_results()
+
+        refresh_landing_page()
+
+        (params,), _ = mock_search.call_args
+        self.assertEqual(params["sort"], "chronological")
+        self.assertEqual(params["query"], "")
+        self.assertEqual(params["page"], 1)
+        self.assertEqual(cache.get(LANDING_PAGE_CACHE_KEY), results)
+
+    @patch("woo_search.search_index.landing_page.get_search_results_from_parameters")
+    def test_incomplete_results_are_not_stored(self, mock_search: MagicMock):
+        cache.set(LANDING_PAGE_CACHE_KEY, previous := self._get_results())
+
+        for kwargs in ({"degraded": True}, {"partial": True}):
+            with self.subTest(**kwargs):
+                mock_search.return_value = self._get_results(total_count=2, **kwargs)
+
+                refresh_landing_page()
+
+                self.assertEqual(cache.get(LANDING_PAGE_CACHE_KEY), previous)
+
+    @patch("woo_search.search_index.tasks.refresh_landing_page.apply_async")
+    def test_refresh_is_scheduled_after_index_changes(self, mock_apply_async):
+        for task in (index_document, remove_publication_from_index, index_topic):
+            task_success.send(sender=task, result=None)
+
+        # the changes are bundled into a single refresh
+        mock_apply_async.assert_called_once_with(countdown=10)
+
+        with self.subTest("other tasks"):
+            mock_apply_async.reset_mock()
+            cache.clear()
+
+            task_success.send(sender=refresh_landing_page, result=None)
+
+            mock_apply_async.assert_not_called()
+
+
+class IndexTaskCoalescingTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def _publish(self, task, task_id: str, uuid: str) -> None:
+        # emulate the broker publishing a task message (protocol v2)
+        before_task_publish.send(
+            sender=task.name,
+            headers={"id": task_id},
+            body=((), {"uuid": uuid}, {}),
+        )
+
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_superseded_task_is_skipped(self, mock_get_client: MagicMock):
+        pub = IndexPublicationFactory.build()
+        self._publish(index_publication, "task-1", pub["uuid"])
+        self._publish(index_publication, "task-2", pub["uuid"])
+
+        index_publication.apply(kwargs=pub, task_id="task-1").get()
+
+        mock_get_client.assert_not_called()
+
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_latest_task_is_executed(self, mock_get_client: MagicMock):
+        pub = IndexPublicationFactory.build()
+        self._publish(index_publication, "task-1", pub["uuid"])
+        self._publish(index_publication, "task-2", pub["uuid"])
+
+        index_publication.apply(kwargs=pub, task_id="task-2").get()
+
+        mock_get_client.assert_called_once()
+
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_superseded_task_is_executed_when_latest_task_failed(
+        self, mock_get_client: MagicMock
+    ):
+        pub = IndexPublicationFactory.build()
+        self._publish(index_publication, "task-1", pub["uuid"])
+        self._publish(index_publication, "task-2", pub["uuid"])
+        mock_get_client.side_effect = [ConnectionError("Unavailable"), MagicMock()]
+
+        result = index_publication.apply(kwargs=pub, task_id="task-2")
+        self.assertTrue(result.failed())
+        index_publication.apply(kwargs=pub, task_id="task-1").get()
+
+        self.assertEqual(mock_get_client.call_count, 2)
+
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_tasks_for_other_records_are_not_affected(self, mock_get_client: MagicMock):
+        topic = IndexTopicFactory.build()
+        self._publish(index_topic, "task-1", topic["uuid"])
+        self._publish(index_topic, "task-2", "3f0c8d2e-1d7e-4a4f-9d0a-2f1c2d3e4f5a")
+
+        index_topic.apply(kwargs=topic, task_id="task-1").get()
+
+        mock_get_client.assert_called_once()
+
+
+@override_settings(SEARCH_INDEX={**ES_TEST_SETTINGS, "EXTERNAL_VERSIONING": True})
+class ExternalVersioningTests(SimpleTestCase):
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_last_modified_date_is_used_as_version(self, mock_get_client: MagicMock):
+        client = mock_get_client.return_value.__enter__.return_value
+        topic = IndexTopicFactory.build(
+            laatst_gewijzigd_datum=datetime(2026, 1, 5, 12, 0, 0, tzinfo=UTC)
+        )
+
+        index_topic(**topic)
+
+        client.index.assert_called_once()
+        call_kwargs = client.index.call_args.kwargs
+        self.assertEqual(call_kwargs["version"], 1767614400000)
+        self.assertEqual(call_kwargs["version_type"], "external_gte")
+
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_stale_write_is_not_an_error(self, mock_get_client: MagicMock):
+        client = mock_get_client.return_value.__enter__.return_value
+        client.index.side_effect = ConflictError(
+            "version_conflict_engine_exception", meta=MagicMock(status=409), body={}
+        )
+        client.get.return_value = {
+            "_version": 1893456000000,
+            "_source": {"laatst_gewijzigd_datum": "2030-01-01T00:00:00+00:00"},
+        }
+        pub = IndexPublicationFactory.build(
+            laatst_gewijzigd_datum=datetime(2026, 1, 5, 12, 0, 0, tzinfo=UTC)
+        )
+
+        try:
+            index_publication(**pub)
+        except ConflictError:  # pragma: no cover
+            self.fail("Stale writes must not crash the task.")
+
+        client.index.assert_called_once()
+
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_unchanged_record_is_written_after_update_by_query(
+        self, mock_get_client: MagicMock
+    ):
+        client = mock_get_client.return_value.__enter__.return_value
+        client.index.side_effect = [
+            ConflictError(
+                "version_conflict_engine_exception", meta=MagicMock(status=409), body={}
+            ),
+            {"result": "updated"},
+        ]
+        # two updates by query incremented the version
+        client.get.return_value = {
+            "_version": 1767614400002,
+            "_source": {"laatst_gewijzigd_datum": "2026-01-05T12:00:00+00:00"},
+        }
+        topic = IndexTopicFactory.build(
+            laatst_gewijzigd_datum=datetime(2026, 1, 5, 12, 0, 0, tzinfo=UTC)
+        )
+
+        index_topic(**topic)
+
+        self.assertEqual(client.index.call_count, 2)
+        call_kwargs = client.index.call_args.kwargs
+        self.assertEqual(call_kwargs["version"], 1767614400002)
+        self.assertEqual(call_kwargs["version_type"], "external_gte")
+        self.assertEqual(
+            client.get.call_args.kwargs,
+            {
+                "index": "topic",
+                "id": topic["uuid"],
+                "source_includes": ["laatst_gewijzigd_datum"],
+            },
+        )
+
+
+@override_settings(SEARCH_INDEX={**ES_TEST_SETTINGS, "CBOR_TRANSPORT": True})
+class CborTransportTests(SimpleTestCase):
+    @patch("woo_search.search_index.tasks._download_document")
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_document_with_file_content_is_sent_as_cbor(
+        self, mock_get_client: MagicMock, mock_download: MagicMock
+    ):
+        client = mock_get_client.return_value.__enter__.return_value
+        mock_download.return_value = [{"document_data": b"%PDF-1.4 binary content"}]
+        doc = IndexDocumentFactory.build(
+            download_url="https://example.com/download", file_size=100
+        )
+
+        index_document(**doc)
+
+        client.index.assert_not_called()
+        client.perform_request.assert_called_once()
+        call_args = client.perform_request.call_args
+        self.assertEqual(call_args.args, ("PUT", f"/document/_doc/{doc['uuid']}"))
+        self.assertEqual(
+            call_args.kwargs["headers"]["content-type"],
+            "application/vnd.elasticsearch+cbor; compatible-with=8",
+        )
+        self.assertEqual(call_args.kwargs["params"]["pipeline"], "document_attachment")
+        self.assertEqual(
+            call_args.kwargs["body"]["document_data"],
+            [{"document_data": b"%PDF-1.4 binary content"}],
+        )
+
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_document_without_file_content_is_sent_as_json(
+        self, mock_get_client: MagicMock
+    ):
+        client = mock_get_client.return_value.__enter__.return_value
+        doc = IndexDocumentFactory.build()
+
+        index_document(**doc)
+
+        client.index.assert_called_once()
+        client.perform_request.assert_not_called()
+
+    def test_cbor_body_is_smaller_than_json(self):
+        file_contents = os.urandom(1_000_000)
+        body = {
+            "uuid": "0095704d-4216-4de3-83d2-20dba551b0dc",
+            "registratiedatum": datetime(2026, 1, 5, 12, 0, 0, tzinfo=UTC),
+        }
+        serializers = get_client().transport.serializers
+
+        with self.subTest("base64 in JSON"):
+            json_body = serializers.dumps(
+                body
+                | {
+                    "document_data": [
+                        {"document_data": base64.b64encode(file_contents).decode()}
+                    ]
+                },
+                mimetype="application/json",
+            )
+
+        with self.subTest("raw bytes in CBOR"):
+            cbor_body = serializers.dumps(
+                body | {"document_data": [{"document_data": file_contents}]},
+                mimetype="application/vnd.elasticsearch+cbor",
+            )
+            decoded = serializers.loads(
+                cbor_body, mimetype="application/vnd.elasticsearch+cbor"
+            )
+            self.assertEqual(decoded["registratiedatum"], "2026-01-05T12:00:00+00:00")
+            self.assertEqual(
+                decoded["document_data"][0]["document_data"], file_contents
+            )
+
+        self.assertLess(len(cbor_body), len(json_body) * 0.76)
+
+
+@override_settings(
+    SEARCH_INDEX={**ES_TEST_SETTINGS, "EXTRACT_PLAIN_TEXT": True, "INDEXED_CHARS": 20},
+    SEARCH_INDEXABLE_FILE_TYPES=["application/pdf", "text/html", "text/plain"],
+)
+class PlainTextExtractionTests(SimpleTestCase):
+    def test_plain_text_files_are_decoded(self):
+        zip_file = io.BytesIO()
+        with zipfile.ZipFile(zip_file, mode="w") as archive:
+            archive.writestr("plain.txt", "\ufeffHéllo wörld\n".encode())
+            archive.writestr("latin.txt", "Hello café".encode("latin-1"))
+            archive.writestr(
+                "page.html", b"<html><body><p>Hello <b>world</b></p></body></html>"
+            )
+            archive.writestr("long.txt", "Lorem ipsum dolor sit amet, consectetur")
+            archive.writestr("document.pdf", b"%PDF-1.4 binary content")
+
+        document_data = _extract_documents(zip_file, _iter_zip_content)
+
+        self.assertEqual(
+            document_data,
+            [
+                {"attachment": {"content": "Héllo wörld"}},
+                {"attachment": {"content": "Hello café"}},
+                {"attachment": {"content": "Hello world"}},
+                {"attachment": {"content": "Lorem ipsum dolor si"}},
+                {
+                    "document_data": base64.b64encode(
+                        b"%PDF-1.4 binary content"
+                    ).decode()
+                },
+            ],
+        )
+
+    @patch("woo_search.search_index.tasks.build_client")
+    @patch("woo_search.search_index.tasks.Service.get_service")
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_html_scripts_and_styles_are_not_indexed(
+        self,
+        mock_get_client: MagicMock,
+        mock_get_service: MagicMock,
+        mock_build_client: MagicMock,
+    ):
+        client = mock_get_client.return_value.__enter__.return_value
+        response = mock_build_client.return_value.__enter__.return_value.get()
+        response.headers = {"Content-Type": "text/html"}
+        response.content = (
+            b"<html>\n<head>\n<style>p { color: red; }</style>\n"
+            b'<script type="text/javascript">var x = 1;</script>\n</head>\n'
+            b"<body>\n<p>Hello</p>\n<SCRIPT>alert(1)</SCRIPT>\n<p>world</p>\n"
+            b"<script>unclosed"
+        )
+        doc = IndexDocumentFactory.build(
+            download_url="https://example.com/download", file_size=100
+        )
+
+        index_document(**doc)
+
+        (document_data,) = client.index.call_args.kwargs["body"]["document_data"]
+        self.assertEqual(
+            document_data["attachment"]["content"].split(), ["Hello", "world"]
+        )
+        self.assertNotIn("pipeline", client.index.call_args.kwargs)
+
+    @override_settings(SEARCH_INDEXABLE_FILE_TYPES=["application/pdf"])
+    def test_text_format_must_be_indexable(self):
+        zip_file = io.BytesIO()
+        with zipfile.ZipFile(zip_file, mode="w") as archive:
+            archive.writestr("plain.txt", "Hello world")
+
+        document_data = _extract_documents(zip_file, _iter_zip_content)
+
+        self.assertEqual(document_data, [])
+
+    @patch("woo_search.search_index.tasks._download_document")
+    @patch("woo_search.search_index.tasks.get_client")
+    def test_ingest_pipeline_only_used_for_binary_content(
+        self, mock_get_client: MagicMock, mock_download: MagicMock
+    ):
+        client = mock_get_client.return_value.__enter__.return_value
+        doc = IndexDocumentFactory.build(
+            download_url="https://example.com/download", file_size=100
+        )
+
+        with self.subTest("plain text only"):
+            mock_download.return_value = [{"attachment": {"content": "Hello"}}]
+
+            index_document(**doc)
+
+            self.assertNotIn("pipeline", client.index.call_args.kwargs)
+
+        with self.subTest("binary content"):
+            mock_download.return_value = [
+                {"attachment": {"content": "Hello"}},
+                {"document_data": "JVBERi0xLjQ="},
+            ]
+
+            index_document(**doc)
+
+            self.assertEqual(
+                client.index.call_args.kwargs["pipeline"], "document_attachment"
+            )
+
+
+@override_settings(
+    SEARCH_INDEX={**ES_TEST_SETTINGS, "MAX_INDEX_FILE_SIZE": 100_000},
+    SEARCH_INDEXABLE_FILE_TYPES=["text/plain"],
+)
+class ArchiveExtractionGuardTests(SimpleTestCase):
+    def test_zip_members_with_high_compression_ratio_are_skipped(self):
+        zip_file = io.BytesIO()
+        with zipfile.ZipFile(zip_file, mode="w", compression=zipfile.ZIP_DEFLATED) as z:
+            z.writestr("bomb.txt", b"0" * 50_000)
+            z.writestr("regular.txt", "Lorem ipsum dolor sit amet")
+
+        document_data = _extract_documents(zip_file, _iter_zip_content)
+
+        self.assertEqual(
+            document_data,
+            [
+                {
+                    "document_data": base64.b64encode(
+                        b"Lorem ipsum dolor sit amet"
+                    ).decode()
+                }
+            ],
+        )
+
+    def test_7z_archive_with_high_compression_ratio_is_skipped(self):
+        archive = io.BytesIO()
+        with py7zr.SevenZipFile(archive, mode="w") as z:
+            z.writestr(b"0" * 50_000, "bomb.txt")
+            z.writestr("Lorem ipsum dolor sit amet", "regular.txt")
+        archive.seek(0)
+
+        with patch.object(py7zr.SevenZipFile, "extract") as mock_extract:
+            document_data = _extract_documents(archive, _iter_7z_content)
+
+        self.assertEqual(document_data, [])
+        mock_extract.assert_not_called()
+
+    @override_settings(
+        SEARCH_INDEX={**ES_TEST_SETTINGS, "MAX_INDEX_FILE_SIZE": 30},
+    )
+    def test_7z_members_are_read_in_batches_within_budget(self):
+        archive = io.BytesIO()
+        with py7zr.SevenZipFile(archive, mode="w") as z:
+            z.writestr("first file " * 2, "1.txt")  # 22 bytes
+            z.writestr("too large to be indexed " * 2, "2.txt")  # 48 bytes
+            z.writestr("second", "3.txt")  # 6 bytes
+            z.writestr("third", "4.txt")  # 5 bytes
+        archive.seek(0)
+
+        with patch.object(
+            py7zr.SevenZipFile,
+            "extract",
+            autospec=True,
+            side_effect=py7zr.SevenZipFile.extract,
+        ) as mock_extract:
+            document_data = _extract_documents(archive, _iter_7z_content)
+
+        self.assertEqual(
+            document_data,
+            [
+                {"document_data": base64.b64encode(b"first file first file ").decode()},
+                {"document_data": base64.b64encode(b"second").decode()},
+            ],
+        )
+        read_targets = [call.kwargs["targets"] for call in mock_extract.call_args_list]
+        self.assertEqual(read_targets, [["1.txt", "3.txt"], ["4.txt"]])
+
+    def test_7z_member_larger_than_declared_size_is_not_fully_decompressed(self):
+        archive = io.BytesIO()
+        with py7zr.SevenZipFile(archive, mode="w") as z:
+            z.writestr("Lorem ipsum", "1.txt")
+            z.writestr("Lorem ipsum dolor sit amet", "2.txt")
+            z.writestr("dolor", "3.txt")
+        archive.seek(0)
+
+        with py7zr.SevenZipFile(archive, mode="r") as zip_file:
+            # the (lying) archive header claims the second file is only 10 bytes
+            files = [
+                (file.read(), size)
+                for file, size in _read_7z_members(
+                    zip_file, {"1.txt": 11, "2.txt": 10, "3.txt": 5}
+                )
+            ]
+
+        self.assertEqual(files, [(b"Lorem ipsum", 11), (b"dolor", 5)])
+
+    def test_member_larger_than_declared_size_is_skipped(self):
+        def iter_archive(document_file: io.BytesIO):
+            # the (lying) archive header claims the file is only 10 bytes
+            yield io.BytesIO(b"Lorem ipsum dolor sit amet"), 10
+            yield io.BytesIO(b"Lorem ipsum"), 11
+
+        document_data = _extract_documents(io.BytesIO(), iter_archive)
+
+        self.assertEqual(
+            document_data,
+            [{"document_data": base64.b64encode(b"Lorem ipsum").decode()}],
+        )
+
+    def test_concurrent_extraction_preserves_archive_order_and_budget(self):
+        contents = [os.urandom(7_000).hex().encode() for _ in range(20)]
+        zip_file = io.BytesIO()
+        with zipfile.ZipFile(zip_file, mode="w", compression=zipfile.ZIP_DEFLATED) as z:
+            for index, file_contents in enumerate(contents):
+                z.writestr(f"{index}.txt", file_contents)
+        # 14KB per file -> room for 7 files
+        expected = [
+            {"document_data": base64.b64encode(file_contents).decode()}
+            for file_contents in contents[:7]
+        ]
+
+        for threads in (1, 4):
+            with (
+                self.subTest(threads=threads),
+                override_settings(
+                    SEARCH_INDEX={
+                        **ES_TEST_SETTINGS,
+                        "MAX_INDEX_FILE_SIZE": 100_000,
+                        "ARCHIVE_EXTRACTION_THREADS": threads,
+                    }
+                ),
+            ):
+                document_data = _extract_documents(zip_file, _iter_zip_content)
+
+                self.assertEqual(document_data, expected)
+
+
+@override_settings(
+    SEARCH_INDEX={**ES_TEST_SETTINGS, "PAYLOAD_CACHE_SIZE": 1_000_000},
+    SEARCH_INDEXABLE_FILE_TYPES=["text/plain"],
+)
+class PayloadCacheTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        payload_cache.clear()
+        self.addCleanup(payload_cache.clear)
+
+    def test_duplicate_files_are_prepared_once(self):
+        zip_file = io.BytesIO()
+        with zipfile.ZipFile(zip_file, mode="w") as z:
+            z.writestr("form.txt", "Standard form")
+            z.writestr("other.txt", "Something else")
+            z.writestr("copy-of-form.txt", "Standard form")
+
+        with patch(
+            "woo_search.search_index.tasks._prepare_document_data",
+            wraps=_prepare_document_data,
+        ) as mock_prepare:
+            first = _extract_documents(zip_file, _iter_zip_content)
+            second = _extract_documents(zip_file, _iter_zip_content)
+
+        self.assertEqual(mock_prepare.call_count, 2)
+        expected = [
+            {"document_data": base64.b64encode(b"Standard form").decode()},
+            {"document_data": base64.b64encode(b"Something else").decode()},
+            {"document_data": base64.b64encode(b"Standard form").decode()},
+        ]
+        self.assertEqual(first, expected)
+        self.assertEqual(second, expected)
+
+    def test_payload_settings_are_part_of_the_cache_key(self):
+        zip_file = io.BytesIO()
+        with zipfile.ZipFile(zip_file, mode="w") as z:
+            z.writestr("form.txt", "Standard form")
+
+        base64_data = _extract_documents(zip_file, _iter_zip_content)
+        with override_settings(
+            SEARCH_INDEX={
+                **ES_TEST_SETTINGS,
+                "PAYLOAD_CACHE_SIZE": 1_000_000,
+                "EXTRACT_PLAIN_TEXT": True,
+            }
+        ):
+            text_data = _extract_documents(zip_file, _iter_zip_content)
+
+        self.assertEqual(
+            base64_data,
+            [{"document_data": base64.b64encode(b"Standard form").decode()}],
+        )
+        self.assertEqual(text_data, [{"attachment": {"content": "Standard form"}}])
@@ -0,0 +1,276 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta, timezone
+from unittest.mock import MagicMock
+from uuid import UUID
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from ..utils import (
+    CircuitBreaker,
+    SingleFlight,
+    SizeBoundedLRUCache,
+    get_parameters_key,
+    stores_file_contents,
+)
+
+
+class SizeBoundedLRUCacheTests(SimpleTestCase):
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = SizeBoundedLRUCache[str, str]()
+        cache.set("a", "aaa", size=3, max_size=10)
+        cache.set("b", "bbb", size=3, max_size=10)
+        cache.set("c", "ccc", size=3, max_size=10)
+        # mark as recently used
+        cache.get("a")
+
+        cache.set("d", "dddd", size=4, max_size=10)
+
+        self.assertEqual(len(cache), 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "aaa")
+        self.assertEqual(cache.get("c"), "ccc")
+        self.assertEqual(cache.get("d"), "dddd")
+
+    def test_values_larger_than_max_size_are_not_cached(self):
+        cache = SizeBoundedLRUCache[str, str]()
+        cache.set("a", "aaa", size=3, max_size=10)
+
+        cache.set("b", "b" * 11, size=11, max_size=10)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "aaa")
+
+    def test_replacing_an_entry_updates_the_size(self):
+        cache = SizeBoundedLRUCache[str, str]()
+        cache.set("a", "a" * 8, size=8, max_size=10)
+        cache.set("a", "a", size=1, max_size=10)
+
+        cache.set("b", "b" * 9, size=9, max_size=10)
+
+        self.assertEqual(cache.get("a"), "a")
+        self.assertEqual(cache.get("b"), "b" * 9)
+
+
+class StoresFileContentsTests(SimpleTestCase):
+    def test_file_contents_stored(self):
+        client = MagicMock()
+        client.indices.get_mapping.return_value.body = {
+            "document": {"mappings": {"properties": {}}}
+        }
+
+        self.assertTrue(stores_file_contents(client))
+        client.indices.get_mapping.assert_called_once_with(index="document")
+
+    def test_file_contents_excluded_from_source(self):
+        client = MagicMock()
+        client.indices.get_mapping.return_value.body = {
+            "document": {
+                "mappings": {
+                    "_source": {"excludes": ["document_data"]},
+                    "properties": {},
+                }
+            }
+        }
+
+        self.assertFalse(stores_file_contents(client))
+
+
+class GetParametersKeyTests(SimpleTestCase):
+    def test_equivalent_parameters(self):
+        publisher_1 = UUID("d2b9d4a0-1f0b-4d7e-9a1d-3c1e0b6d6f01")
+        publisher_2 = UUID("5c1b8f3e-2a4d-4b1e-8f0a-6e2d9c7b4a02")
+        key = get_parameters_key(
+            {
+                "query": "besluit",
+                "publishers": [publisher_1, publisher_2],
+                "registratiedatum_vanaf": datetime(2026, 1, 1, 12, tzinfo=UTC),
+            }
+        )
+
+        equivalent_key = get_parameters_key(
+            {
+                "registratiedatum_vanaf": datetime(
+                    2026, 1, 1, 13, tzinfo=timezone(timedelta(hours=1))
+                ),
+                "publishers": [publisher_2, publisher_1],
+                "query": "besluit",
+            }
+        )
+
+        self.assertEqual(key, equivalent_key)
+
+    def test_different_parameters(self):
+        key = get_parameters_key({"query": "besluit", "page": 1})
+
+        self.assertNotEqual(key, get_parameters_key({"query": "besluit", "page": 2}))
+        self.assertNotEqual(key, get_parameters_key({"query": "besluiT", "page": 1}))
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def _slow_call(self, result="result"):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(timeout=5)
+        return result
+
+    def _release_after_followers_wait(self):
+        self.started.wait(timeout=5)
+        # give the followers the chance to start waiting on the call in flight
+        time.sleep(0.2)
+        self.release.set()
+
+    def test_concurrent_calls_are_coalesced(self):
+        single_flight = SingleFlight[str]("test")
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            leader = executor.submit(single_flight.do, "key", self._slow_call)
+            self.started.wait(timeout=5)
+            followers = [
+                executor.submit(single_flight.do, "key", self._slow_call)
+                for _ in range(2)
+            ]
+            self._release_after_followers_wait()
+
+            results = [future.result() for future in [leader, *followers]]
+
+        self.assertEqual(results, ["result"] * 3)
+        self.assertEqual(self.calls, 1)
+
+    def test_different_keys_are_not_coalesced(self):
+        single_flight = SingleFlight[str]("test")
+        self.release.set()
+
+        single_flight.do("key-1", self._slow_call)
+        single_flight.do("key-2", self._slow_call)
+
+        self.assertEqual(self.calls, 2)
+
+    def test_sequential_calls_are_not_coalesced(self):
+        single_flight = SingleFlight[str]("test")
+        self.release.set()
+
+        single_flight.do("key", self._slow_call)
+        single_flight.do("key", self._slow_call)
+
+        self.assertEqual(self.calls, 2)
+
+    def test_exception_is_shared(self):
+        single_flight = SingleFlight[str]("test")
+
+        def failing_call():
+            self._slow_call()
+            raise ValueError("boom")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(single_flight.do, "key", failing_call)
+            self.started.wait(timeout=5)
+            follower = executor.submit(single_flight.do, "key", failing_call)
+            self._release_after_followers_wait()
+
+            for future in (leader, follower):
+                with self.assertRaisesMessage(ValueError, "boom"):
+                    future.result()
+
+        self.assertEqual(self.calls, 1)
+
+    def test_follower_stops_waiting_after_timeout(self):
+        single_flight = SingleFlight[str]("test")
+        self.addCleanup(self.release.set)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(single_flight.do, "key", self._slow_call)
+            self.started.wait(timeout=5)
+            follower = executor.submit(
+                single_flight.do, "key", lambda: "own result", timeout=0.1
+            )
+
+            self.assertEqual(follower.result(timeout=5), "own result")
+            self.release.set()
+            self.assertEqual(leader.result(), "result")
+
+        self.assertEqual(self.calls, 1)
+
+    def test_concurrent_calls_are_coalesced_across_processes(self):
+        self.addCleanup(cache.clear)
+        # separate instances don't share in-flight calls, like separate processes
+        single_flight_1 = SingleFlight[str]("test")
+        single_flight_2 = SingleFlight[str]("test")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(
+                single_flight_1.do, "key", self._slow_call, shared=True
+            )
+            self.started.wait(timeout=5)
+            follower = executor.submit(
+                single_flight_2.do, "key", self._slow_call, shared=True
+            )
+            self._release_after_followers_wait()
+
+            self.assertEqual(leader.result(), "result")
+            self.assertEqual(follower.result(), "result")
+
+        self.assertEqual(self.calls, 1)
+
+    def test_failed_call_in_other_process_is_retried(self):
+        self.addCleanup(cache.clear)
+        single_flight_1 = SingleFlight[str]("test")
+        single_flight_2 = SingleFlight[str]("test")
+
+        def failing_call():
+            self._slow_call()
+            raise ValueError("boom")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(
+                single_flight_1.do, "key", failing_call, shared=True
+            )
+            self.started.wait(timeout=5)
+            follower = executor.submit(
+                single_flight_2.do, "key", lambda: "retried", shared=True
+            )
+            self._release_after_followers_wait()
+
+            with self.assertRaisesMessage(ValueError, "boom"):
+                leader.result()
+            self.assertEqual(follower.result(), "retried")
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker("test")
+        breaker.record_failure(failure_threshold=2)
+        breaker.record_success()
+        breaker.record_failure(failure_threshold=2)
+
+        self.assertTrue(breaker.allows_request(reset_timeout=30))
+
+        breaker.record_failure(failure_threshold=2)
+
+        self.assertFalse(breaker.allows_request(reset_timeout=30))
+
+    def test_half_open_after_reset_timeout(self):
+        breaker = CircuitBreaker("test")
+        breaker.record_failure(failure_threshold=1)
+
+        with self.subTest("request allowed after timeout"):
+            self.assertTrue(breaker.allows_request(reset_timeout=0))
+
+        with self.subTest("failure opens again"):
+            breaker.record_failure(failure_threshold=1)
+
+            self.assertFalse(breaker.allows_request(reset_timeout=30))
+
+        with self.subTest("success closes"):
+            breaker.record_success()
+
+            self.assertTrue(breaker.allows_request(reset_timeout=30))
@@ -88,3 +88,10 @@ class SearchParameters(TypedDict):
     publishers: Collection[UUID]
     informatie_categorieen: Collection[UUID]
     onderwerpen: Collection[UUID]
+    highlight: bool
+
+
+class SuggestParameters(TypedDict):
+    query: str
+    result_types: list[IndexName]
+    size: int
@@ -1,7 +1,21 @@
-from collections.abc import Iterator
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterator, Mapping
+from concurrent.futures import Future, wait
+from datetime import UTC, date, datetime
+from typing import Any
+from uuid import uuid4
 
+from django.core.cache import cache
+
+from elasticsearch import Elasticsearch
 from elasticsearch.dsl import Document
 
+from .index import FILE_CONTENTS_FIELD, Document as IndexDocument
+
 
 def get_subclasses(cls: type):
     for subclass in cls.__subclasses__():
@@ -11,3 +25,211 @@ def get_subclasses(cls: type):
 
 def get_index_document_types() -> Iterator[type[Document]]:
     yield from get_subclasses(Document)
+
+
+def stores_file_contents(client: Elasticsearch) -> bool:
+    """
+    Check if the extracted file contents are stored in the ``_source`` of documents.
+
+    If they are not, any operation that rewrites documents from their ``_source``
+    (update by query, reindex...) makes the file contents unsearchable, as they can
+    only be re-derived by indexing the document again.
+    """
+    response = client.indices.get_mapping(index=IndexDocument.Index.name)
+    for index_mapping in response.body.values():
+        source_options = index_mapping["mappings"].get("_source", {})
+        if FILE_CONTENTS_FIELD in source_options.get("excludes", []):
+            return False
+    return True
+
+
+class SizeBoundedLRUCache[K: Hashable, V]:
+    """
+    Thread-safe, in-memory least-recently-used cache.
+
+    Rather than limiting the number of entries, the cache is bounded by the total
+    size of the values (as reported when they're added), which makes it suitable for
+    values of very different sizes.
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            if (entry := self._entries.get(key)) is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: K, value: V, *, size: int, max_size: int) -> None:
+        # values that would evict everything else aren't worth caching
+        if size > max_size:
+            return
+        with self._lock:
+            if (existing := self._entries.pop(key, None)) is not None:
+                self._size -= existing[1]
+            while self._entries and self._size + size > max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+            self._entries[key] = (value, size)
+            self._size += size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+def _normalize_parameter(value: Any) -> Any:
+    match value:
+        # the order of the items in filters is irrelevant
+        case list() | tuple() | set() | frozenset():
+            return sorted(str(item) for item in value)
+        case datetime() if value.tzinfo is not None:
+            return value.astimezone(UTC).isoformat()
+        case date():  # also handles naive datetimes
+            return value.isoformat()
+        case _:
+            return value
+
+
+def get_parameters_key(parameters: Mapping[str, Any]) -> str:
+    """
+    Derive a key from (validated) request parameters that is identical for
+    equivalent parameters.
+    """
+    normalized = {key: _normalize_parameter(value) for key, value in parameters.items()}
+    serialized = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+class SingleFlight[V]:
+    """
+    Coalesce concurrent calls with the same key into a single call.
+
+    Callers arriving while a call for their key is in flight wait for it to complete
+    and share its result (or exception) instead of making the same call themselves.
+
+    Within the process, the callers wait on the in-flight call directly. With
+    ``shared=True``, the calls are coalesced across processes too - the Django cache
+    then acts as lock and hands over the result, which must be picklable.
+    """
+
+    poll_interval = 0.05
+    """
+    Seconds between checks for the result of a call made in another process.
+    """
+
+    result_timeout = 10
+    """
+    Seconds the result of a call is available to callers in other processes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[str, Future[V]] = {}
+        self._lock = threading.Lock()
+
+    def do(
+        self,
+        key: str,
+        func: Callable[[], V],
+        *,
+        shared: bool = False,
+        timeout: float = 60,
+    ) -> V:
+        """
+        Return the result of ``func``, calling it unless a call for ``key`` is already
+        in flight.
+
+        :arg timeout: The maximum number of seconds to wait for a call in flight. After
+          that, ``func`` is called anyway.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if is_leader := future is None:
+                future = self._calls[key] = Future()
+
+        if not is_leader:
+            done, _ = wait([future], timeout=timeout)
+            return future.result() if done else func()
+
+        try:
+            result = self._do_shared(key, func, timeout) if shared else func()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def _do_shared(self, key: str, func: Callable[[], V], timeout: float) -> V:
+        lock_key = f"single-flight:{self.name}:{key}"
+        token = uuid4().hex
+        if cache.add(lock_key, token, timeout=timeout):
+            try:
+                result = func()
+                cache.set(f"{lock_key}:{token}", result, timeout=self.result_timeout)
+                return result
+            finally:
+                cache.delete(lock_key)
+
+        # the token identifies the call in flight, so results of earlier calls are
+        # never picked up
+        leader_token = cache.get(lock_key)
+        deadline = time.monotonic() + timeout
+        while leader_token is not None and time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            if (result := cache.get(f"{lock_key}:{leader_token}")) is not None:
+                return result
+            # the call failed, don't wait for the deadline
+            if cache.get(lock_key) != leader_token:
+                break
+
+        return func()
+
+
+class CircuitBreaker:
+    """
+    Thread-safe, per-process circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the breaker opens, and requests
+    are not allowed for ``reset_timeout`` seconds. After that, requests are allowed
+    again - a success closes the breaker, while a failure opens it for another period.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._lock = threading.Lock()
+
+    def allows_request(self, *, reset_timeout: float) -> bool:
+        with self._lock:
+            return (
+                self._opened_at is None
+                or time.monotonic() - self._opened_at >= reset_timeout
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self, *, failure_threshold: int) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= failure_threshold:
+                self._opened_at = time.monotonic()
+
+    def reset(self) -> None:
+        self.record_success()